@@ -3,6 +3,7 @@ CineMatch FastAPI Backend
 PostgreSQL (Neon.tech) ile film öneri sistemi backend API'si
 """
 import os
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -12,6 +13,7 @@ from slowapi.errors import RateLimitExceeded
 
 # PostgreSQL bağlantı fonksiyonları
 from backend.src.db_pg import init_db, close_db
+from backend.src.recommender import engine as rec_engine
 
 # Route'ları import et
 from backend.routes import users, movies, interactions, genres, chat, recommendations
@@ -21,7 +23,17 @@ from backend.routes import users, movies, interactions, genres, chat, recommenda
 async def lifespan(app: FastAPI):
     """Uygulama başlangıç ve kapanış olayları"""
     await init_db()
+    try:
+        # Bellek içi indeksleri ve tür kataloğunu başlangıçta kur
+        await rec_engine.refresh_data()
+    except Exception as e:
+        print(f"Öneri motoru başlatılamadı (ilk istekte tekrar denenecek): {e}")
+    # CF modeli etkileşimlerle artımlı güncellenir; periyodik tam kurulum kaymayı kontrol eder
+    rebuild_task = asyncio.create_task(
+        rec_engine.run_periodic_rebuild(float(os.environ.get("ITEM_CF_REBUILD_SECONDS", 3600)))
+    )
     yield
+    rebuild_task.cancel()
     await close_db()
 
 
@@ -54,6 +66,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Route'ları ekle
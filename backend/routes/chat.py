@@ -1,18 +1,23 @@
 """
 Chat API endpoint'leri - CineMatch AI Engine Entegrasyonu
 """
+import asyncio
 import os
-from fastapi import APIRouter, HTTPException
+import json
+import time
+from contextlib import aclosing
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from openai import AsyncOpenAI
 from pathlib import Path
 from dotenv import load_dotenv
 
-from sqlalchemy.future import select
-from sqlalchemy.ext.asyncio import AsyncSession
-from backend.src.db_pg import async_session_maker
-from backend.src.models_pg import User, Interaction, Genre, Movie
+from backend.src.chat_context import ChatContext, build_chat_context
+from backend.src.fake_llm import FakeLLMClient
+from backend.src.llm_cache import LLMCache, llm_cache_key
+from backend.src.llm_gateway import GatewayBusy, GatewayTimeout, LLMGateway
 
 # Root .env dosyasını bul ve yükle
 env_path = Path(__file__).parent.parent.parent / '.env'
@@ -20,18 +25,28 @@ load_dotenv(dotenv_path=env_path)
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
+CHAT_MODEL = "gpt-4o-mini"
+CHAT_TEMPERATURE = 0.7
+
 class ChatRequest(BaseModel):
     message: str
     user_id: Optional[int] = None
 
 class CineMatchEngine:
-    def __init__(self):
+    def __init__(self, cache: Optional[LLMCache] = None, gateway: Optional[LLMGateway] = None):
         self._client = None
+        self.cache = cache
+        # Tüm LLM çağrıları geçitten geçer: eşzamanlılık sınırı, kuyruk, tek uçuş, süre sınırı
+        self.gateway = gateway or LLMGateway()
 
     @property
     def client(self):
         """OpenAI istemcisini lazily (gerektiğinde) döndürür."""
         if self._client is None:
+            # Yerel geliştirme / ölçüm: ağ olmadan, gecikmesi ayarlanabilir sahte LLM
+            if os.getenv("CHAT_FAKE_LLM") == "1":
+                self._client = FakeLLMClient.from_env()
+                return self._client
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 # API Key eksikliğini daha sonra metod içinde yakalamak için burada raise etmiyoruz
@@ -40,63 +55,14 @@ class CineMatchEngine:
             self._client = AsyncOpenAI(api_key=api_key)
         return self._client
 
-    async def get_personalized_recommendation(self, user_id: int, user_message: str):
-        try:
-            # Client'ın varlığını kontrol et
-            if self.client is None:
-                return "OpenAI API anahtarı yapılandırılmamış. Lütfen yönetici ile iletişime geçin."
-
-            async with async_session_maker() as session:
-                # 1. Kullanıcıyı ve Tercihlerini Çek
-                result_user = await session.execute(select(User).where(User.user_id == user_id))
-                user = result_user.scalars().first()
-                if not user:
-                    return "Kullanıcı profiliniz veritabanında bulunamadı."
-                    
-                # Etkileşim geçmişi ve türler
-                result_interact = await session.execute(select(Interaction).where(Interaction.user_id == user_id))
-                interactions = result_interact.scalars().all()
-                
-                result_genres = await session.execute(select(Genre))
-                genres_list = result_genres.scalars().all()
-                genre_map = {g.genre_id: g.genre_name for g in genres_list}
-                
-                # Kullanıcının seçtiği tür isimlerini belirle
-                fav_genre_names = [genre_map.get(gid) for gid in (user.selected_genres or []) if genre_map.get(gid)]
-                
-                # 2. Etkileşim Geçmişinden Özet Çıkar
-                liked_movies_metadata = []
-                disliked_ids = []
-                
-                for inter in interactions:
-                    result_movie = await session.execute(select(Movie).where(Movie.movieId == inter.movie_id))
-                    movie = result_movie.scalars().first()
-                    if movie:
-                        if inter.is_liked:
-                            metadata_str = str(movie.llm_metadata) if movie.llm_metadata else str(movie.title)
-                            liked_movies_metadata.append(metadata_str)
-                        elif inter.is_liked is False:
-                            disliked_ids.append(inter.movie_id)
-                            
-                # 3. Aday Havuzu Oluştur
-                watched_ids = [i.movie_id for i in interactions]
-                exclude_ids = list(set(watched_ids + disliked_ids))
-                
-                stmt_candidates = select(Movie).where(
-                    Movie.movieId.notin_(exclude_ids) & (Movie.vote_average > 6.0)
-                ).order_by(Movie.popularity.desc()).limit(15)
-                
-                result_candidates = await session.execute(stmt_candidates)
-                candidates = result_candidates.scalars().all()
-                candidate_context = "\n".join([str(c.llm_metadata) if c.llm_metadata else str(c.title) for c in candidates])
-                
-            # 4. LLM Promptu
-            system_prompt = f"""
+    def build_system_prompt(self, context: ChatContext) -> str:
+        """Sohbet bağlamından sistem promptu (kullanıcının listesi, favori türleri ve aday listesi)."""
+        return f"""
             Sen CineMatch film uzmanısın. Kullanıcının zevkini analiz ederek ona en iyi tavsiyeleri verirsin.
             
             KULLANICI VERİLERİ (Hiyerarşik Öncelik):
-            1. KULLANICININ MEVCUT LİSTESİ ("Listem" - En Önemli): {liked_movies_metadata[:10]}
-            2. Kayıtta seçtiği genel favori türler: {fav_genre_names}
+            1. KULLANICININ MEVCUT LİSTESİ ("Listem" - En Önemli): {context.liked_metadata[:10]}
+            2. Kayıtta seçtiği genel favori türler: {context.fav_genre_names}
             
             GÖREV VE ÖNCELİK KURALLARI:
             - BİRİNCİL ÖNCELİK "LİSTEM": Kullanıcının zevkini belirleyen ana unsur "Listem"deki filmlerdir. Türler sadece ek bilgidir.
@@ -109,25 +75,101 @@ class CineMatchEngine:
             3. Cevaplarını paragraflar halinde yaz, her öneri arasında boşluk bırak.
             
             ADAY LİSTESİ:
-            {candidate_context}
+            {context.candidate_context}
             
             Cevabını Türkçe, samimi ve uzman bir dille ver.
             """
 
-            response = await self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.7
+    def build_messages(self, context: ChatContext, user_message: str):
+        """LLM'e giden mesajlar: sistem promptu + kullanıcının mesajı."""
+        return [
+            {"role": "system", "content": self.build_system_prompt(context)},
+            {"role": "user", "content": user_message}
+        ]
+
+    def cache_key(self, context: ChatContext, user_message: str) -> Optional[str]:
+        """Önbellek kapalıysa None."""
+        if self.cache is None:
+            return None
+        return llm_cache_key(user_message, context, CHAT_MODEL, CHAT_TEMPERATURE)
+
+    async def cache_put(self, key: Optional[str], response: str, started: float):
+        """Başarıyla tamamlanan yanıtı, LLM'den kaç saniyede geldiğiyle birlikte saklar."""
+        if key is not None and response:
+            await self.cache.put(key, response, latency=time.perf_counter() - started)
+
+    async def get_personalized_recommendation(self, user_id: int, user_message: str):
+        try:
+            # Client'ın varlığını kontrol et
+            if self.client is None:
+                return "OpenAI API anahtarı yapılandırılmamış. Lütfen yönetici ile iletişime geçin."
+
+            # 1-3. Kullanıcı, etkileşim geçmişi ve aday havuzu (tek bağlantı, geçmiş uzunluğundan bağımsız sorgu sayısı)
+            context = await build_chat_context(user_id)
+            if context is None:
+                return "Kullanıcı profiliniz veritabanında bulunamadı."
+
+            # 4. Aynı mesaj + aynı bağlam daha önce sorulduysa LLM'e gitme
+            key = self.cache_key(context, user_message)
+            cached = await self.cache.get(key) if key is not None else None
+            if cached is not None:
+                return cached
+
+            # 5. LLM Promptu
+            started = time.perf_counter()
+            content = await self.gateway.complete(
+                self.client,
+                model=CHAT_MODEL,
+                messages=self.build_messages(context, user_message),
+                temperature=CHAT_TEMPERATURE
             )
-            return response.choices[0].message.content
+            await self.cache_put(key, content, started)
+            return content
+        except (GatewayBusy, GatewayTimeout):
+            # Route bunları 429 / 504'e çevirir
+            raise
         except Exception as e:
             return f"Öneri motoru işlem sırasında bir hata aldı: {str(e)}"
 
-# Engine instance
-engine = CineMatchEngine()
+    async def stream_recommendation(self, user_id: int, user_message: str):
+        """
+        get_personalized_recommendation'ın akışlı hâli: OpenAI'nin stream=True yanıtındaki
+        metin parçalarını (delta) geldikçe üreten async generator.
+        Generator kapatılırsa (istemci bağlantıyı kestiğinde) OpenAI akışı da kapatılır,
+        böylece üretim yarıda kesilir ve kalan token'lar için beklenmez.
+        Önbellekte olan yanıt tek parça hâlinde döner; yalnızca sonuna kadar okunan akışlar önbelleğe yazılır.
+        """
+        if self.client is None:
+            yield "OpenAI API anahtarı yapılandırılmamış. Lütfen yönetici ile iletişime geçin."
+            return
+        context = await build_chat_context(user_id)
+        if context is None:
+            yield "Kullanıcı profiliniz veritabanında bulunamadı."
+            return
+
+        key = self.cache_key(context, user_message)
+        cached = await self.cache.get(key) if key is not None else None
+        if cached is not None:
+            yield cached
+            return
+
+        started = time.perf_counter()
+        parts = []
+        chunks = self.gateway.stream(
+            self.client,
+            model=CHAT_MODEL,
+            messages=self.build_messages(context, user_message),
+            temperature=CHAT_TEMPERATURE
+        )
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+        await self.cache_put(key, "".join(parts), started)
+
+# Engine instance (LLM_CACHE_SIZE=0 önbelleği kapatır; geçit: LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_TIMEOUT)
+engine = CineMatchEngine(cache=LLMCache.from_env(), gateway=LLMGateway.from_env())
 
 @router.post("")
 async def chat_with_ai(request: ChatRequest):
@@ -139,5 +181,85 @@ async def chat_with_ai(request: ChatRequest):
     try:
         response = await engine.get_personalized_recommendation(request.user_id, request.message)
         return {"response": response}
+    except GatewayBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except GatewayTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Sunucu hatası: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def chat_cache_stats():
+    """LLM yanıt önbelleğinin isabet oranı ve kazandırdığı LLM süresi (saved_seconds)."""
+    if engine.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **await asyncio.to_thread(engine.cache.stats)}
+
+
+@router.get("/gateway/stats")
+async def chat_gateway_stats():
+    """LLM geçidi: anlık yük, reddedilen / birleştirilen / süresi dolan çağrılar ve süre histogramları."""
+    return engine.gateway.stats()
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Tek bir Server-Sent Events mesajı (JSON veri satırı)."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def wait_disconnect(http_request: Request):
+    """İstemci bağlantıyı kesene kadar bekler (gövde okunduktan sonra gelen ilk http.disconnect mesajı)."""
+    while (await http_request.receive())["type"] != "http.disconnect":
+        pass
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """
+    /api/chat'in akışlı (Server-Sent Events) hâli: yanıt token token gelir.
+    Olaylar: her parça için `data: {"delta": "..."}`, sonunda `event: done`,
+    hata olursa `event: error` + `data: {"detail": "..."}`.
+    İstemci bağlantıyı keserse (LLM o sırada parça göndermese de) LLM akışı hemen iptal edilir.
+    LLM geçidi doluysa yanıt başlamadan 429 döner; akış sırasında dolarsa / süre aşılırsa `event: error`.
+    """
+    if request.user_id is None:
+        raise HTTPException(status_code=401, detail="Chatbotu kullanmak için giriş yapmalısınız.")
+    try:
+        engine.gateway.check_capacity()
+    except GatewayBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
+    async def events():
+        # Her parça bağlantı kopmasıyla yarışır: LLM parça göndermese (takılsa) bile istemci gidince
+        # bekleyen okuma iptal edilir; akış kendi görevinde kapanır ve geçit slotu hemen geri verilir
+        deltas = engine.stream_recommendation(request.user_id, request.message)
+        disconnected = asyncio.create_task(wait_disconnect(http_request))
+        next_delta = None
+        try:
+            while True:
+                next_delta = asyncio.ensure_future(anext(deltas, None))
+                await asyncio.wait((next_delta, disconnected), return_when=asyncio.FIRST_COMPLETED)
+                if not next_delta.done():
+                    return
+                delta = next_delta.result()
+                if delta is None:
+                    break
+                yield sse_event({"delta": delta})
+            yield sse_event({}, event="done")
+        except Exception as e:
+            yield sse_event({"detail": f"Öneri motoru işlem sırasında bir hata aldı: {str(e)}"}, event="error")
+        finally:
+            disconnected.cancel()
+            if next_delta is not None and not next_delta.done():
+                next_delta.cancel()  # Generator okuma görevinde iptal olur (sunucu bu generator'ı iptal etse de)
+            else:
+                await deltas.aclose()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Proxy'ler (nginx vb.) yanıtı tamponlamasın, parçalar hemen iletilsin
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
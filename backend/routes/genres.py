@@ -1,48 +1,67 @@
 """
 Tür (Genre) API endpoint'leri
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from backend.src.db_pg import get_db
-from backend.src.models_pg import Genre, MovieGenre
+from backend.src.models_pg import Movie
+from backend.src.genre_catalog import genre_catalog
+from backend.src.recommender import engine as rec_engine
 
 router = APIRouter(prefix="/api/genres", tags=["genres"])
 
 
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Yanıta ETag başlığını yazar. İstemcinin If-None-Match'i bu etag'i içeriyorsa
+    gövdesiz 304 yanıtını döner (istemci önbelleğindekini kullanır), yoksa None.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    response.headers.update(headers)
+    match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in match.split(",")] or match.strip() == "*":
+        return Response(status_code=304, headers=headers)
+    return None
+
+
 @router.get("")
-async def get_all_genres(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Tüm türleri getir"""
+async def get_all_genres(request: Request, response: Response) -> List[Dict[str, Any]]:
+    """
+    Tüm türleri getir (süreç genelindeki tür kataloğundan, DB'ye gitmeden).
+    Yanıt ETag taşır; istemci If-None-Match ile gönderirse ve türler değişmediyse 304 döner.
+    """
     try:
-        result = await db.execute(select(Genre))
-        genres = result.scalars().all()
-        return [{"_id": str(g.genre_id), **{k: v for k, v in g.__dict__.items() if k != "_sa_instance_state"}} for g in genres]
+        catalog = await genre_catalog.ensure()
+        unchanged = not_modified(request, response, catalog.etag)
+        if unchanged:
+            return unchanged
+        return catalog.records
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Türler getirilirken hata: {str(e)}")
 
 
 @router.get("/movie/{movie_id}")
-async def get_movie_genres(movie_id: int, db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Belirli bir filmin türlerini getir"""
+async def get_movie_genres(
+    movie_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_db)
+) -> List[Dict[str, Any]]:
+    """
+    Belirli bir filmin türlerini getir: tür ID'leri bellek içi tür indeksinden, adlar tür kataloğundan.
+    İndekste olmayan (yeni eklenmiş) filmler için movies.genre_ids dizisinden tek sorgu. ETag destekler.
+    """
     try:
-        # Önce film-tür ilişkilerini al
-        stmt = select(MovieGenre).where(MovieGenre.movie_id == movie_id)
-        result = await db.execute(stmt)
-        movie_genre_relations = result.scalars().all()
-        
-        if not movie_genre_relations:
-            return []
-        
-        # Tür ID'lerini topla
-        genre_ids = [relation.genre_id for relation in movie_genre_relations]
-        
-        # Türleri getir
-        stmt_g = select(Genre).where(Genre.genre_id.in_(genre_ids))
-        result_g = await db.execute(stmt_g)
-        genres = result_g.scalars().all()
-        
-        return [{"_id": str(g.genre_id), **{k: v for k, v in g.__dict__.items() if k != "_sa_instance_state"}} for g in genres]
+        catalog = await genre_catalog.ensure()
+        if rec_engine.genre_index.is_ready and rec_engine.genre_index.positions([movie_id])[0] >= 0:
+            genre_ids = rec_engine.genre_index.genres_of(movie_id)
+        else:
+            result = await db.execute(select(Movie.genre_ids).where(Movie.movieId == movie_id))
+            genre_ids = result.scalar() or []
+
+        unchanged = not_modified(request, response, catalog.etag_of(movie_id, sorted(genre_ids)))
+        if unchanged:
+            return unchanged
+        return catalog.records_of(genre_ids)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Film türleri getirilirken hata: {str(e)}")
@@ -9,10 +9,19 @@ from typing import List, Dict, Any
 
 from backend.src.db_pg import get_db
 from backend.src.models_pg import Interaction, User
+from backend.src.recommender import engine as rec_engine
 
 router = APIRouter(prefix="/api/interactions", tags=["interactions"])
 
 
+async def update_engine(update):
+    """Kayıt commit edildikten sonra öneri motorunu günceller; motor hatası isteği başarısız saymaz."""
+    try:
+        await update
+    except Exception as e:
+        print(f"Öneri motoru güncellenemedi (kayıt DB'de, periyodik kurulum düzeltir): {e}")
+
+
 @router.get("")
 async def get_all_interactions(db: AsyncSession = Depends(get_db)) -> List[Dict[str, Any]]:
     """Tüm etkileşimleri getir"""
@@ -56,6 +65,7 @@ async def create_interaction(data: Dict[str, Any], db: AsyncSession = Depends(ge
                 existing.rating = data.get("rating")
             
             await db.commit()
+            await update_engine(rec_engine.record_interaction(user_id, movie_id, existing.is_liked))
             return {"status": "updated"}
         else:
             # Yeni interaction_id oluştur
@@ -73,6 +83,7 @@ async def create_interaction(data: Dict[str, Any], db: AsyncSession = Depends(ge
             
             db.add(new_interaction)
             await db.commit()
+            await update_engine(rec_engine.record_interaction(user_id, movie_id, new_interaction.is_liked))
             return {"status": "created", "interaction_id": new_id}
             
     except Exception as e:
@@ -89,6 +100,7 @@ async def delete_interaction(user_id: int, movie_id: int, db: AsyncSession = Dep
         )
         result = await db.execute(stmt)
         await db.commit()
+        await update_engine(rec_engine.forget_interaction(user_id, movie_id))
         return {"status": "deleted", "count": result.rowcount}
     except Exception as e:
         await db.rollback()
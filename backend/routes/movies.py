@@ -1,73 +1,114 @@
 """
 Film API endpoint'leri
 """
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import or_, and_, desc, func
+from sqlalchemy import or_, and_, bindparam, func, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
 from typing import List, Optional, Dict, Any
+import numpy as np
 
 from backend.src.db_pg import get_db
-from backend.src.models_pg import Movie, MovieGenre
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+from backend.src.sampling import new_seed, fetch_sampled_page
+from backend.src.keyset import SORT_KEYS, fetch_page
+from backend.src.genre_filter import genre_condition
 
 router = APIRouter(prefix="/api/movies", tags=["movies"])
 
 
 @router.get("")
 async def get_all_movies(
+    response: Response,
     skip: int = Query(0, ge=0, description="Atlanacak kayıt sayısı"),
     limit: int = Query(20, ge=1, le=100, description="Getirilecek kayıt sayısı"),
     search: Optional[str] = Query(None, description="Film adında arama"),
     genre_ids: Optional[str] = Query(None, description="Virgülle ayrılmış tür ID'leri"),
-    sort_by: Optional[str] = Query(None, description="Sıralama kriteri (popularity gibi)"),
+    sort_by: Optional[str] = Query(None, description="Sıralama kriteri: popularity, vote_average, release_date, title"),
+    seed: Optional[int] = Query(None, description="Rastgele sıralama için oturum seed'i"),
+    cursor: Optional[str] = Query(None, description="Önceki yanıtın X-Next-Cursor başlığı (skip yerine; rastgele sırada aynı seed ile)"),
+    genre_match: str = Query("any", description="genre_ids için any: türlerden biri, all: hepsi"),
     db: AsyncSession = Depends(get_db)
 ) -> List[Dict[str, Any]]:
-    """Tüm filmleri getir (pagination ve tür filtresi ile)"""
+    """
+    Tüm filmleri getir (pagination ve tür filtresi ile).
+    sort_by verilirse sayfalar (değer, movie_id), verilmezse seed'li sıradaki konum üzerinde keyset ile
+    gezilir: yanıttaki X-Next-Cursor başlığı bir sonraki isteğe cursor olarak verildiğinde
+    her sayfa ilk sayfa kadar ucuzdur.
+    """
+    if sort_by is not None and sort_by not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz sort_by: {sort_by}")
+    if genre_match not in ("any", "all"):
+        raise HTTPException(status_code=400, detail=f"Geçersiz genre_match: {genre_match}")
     try:
-        stmt = select(Movie)
-        
-        # Temel arama filtresi
+        conditions = []
+        search_ids = None
+
+        # Arama filtresi: bellek içi başlık indeksinden eşleşen tüm filmler (fuzzy yok), yoksa ILIKE.
+        # ID'ler tek dizi parametresiyle gider: SQL metni eşleşme sayısından bağımsız kalır
         if search:
-            stmt = stmt.where(Movie.title.ilike(f"%{search}%"))
-            
-        # Tür filtresi ekle
+            if rec_engine.search_index is not None:
+                search_ids = rec_engine.search_ids(search)
+                if not search_ids:
+                    return []
+                matched = bindparam("search_ids", search_ids, type_=ARRAY(Integer))
+                conditions.append(Movie.movieId.in_(select(func.unnest(matched))))
+            else:
+                conditions.append(Movie.title.ilike(f"%{search}%"))
+
+        # Tür filtresi: sıralama yoksa bellek içi tür indeksinden, varsa DB'de genre_ids dizi koşulu (&& / @>, GIN indeksli)
         if genre_ids:
             genre_id_list = [int(gid.strip()) for gid in genre_ids.split(",") if gid.strip().isdigit()]
             if genre_id_list:
-                movie_genre_stmt = select(MovieGenre.movie_id).where(MovieGenre.genre_id.in_(genre_id_list))
-                movie_genres_result = await db.execute(movie_genre_stmt)
-                movie_ids = list(set([row[0] for row in movie_genres_result.all()]))
-                
-                if movie_ids:
-                    stmt = stmt.where(Movie.movieId.in_(movie_ids))
-                    # Only show decent-quality films in genre rows
-                    stmt = stmt.where(Movie.vote_average > 5.0)
-                else:
-                    return []
+                match_all = genre_match == "all"
+                # Sıralama yoksa sayfa tamamen bellekte seçilir, DB'ye sadece PK ile gidilir
+                if (not search or search_ids is not None) and sort_by is None:
+                    if not rec_engine.is_ready:
+                        await rec_engine.refresh_data()
+                    index = rec_engine.genre_index
+                    keep = index.select(**{"all_of" if match_all else "any_of": genre_id_list}, min_vote=5.0)
+                    if search_ids is not None:
+                        keep &= np.isin(index.movie_ids, search_ids)
+                    page_ids, next_cursor = rec_engine.sample_page(
+                        keep, new_seed() if seed is None else seed, cursor=cursor, skip=skip, limit=limit
+                    )
+                    if next_cursor:
+                        response.headers["X-Next-Cursor"] = next_cursor
+                    return await rec_engine.catalog.get_records(db, page_ids)
+
+                conditions.append(genre_condition(genre_id_list, match_all=match_all))
+                # Only show decent-quality films in genre rows
+                conditions.append(Movie.vote_average > 5.0)
 
-        # Sıralama: explicit sort_by=popularity için DESC, aksi hâlde rastgele
-        if sort_by == "popularity":
-            stmt = stmt.order_by(desc(Movie.popularity))
+        # Sıralama: sort_by için değere göre, aksi hâlde seed'li rastgele; ikisi de keyset (cursor yoksa skip ile)
+        if sort_by:
+            movies, next_cursor = await fetch_page(db, conditions, sort_by, cursor=cursor, skip=skip, limit=limit)
         else:
-            stmt = stmt.order_by(func.random())
-            
-        # Pagination
-        stmt = stmt.offset(skip).limit(limit)
-        
-        # Execute query
-        result = await db.execute(stmt)
-        movies = result.scalars().all()
-        
+            movies, next_cursor = await fetch_sampled_page(
+                db, conditions, new_seed() if seed is None else seed, cursor=cursor, skip=skip, limit=limit
+            )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
         # Pydantic dict format
         return [{"_id": str(m.movieId), **{k: v for k, v in m.__dict__.items() if k != "_sa_instance_state"}} for m in movies]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Filmler getirilirken hata: {str(e)}")
 
 
 @router.get("/{movie_id}")
 async def get_movie_by_id(movie_id: int, db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
-    """Belirli bir filmi getir"""
+    """Belirli bir filmi getir (katalog anlık görüntüsünden; yeni eklenmişse DB'den)"""
     try:
+        if rec_engine.catalog.is_ready:
+            records = await rec_engine.catalog.get_records(db, [movie_id])
+            if records:
+                return records[0]
+
         stmt = select(Movie).where(Movie.movieId == movie_id)
         result = await db.execute(stmt)
         movie = result.scalars().first()
@@ -85,20 +126,55 @@ async def get_movie_by_id(movie_id: int, db: AsyncSession = Depends(get_db)) ->
 @router.get("/search/query")
 async def search_movies(
     q: str = Query(..., min_length=1, description="Arama terimi"),
+    limit: int = Query(50, ge=1, le=100, description="Getirilecek sonuç sayısı"),
     db: AsyncSession = Depends(get_db)
 ) -> List[Dict[str, Any]]:
-    """Film ara"""
+    """
+    Film ara: tam ad, önek, kelime öneki, ad içinde geçen ve yazım hatası toleranslı
+    eşleşmeler bu sırayla (eşitlerde popüler olan önce). Her sonuçta "match" eşleşme türüdür.
+    """
     try:
+        if rec_engine.search_index is not None:
+            found = rec_engine.search(q, limit=limit)
+            records = await rec_engine.catalog.get_records(db, [mid for mid, _, _ in found])
+            return [{**record, "match": kind} for record, (_, _, kind) in zip(records, found)]
+
         stmt = select(Movie).where(
             or_(
                 Movie.title.ilike(f"%{q}%"),
                 Movie.original_title.ilike(f"%{q}%")
             )
-        ).limit(50)
-        
+        ).limit(limit)
+
         result = await db.execute(stmt)
         movies = result.scalars().all()
-        
+
         return [{"_id": str(m.movieId), **{k: v for k, v in m.__dict__.items() if k != "_sa_instance_state"}} for m in movies]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Arama yapılırken hata: {str(e)}")
+
+
+@router.get("/search/autocomplete")
+async def autocomplete_movies(
+    q: str = Query(..., min_length=1, description="Yazılmakta olan arama terimi"),
+    limit: int = Query(8, ge=1, le=20, description="Öneri sayısı"),
+) -> List[Dict[str, Any]]:
+    """
+    Arama kutusu için hafif öneriler (her tuş vuruşunda çağrılır): DB'ye hiç gitmez.
+    Önce ad / kelime önekleri; hiç yoksa yazım hatası toleranslı adaylar.
+    """
+    if rec_engine.search_index is None:
+        await rec_engine.refresh_data()
+    found = rec_engine.search(q, limit=limit, fuzzy=False) or rec_engine.search(q, limit=limit)
+    catalog, strings = rec_engine.catalog, rec_engine.catalog.strings
+    results = []
+    for movie_id, score, kind in found:
+        pos = catalog.positions([movie_id])[0]
+        results.append({
+            "movieId": movie_id,
+            "title": strings["title"][pos],
+            "release_date": strings["release_date"][pos] or "",
+            "poster_url": strings["poster_url"][pos] or "",
+            "match": kind,
+        })
+    return results
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from backend.src.recommender import engine
+from backend.src.hybrid import DEFAULT_WEIGHTS
+from backend.src.result_cache import decode_cursor
 
 router = APIRouter(prefix="/api/recommend", tags=["recommendations"])
 
@@ -10,36 +12,84 @@ class RecommendationRequest(BaseModel):
     selected_genres: Optional[List[int]] = []
     skip: int = 0
     limit: int = 20
+    seed: Optional[int] = None  # Oturum seed'i: aynı seed ile sayfalar tekrar etmez
+    ranking: str = "shuffle"  # "shuffle" (seed'li karışık) ya da "hybrid" (puan/popülerlik/yıl/tür)
+    weights: Optional[Dict[str, float]] = None  # hybrid ağırlıkları, verilmeyenler varsayılan
+    cursor: Optional[str] = None  # Önceki yanıtın X-Next-Cursor başlığı; verilirse diğer alanların yerine geçer
 
 @router.post("")
-async def get_recommendations(request: RecommendationRequest):
+async def get_recommendations(request: RecommendationRequest, response: Response):
     """
     Film önerilerini getir.
     Eğer user_id varsa kullanıcıya özel, yoksa seçilen türlere göre (guest) öneri yapar.
+    Sıralı liste ilk sayfada hesaplanıp önbelleğe alınır; sonraki sayfa için
+    yanıttaki X-Next-Cursor başlığı cursor olarak gönderilebilir (skip de çalışmaya devam eder).
     """
+    if request.cursor:
+        try:
+            (user_id, genres, seed, ranking, weights), skip = decode_cursor(request.cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        request = request.model_copy(update={
+            "user_id": user_id, "selected_genres": list(genres), "seed": seed,
+            "ranking": ranking, "weights": dict(weights) or None, "skip": skip,
+        })
+    if request.ranking not in ("shuffle", "hybrid"):
+        raise HTTPException(status_code=400, detail="ranking 'shuffle' ya da 'hybrid' olmalı")
+    unknown = set(request.weights or {}) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Bilinmeyen ağırlık: {sorted(unknown)}")
     try:
         # Motorun hazır olduğundan emin ol (ilk istekte verileri yükler)
         if not engine.is_ready:
             await engine.refresh_data()
             
-        if request.user_id:
-            results = await engine.recommend_for_user(request.user_id, skip=request.skip, limit=request.limit)
-        else:
-            results = await engine.recommend_for_guest(request.selected_genres, skip=request.skip, limit=request.limit)
-            
+        results, next_cursor = await engine.recommend_page(
+            request.user_id, request.selected_genres, skip=request.skip, limit=request.limit,
+            seed=request.seed, ranking=request.ranking, weights=request.weights,
+        )
+
         if isinstance(results, dict) and "error" in results:
             raise HTTPException(status_code=404, detail=results["error"])
-            
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return results
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Öneri hatası: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class SimilarRequest(BaseModel):
+    movie_ids: Optional[List[int]] = Field(default_factory=list, max_length=50)
+    user_id: Optional[int] = None
+    k: int = Field(10, ge=1, le=50)
+
+@router.post("/similar")
+async def get_similar_movies(request: SimilarRequest):
+    """
+    Birden fazla film için benzer film satırlarını tek çağrıda getir.
+    movie_ids boşsa user_id'nin beğendiği filmler tohum olur; izlenenler çıkarılır.
+    """
+    if not request.movie_ids and request.user_id is None:
+        raise HTTPException(status_code=400, detail="movie_ids veya user_id gerekli")
+    try:
+        return await engine.similar_movies(request.movie_ids, request.user_id, k=request.k)
+    except Exception as e:
+        print(f"Benzer film hatası: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache/stats")
+async def recommendation_cache_stats():
+    """Öneri sonuç önbelleğinin isabet / ıska / tahliye sayaçları."""
+    return engine.results.stats()
+
 @router.get("/refresh")
 async def refresh_engine():
     """Motorun verilerini manuel olarak tazeler."""
     try:
         await engine.refresh_data()
-        return {"message": "Motor başarıyla tazelendi", "movie_count": len(engine.movies_df)}
+        return {"message": "Motor başarıyla tazelendi", "movie_count": len(engine.genre_index.movie_ids)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -10,6 +10,7 @@ import os
 
 from backend.src.db_pg import get_db
 from backend.src.models_pg import User, Interaction
+from backend.src.recommender import engine as rec_engine
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
@@ -194,6 +195,10 @@ async def save_user_preferences(
             user.selected_genres = selected_genres
 
         await db.commit()
+        try:
+            rec_engine.update_preferences(user_id, selected_genres)
+        except Exception as e:  # Tercihler DB'de; motor hatası isteği başarısız saymaz
+            print(f"Öneri motoru güncellenemedi: {e}")
         return {"status": "success", "message": "Tercihler kaydedildi"}
     except Exception as e:
         await db.rollback()
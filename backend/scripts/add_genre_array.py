@@ -0,0 +1,62 @@
+"""
+movies.genre_ids (integer[]) sütununu ekler, movie_genres'ten doldurur ve GIN indeksini kurar.
+"X, Y türlerindeki filmler" (&&, @>) ve "M filminin türleri" sorguları böylece tek tablodan,
+movie_genres ile join yapmadan cevaplanır. movie_genres'e yapılan her ekleme / silme / güncelleme
+bir trigger ile ilgili filmin dizisini yeniden hesaplar; movie_genres doğruluk kaynağı olarak kalır.
+Kullanım: python backend/scripts/add_genre_array.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+from sqlalchemy import text
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src.db_pg import engine, init_db
+
+# Bir filmin güncel tür dizisi (sıralı, tekrarsız; türü yoksa boş dizi)
+GENRE_ARRAY_SQL = (
+    "COALESCE((SELECT array_agg(DISTINCT mg.genre_id ORDER BY mg.genre_id) "
+    "FROM movie_genres mg WHERE mg.movie_id = movies.movie_id), '{}')"
+)
+
+
+async def main():
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "ALTER TABLE movies ADD COLUMN IF NOT EXISTS genre_ids integer[] NOT NULL DEFAULT '{}'"
+        ))
+        await conn.execute(text(f"""
+            CREATE OR REPLACE FUNCTION sync_movie_genre_ids() RETURNS trigger AS $$
+            BEGIN
+                UPDATE movies SET genre_ids = {GENRE_ARRAY_SQL}
+                WHERE movie_id IN (
+                    CASE WHEN TG_OP <> 'DELETE' THEN NEW.movie_id END,
+                    CASE WHEN TG_OP <> 'INSERT' THEN OLD.movie_id END
+                );
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """))
+        await conn.execute(text("DROP TRIGGER IF EXISTS trg_movie_genres_sync ON movie_genres"))
+        await conn.execute(text(
+            "CREATE TRIGGER trg_movie_genres_sync AFTER INSERT OR UPDATE OR DELETE ON movie_genres "
+            "FOR EACH ROW EXECUTE FUNCTION sync_movie_genre_ids()"
+        ))
+        print("movie_genres -> movies.genre_ids trigger'ı hazır.")
+
+        result = await conn.execute(text(
+            f"UPDATE movies SET genre_ids = {GENRE_ARRAY_SQL} WHERE genre_ids IS DISTINCT FROM {GENRE_ARRAY_SQL}"
+        ))
+        print(f"{result.rowcount} filmin genre_ids değeri dolduruldu.")
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_movies_genre_ids ON movies USING gin (genre_ids)"
+        ))
+        await conn.execute(text("ANALYZE movies"))
+        print("ix_movies_genre_ids (GIN) indeksi hazır.")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
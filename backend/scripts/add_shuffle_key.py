@@ -0,0 +1,32 @@
+"""
+movies.shuffle_key sütununu ekler ve doldurur (seed'li örnekleme için).
+Her filme bir kez rastgele bir anahtar verilir; yeni eklenen filmler DEFAULT ile alır.
+Kullanım: python backend/scripts/add_shuffle_key.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+from sqlalchemy import text
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src.db_pg import engine, init_db
+
+
+async def main():
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "ALTER TABLE movies ADD COLUMN IF NOT EXISTS shuffle_key DOUBLE PRECISION DEFAULT random()"
+        ))
+        result = await conn.execute(text("UPDATE movies SET shuffle_key = random() WHERE shuffle_key IS NULL"))
+        print(f"{result.rowcount} filme shuffle_key atandı.")
+        await conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_movies_shuffle_key ON movies (shuffle_key)"
+        ))
+        print("ix_movies_shuffle_key indeksi hazır.")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+"""
+/api/movies keyset sayfalaması için (sıralama değeri, movie_id) bileşik indekslerini kurar.
+İfadeler backend/src/keyset.py'deki SORT_KEYS ile birebir aynı olmalı; yoksa planlayıcı indeksi kullanmaz.
+Kullanım: python backend/scripts/add_sort_indexes.py
+"""
+import asyncio
+import sys
+from pathlib import Path
+from sqlalchemy import text
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src.db_pg import engine, init_db
+
+SORT_INDEXES = {
+    "ix_movies_popularity_keyset": "(coalesce(popularity, -1.0) DESC, movie_id DESC)",
+    "ix_movies_vote_average_keyset": "(coalesce(vote_average, -1.0) DESC, movie_id DESC)",
+    "ix_movies_release_date_keyset": "(coalesce(release_date, '') DESC, movie_id DESC)",
+    "ix_movies_title_keyset": "(coalesce(title, '') ASC, movie_id ASC)",
+}
+
+
+async def create_sort_indexes(conn, table: str = "movies"):
+    for name, columns in SORT_INDEXES.items():
+        await conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}"))
+    await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def main():
+    await init_db()
+    async with engine.begin() as conn:
+        await create_sort_indexes(conn)
+    print(f"{len(SORT_INDEXES)} keyset indeksi hazır: {', '.join(SORT_INDEXES)}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+İçerik motoru artifact'inin worker başına bellek kullanımı (Linux, /proc/<pid>/smaps).
+--workers kadar süreç artifact'i açar, birkaç öneri üretir; her süreç için artifact dosyalarının
+eşlenmiş belleğini (Rss / paylaşılan / özel) ve motor.df'in (her worker'ın kendi kopyası) boyutunu raporlar.
+Kullanım: python backend/scripts/artifact_memory.py [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src import artifacts
+
+ARTIFACT_DIR = os.path.join(artifacts.ARTIFACT_ROOT, "recommender-v3")
+
+
+def mapped_usage(prefix):
+    """prefix altındaki dosyaların bu süreçteki eşlemeleri: {"Rss", "Shared", "Private"} (kB)."""
+    usage = {"Rss": 0, "Shared": 0, "Private": 0}
+    inside = False
+    with open("/proc/self/smaps", encoding="utf-8") as file:
+        for line in file:
+            fields = line.split()
+            if not fields[0].endswith(":"):  # Yeni eşleme başlığı: adres aralığı ... [yol]
+                inside = len(fields) >= 6 and fields[5].startswith(prefix)
+            elif inside and fields[0] == "Rss:":
+                usage["Rss"] += int(fields[1])
+            elif inside and fields[0] in ("Shared_Clean:", "Shared_Dirty:"):
+                usage["Shared"] += int(fields[1])
+            elif inside and fields[0] in ("Private_Clean:", "Private_Dirty:"):
+                usage["Private"] += int(fields[1])
+    return usage
+
+
+def worker(barrier, results):
+    from backend.src.recommender import load_content_model
+
+    motor = load_content_model()
+    for title in ("toy story", "the matrix", "inception"):
+        motor.recommend(title, k=80)  # k > komşu tablosu: sayısal özellikler ve CSR matrisi de okunur
+    motor.recommend_batch(motor.df["movie_id"].to_numpy()[:50], k=10)
+    barrier.wait()  # Tüm worker'lar eşlemelerini kurduktan sonra ölç (paylaşım görünsün)
+    results.put((os.getpid(), mapped_usage(ARTIFACT_DIR), motor.df.memory_usage(deep=True).sum() // 1024))
+    barrier.wait()
+
+
+def main(workers: int):
+    context = multiprocessing.get_context("spawn")
+    barrier, results = context.Barrier(workers), context.Queue()
+    processes = [context.Process(target=worker, args=(barrier, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    rows = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"{'pid':>8} | {'artifact Rss kB':>15} {'paylaşılan kB':>13} {'özel kB':>8} | {'motor.df kB (özel)':>18}")
+    for pid, usage, df_kb in sorted(rows):
+        print(f"{pid:>8} | {usage['Rss']:>15} {usage['Shared']:>13} {usage['Private']:>8} | {df_kb:>18}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.workers)
@@ -0,0 +1,82 @@
+"""
+"X'i beğendiğin için" satırları: tohum başına get_recommendations döngüsü vs. tek recommend_batch çağrısı,
+katalog boyutuna göre. Gerçek katalog (movies_with_metadata.csv) --sizes kadar satıra çoğaltılır: her kopya
+yeni movie_id ve ad alır, popülerlik/puan hafifçe oynatılır, metin aynı kalır (komşu tablosu gerçekçi yoğunlukta).
+Kullanım: python backend/scripts/bench_batch_similar.py [--sizes 1493 10000 50000] [--seeds 20] [--k 10] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+import pandas as pd
+
+from backend.src.recommenderv3 import MovieRecommender
+
+DATA_PATH = root_path / "backend" / "data" / "movies_with_metadata.csv"
+
+
+def scaled_catalog(base, size, rng):
+    """base'i size satıra çoğaltır; kopyalar benzersiz movie_id ve ad alır."""
+    copies = -(-size // len(base))
+    df = pd.concat([base] * copies, ignore_index=True).iloc[:size].copy()
+    copy_no = np.arange(len(df)) // len(base)
+    df["movie_id"] = np.arange(1, len(df) + 1)
+    for column in ("title", "original_title"):
+        df[column] = [t if c == 0 else f"{t} #{c}" for t, c in zip(df[column].fillna("").astype(str), copy_no)]
+    jitter = np.where(copy_no > 0, rng.normal(1.0, 0.1, len(df)), 1.0)
+    df["popularity"] = df["popularity"].fillna(0) * jitter
+    df["vote_average"] = (df["vote_average"].fillna(0) * jitter).clip(0, 10)
+    return df
+
+
+def timed_ms(call, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(sizes, n_seeds: int, k: int, workers: int, repeat: int):
+    base = pd.read_csv(DATA_PATH)
+    rng = np.random.default_rng(0)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"movies_{size}.csv")
+            scaled_catalog(base, size, rng).to_csv(path, index=False)
+            motor = MovieRecommender(path)
+            motor.load_data()
+            start = time.perf_counter()
+            motor.create_similarity_matrix(k=50, workers=workers)
+            build_s = time.perf_counter() - start
+
+            seeds = rng.choice(motor.df["movie_id"].to_numpy(), n_seeds, replace=False).tolist()
+            titles = motor.df.set_index("movie_id").loc[seeds, "original_title"].tolist()
+            motor.recommend_batch(seeds, k=k)  # İlk çağrıdaki indeks kurulumları ölçüme girmesin
+            motor.get_recommendations(titles[0], k=k)
+            loop_ms = timed_ms(lambda: [motor.get_recommendations(t, k=k) for t in titles], repeat)
+            batch_ms = timed_ms(lambda: motor.recommend_batch(seeds, k=k), repeat)
+            rows.append((size, build_s, loop_ms, batch_ms))
+
+    print(f"{n_seeds} tohum, k={k}, {repeat} tekrar ortalaması")
+    print(f"{'film':>8} | {'tablo s':>8} | {'döngü ms':>9} {'toplu ms':>9} {'hız':>6}")
+    for size, build_s, loop_ms, batch_ms in rows:
+        print(f"{size:>8} | {build_s:8.1f} | {loop_ms:9.2f} {batch_ms:9.2f} {loop_ms / batch_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1493, 10_000, 50_000])
+    parser.add_argument("--seeds", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.sizes, args.seeds, args.k, args.workers, args.repeat)
@@ -0,0 +1,136 @@
+"""
+Sohbet bağlamı (LLM çağrısından önceki kısım): eski etkileşim başına sorgulu akış vs. build_chat_context.
+Geçmiş uzunluğu arttıkça promptun hazır olma süresi ve DB gidiş-dönüş sayısı ölçülür.
+Ölçüm için users / interactions tablolarına geçici kullanıcılar eklenir, sonunda silinir.
+Yerel DB'de gidiş-dönüş çok ucuz olduğundan, uzak bir DB için tahmin de verilir:
+ölçülen süre + (kritik yoldaki sıralı gidiş-dönüş sayısı x --rtt-ms).
+Kullanım: python backend/scripts/bench_chat_context.py [--lengths 0,10,50,100,250,500,1000] [--repeat 10] [--rtt-ms 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy import delete, event, insert
+from sqlalchemy.future import select
+
+from backend.src.chat_context import ChatContext, build_chat_context, movie_text
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_catalog import genre_catalog
+from backend.src.models_pg import User, Interaction, Genre, Movie
+from backend.routes.chat import engine as chat_engine
+
+BASE_USER_ID = 900_000_000
+
+
+async def legacy_chat_context(user_id):
+    """Eski get_personalized_recommendation bağlam adımları (karşılaştırma için birebir kopya)."""
+    async with async_session_maker() as session:
+        user = (await session.execute(select(User).where(User.user_id == user_id))).scalars().first()
+        if not user:
+            return None
+        interactions = (await session.execute(select(Interaction).where(Interaction.user_id == user_id))).scalars().all()
+        genre_map = {g.genre_id: g.genre_name for g in (await session.execute(select(Genre))).scalars().all()}
+        fav_genre_names = [genre_map.get(gid) for gid in (user.selected_genres or []) if genre_map.get(gid)]
+
+        liked, disliked_ids = [], []
+        for inter in interactions:
+            movie = (await session.execute(select(Movie).where(Movie.movieId == inter.movie_id))).scalars().first()
+            if movie:
+                if inter.is_liked:
+                    liked.append(movie_text(movie.title, movie.llm_metadata))
+                elif inter.is_liked is False:
+                    disliked_ids.append(inter.movie_id)
+
+        watched_ids = [i.movie_id for i in interactions]
+        exclude_ids = list(set(watched_ids + disliked_ids))
+        candidates = (await session.execute(
+            select(Movie).where(Movie.movieId.notin_(exclude_ids) & (Movie.vote_average > 6.0))
+            .order_by(Movie.popularity.desc()).limit(15)
+        )).scalars().all()
+        return ChatContext(user_id=user_id, fav_genre_names=fav_genre_names, liked_metadata=liked,
+                           disliked_ids=disliked_ids, watched_ids=watched_ids,
+                           candidates=[movie_text(c.title, c.llm_metadata) for c in candidates])
+
+
+async def create_users(lengths, movie_ids, genre_ids, rng):
+    """Her geçmiş uzunluğu için bir kullanıcı: rastgele filmlerle, ~%70'i beğeni."""
+    async with async_session_maker() as session:
+        next_interaction = BASE_USER_ID
+        for i, length in enumerate(lengths):
+            user_id = BASE_USER_ID + i
+            await session.execute(insert(User).values(
+                user_id=user_id, full_name="bench", email=f"bench-{user_id}@example.com", password="-",
+                selected_genres=rng.choice(genre_ids, 3, replace=False).tolist(),
+            ))
+            movies = rng.choice(movie_ids, length, replace=False).tolist()
+            if movies:
+                await session.execute(insert(Interaction), [
+                    {"interaction_id": next_interaction + j, "user_id": user_id, "movie_id": mid,
+                     "is_liked": bool(rng.random() < 0.7), "rating": 0.0}
+                    for j, mid in enumerate(movies)
+                ])
+            next_interaction += length
+        await session.commit()
+
+
+async def drop_users():
+    async with async_session_maker() as session:
+        await session.execute(delete(Interaction).where(Interaction.user_id >= BASE_USER_ID))
+        await session.execute(delete(User).where(User.user_id >= BASE_USER_ID))
+        await session.commit()
+
+
+async def measure(build, user_id, repeat):
+    """(p50 ms, sorgu sayısı, sohbet bağlamı) - sorgular ilk çalıştırmada sayılır."""
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    context = await build(user_id)
+    chat_engine.build_system_prompt(context)
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chat_engine.build_system_prompt(await build(user_id))
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), len(queries), context
+
+
+async def main(lengths, repeat: int, rtt_ms: float):
+    await init_db()
+    await genre_catalog.load()
+    async with async_session_maker() as session:
+        movie_ids = np.array((await session.execute(select(Movie.movieId))).scalars().all())
+        genre_ids = np.array((await session.execute(select(Genre.genre_id))).scalars().all())
+    lengths = [n for n in lengths if n <= len(movie_ids)]
+    await drop_users()
+    await create_users(lengths, movie_ids, genre_ids, np.random.default_rng(0))
+    try:
+        print(f"Promptun hazır olma süresi (p50, {repeat} tekrar); tahmin: + sıralı gidiş-dönüş x {rtt_ms:g} ms")
+        print(f"{'geçmiş':>7} | {'eski ms':>8} {'sorgu':>6} {'~uzak ms':>9} | {'yeni ms':>8} {'sorgu':>6} {'~uzak ms':>9} | aynı bağlam")
+        for i, length in enumerate(lengths):
+            user_id = BASE_USER_ID + i
+            old_ms, old_queries, old = await measure(legacy_chat_context, user_id, repeat)
+            new_ms, new_queries, new = await measure(build_chat_context, user_id, repeat)
+            # İki akışta da sorgular tek bağlantıda sıralı; yenisinde sorgu sayısı geçmişten bağımsız
+            same = old.model_dump() == new.model_dump()
+            print(f"{length:>7} | {old_ms:8.2f} {old_queries:>6} {old_ms + old_queries * rtt_ms:9.1f} | "
+                  f"{new_ms:8.2f} {new_queries:>6} {new_ms + new_queries * rtt_ms:9.1f} | {same}")
+    finally:
+        await drop_users()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="0,10,50,100,250,500,1000")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--rtt-ms", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.lengths.split(",")], args.repeat, args.rtt_ms))
@@ -0,0 +1,83 @@
+"""
+/api/chat (tam yanıt) vs /api/chat/stream (SSE): ilk bayta kadar geçen süre (TTFB) ve toplam süre.
+LLM yerine gecikmesi ayarlanabilir yerel sahte istemci (backend/src/fake_llm.py) kullanılır; ağ gerekmez.
+Uygulama gerçek bir uvicorn sunucusunda çalışır (ASGITransport yanıtı tamponlar, TTFB ölçülemez).
+Kullanım: python backend/scripts/bench_chat_stream.py [--users 20] [--first-token-ms 400] [--token-ms 25]
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+import uvicorn
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.fake_llm import FakeLLMClient
+from backend.src.models_pg import Interaction
+from backend.routes.chat import engine as chat_engine
+
+
+async def blocking(client, body):
+    start = time.perf_counter()
+    response = await client.post("/api/chat", json=body)
+    first = time.perf_counter() - start  # Gövde tek parça: ilk bayt = tamamı
+    response.raise_for_status()
+    return first, time.perf_counter() - start
+
+
+async def streaming(client, body):
+    start, first = time.perf_counter(), None
+    async with client.stream("POST", "/api/chat/stream", json=body) as response:
+        async for text in response.aiter_text():
+            if first is None and "data: " in text:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def main(users: int, first_token_ms: float, token_ms: float):
+    await init_db()
+    async with async_session_maker() as session:
+        user_ids = (await session.execute(
+            select(Interaction.user_id).group_by(Interaction.user_id).order_by(func.count().desc()).limit(users)
+        )).scalars().all()
+    chat_engine._client = FakeLLMClient(first_token_ms=first_token_ms, token_ms=token_ms)
+
+    from backend.main import app
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    print(f"{len(user_ids)} eşzamanlı kullanıcı, sahte LLM: ilk token {first_token_ms:g} ms, sonra token başına {token_ms:g} ms")
+    print(f"{'uç nokta':<18} {'TTFB p50':>9} {'TTFB p99':>9} {'toplam p50':>11}")
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+        for name, call in (("/api/chat", blocking), ("/api/chat/stream", streaming)):
+            results = await asyncio.gather(*(call(client, {"message": "Bugün ne izlemeliyim?", "user_id": uid})
+                                             for uid in user_ids))
+            first, total = (np.array(r) * 1000 for r in zip(*results))
+            print(f"{name:<18} {np.percentile(first, 50):7.0f}ms {np.percentile(first, 99):7.0f}ms {np.percentile(total, 50):9.0f}ms")
+
+    server.should_exit = True
+    await serving
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=25)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.first_token_ms, args.token_ms))
@@ -0,0 +1,163 @@
+"""
+/api/movies?genre_ids=...&sort_by=popularity tür filtresi: ID listesiyle IN (...) vs. EXISTS semi-join
+vs. movies.genre_ids dizisi (GIN).
+Gerçek movies / movie_genres tabloları --scale kez çoğaltılarak oturuma özel TEMP tablolara kopyalanır
+(Postgres'te geçici tablolar aynı addaki kalıcı tabloyu gölgeler); ORM ifadeleri değişmeden bu tablolarda çalışır.
+Her popüler tür için ilk keyset sayfasının gecikmesi ve DB ile gidip gelen ID yükü (tahmini bayt) ölçülür:
+  eski       : movie_genres'ten ID'ler Python'a çekilir (list(set(...))), IN (...) ile geri gönderilir
+  IN (bellek): ID'ler bellek içi tür indeksinden gelir, sadece IN (...) ile gönderilir
+  EXISTS     : sadece tür ID'leri gider, movie_genres ile semi-join
+  dizi (GIN) : sadece tür ID'leri gider, movies.genre_ids && / @> (backend/src/genre_filter.py)
+Kullanım: python backend/scripts/bench_genre_filter.py [--scale 60] [--repeat 10]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy import and_, exists, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db
+from backend.src.genre_filter import genre_condition
+from backend.src.genre_index import GenreIndex
+from backend.src.keyset import fetch_page, keyset_page
+from backend.src.models_pg import Movie, MovieGenre
+from backend.scripts.add_sort_indexes import create_sort_indexes
+
+LIMIT = 20
+# Protokol başına tahmini bayt: ikili int4 parametre (uzunluk + değer), tek sütunlu DataRow mesajı
+PARAM_BYTES, ROW_BYTES = 8, 15
+
+
+async def build_tables(conn, scale: int):
+    """public.movies / movie_genres'in scale katı büyüklüğünde geçici kopyaları (kopya k: movie_id * scale + k)."""
+    await conn.execute(text("CREATE TEMP TABLE movies (LIKE public.movies INCLUDING DEFAULTS)"))
+    await conn.execute(text("ALTER TABLE pg_temp.movies ADD COLUMN copy_no integer"))
+    await conn.execute(text(
+        "INSERT INTO pg_temp.movies SELECT m.*, g FROM public.movies m, generate_series(0, :scale - 1) g"
+    ), {"scale": scale})
+    await conn.execute(text(
+        "UPDATE pg_temp.movies SET movie_id = movie_id * :scale + copy_no, popularity = popularity * (0.5 + random())"
+    ), {"scale": scale})
+    await conn.execute(text("ALTER TABLE pg_temp.movies ADD PRIMARY KEY (movie_id)"))
+    await conn.execute(text("CREATE TEMP TABLE movie_genres (LIKE public.movie_genres INCLUDING DEFAULTS)"))
+    await conn.execute(text(
+        "INSERT INTO pg_temp.movie_genres (id, movie_id, genre_id) "
+        "SELECT row_number() OVER (), mg.movie_id * :scale + g, mg.genre_id "
+        "FROM public.movie_genres mg, generate_series(0, :scale - 1) g"
+    ), {"scale": scale})
+    # Modeldeki (models_pg.MovieGenre) indeksler
+    await conn.execute(text("CREATE INDEX ON pg_temp.movie_genres (movie_id)"))
+    await conn.execute(text("CREATE INDEX ON pg_temp.movie_genres (genre_id)"))
+    await conn.execute(text("ANALYZE pg_temp.movie_genres"))
+    await conn.execute(text("CREATE INDEX ON pg_temp.movies USING gin (genre_ids)"))
+    await create_sort_indexes(conn, "pg_temp.movies")
+    # UPDATE'ten sonra kurulan indeksler, kuran işlem bitene kadar planlayıcıya görünmez (indcheckxmin)
+    await conn.commit()
+    return (await conn.execute(text("SELECT count(*) FROM pg_temp.movies"))).scalar()
+
+
+def exists_condition(genre_ids, match_all: bool = False):
+    """Dizi sütunundan önceki tür koşulu: movie_genres'e EXISTS (hepsi için tür başına bir EXISTS)."""
+    def has_genre(ids):
+        return exists().where(MovieGenre.movie_id == Movie.movieId, MovieGenre.genre_id.in_(ids))
+    if match_all:
+        return and_(*(has_genre([gid]) for gid in sorted(set(genre_ids))))
+    return has_genre(genre_ids)
+
+
+def sql_bytes(stmt):
+    """İfadenin DB'ye giden SQL metninin boyutu (IN listesi $n yer tutucularıyla açılmış hâlde)."""
+    compiled = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True})
+    return len(str(compiled).encode())
+
+
+async def timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+async def main(scale: int, repeat: int):
+    await init_db()
+    async with engine.connect() as conn:
+        total = await build_tables(conn, scale)
+        session = AsyncSession(bind=conn)
+        index = await GenreIndex.load(session)
+        counts = {g: int(((index.masks >> np.uint64(bit)) & np.uint64(1)).sum()) for g, bit in index.genre_bits.items()}
+        popular = sorted(counts, key=counts.get, reverse=True)
+        cases = [([g], False) for g in popular[:3] + popular[-1:]] + [(popular[:2], False), (popular[:2], True)]
+        print(f"{total} film (x{scale}), sort_by=popularity, sayfa boyutu {LIMIT}")
+        print(f"{'türler':<16} {'eşleşen':>8} | {'yöntem':<11} {'ID git/gel':>12} {'~KB':>7} {'SQL KB':>7} | {'p50 ms':>8} {'p99 ms':>8}")
+
+        for genre_ids, match_all in cases:
+            quality = Movie.vote_average > 5.0
+            matched = index.query(**{"all_of" if match_all else "any_of": genre_ids}, min_vote=5.0)
+
+            async def legacy():
+                stmt = select(MovieGenre.movie_id).where(MovieGenre.genre_id.in_(genre_ids))
+                if match_all:
+                    stmt = stmt.group_by(MovieGenre.movie_id).having(
+                        text(f"count(DISTINCT genre_id) = {len(set(genre_ids))}"))
+                movie_ids = list(set((await session.execute(stmt)).scalars().all()))
+                return await fetch_page(session, [Movie.movieId.in_(movie_ids), quality], "popularity", limit=LIMIT)
+
+            async def in_memory():
+                return await fetch_page(session, [Movie.movieId.in_(matched.tolist()), quality], "popularity", limit=LIMIT)
+
+            async def semi_join():
+                return await fetch_page(session, [exists_condition(genre_ids, match_all), quality], "popularity", limit=LIMIT)
+
+            async def array():
+                return await fetch_page(session, [genre_condition(genre_ids, match_all), quality], "popularity", limit=LIMIT)
+
+            # eski yol: movie_genres satırları gelir (tekrarlarıyla), tekilleştirilmiş ID'ler geri gider
+            unique = len(index.query(**{"all_of" if match_all else "any_of": genre_ids}))
+            received = unique if match_all else sum(counts.get(g, 0) for g in genre_ids)
+            label = ("+" if match_all else ",").join(map(str, genre_ids))
+            methods = {
+                "eski": (legacy, received + unique, received * ROW_BYTES + unique * PARAM_BYTES,
+                         sql_bytes(keyset_page([Movie.movieId.in_(list(range(unique))), quality], "popularity", limit=LIMIT))),
+                "IN (bellek)": (in_memory, len(matched), len(matched) * PARAM_BYTES,
+                                sql_bytes(keyset_page([Movie.movieId.in_(matched.tolist()), quality], "popularity", limit=LIMIT))),
+                "EXISTS": (semi_join, len(genre_ids), len(genre_ids) * PARAM_BYTES,
+                           sql_bytes(keyset_page([exists_condition(genre_ids, match_all), quality], "popularity", limit=LIMIT))),
+                "dizi (GIN)": (array, len(genre_ids), len(genre_ids) * PARAM_BYTES,
+                               sql_bytes(keyset_page([genre_condition(genre_ids, match_all), quality], "popularity", limit=LIMIT))),
+            }
+            reference = None
+            for name, (run, id_count, id_bytes, stmt_bytes) in methods.items():
+                try:
+                    page, _ = await run()
+                    ids = [m.movieId for m in page]
+                    reference = reference or ids
+                    p50, p99 = await timed(run, repeat)
+                    result = f"{p50:8.2f} {p99:8.2f}" + ("" if ids == reference else "  (FARKLI SAYFA)")
+                except Exception as e:
+                    await session.rollback()
+                    # asyncpg sorgu başına en fazla 32767 parametre kabul eder
+                    result = f"hata: {str(getattr(e, 'orig', e)).splitlines()[0][:70]}"
+                session.expunge_all()
+                print(f"{label:<16} {len(matched):>8} | {name:<11} {id_count:>12} {id_bytes / 1024:>7.1f} "
+                      f"{stmt_bytes / 1024:>7.1f} | {result}")
+        await session.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.repeat))
@@ -0,0 +1,55 @@
+"""
+Hibrit puanlamanın (tek matvec + argpartition) katalog boyutuyla süresini ölçer (sentetik veri).
+Kullanım: python backend/scripts/bench_hybrid.py [--sizes 1500 10000 100000] [--genres 20] [--k 20]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+
+from backend.src.hybrid import HybridScorer
+
+
+def synthetic(n_movies, n_genres, rng):
+    """Puan, popülerlik (uzun kuyruk), oy sayısı, tarih ve 1-3 tür içeren sentetik katalog."""
+    genre_matrix = np.zeros((n_movies, n_genres), dtype=np.float32)
+    for n in (1, 2, 3):
+        genre_matrix[np.arange(n_movies), rng.integers(0, n_genres, n_movies)] = 1.0
+    years = rng.integers(1950, 2025, n_movies)
+    dates = [f"{y}-01-01" if rng.random() > 0.05 else "" for y in years]
+    return HybridScorer.from_arrays(
+        np.arange(n_movies), rng.uniform(0, 10, n_movies), rng.pareto(1.5, n_movies) * 10,
+        rng.uniform(0, 5, n_movies), rng.pareto(1.2, n_movies) * 50, dates, genre_matrix,
+    ), genre_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1500, 10000, 100000])
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'film':>8} {'matris':>10} {'p50':>9} {'p99':>9}")
+    for size in args.sizes:
+        scorer, genre_matrix = synthetic(size, args.genres, rng)
+        timings = []
+        for _ in range(args.requests):
+            taste = rng.random(args.genres).astype(np.float32) * (rng.random(args.genres) < 0.3)
+            start = time.perf_counter()
+            keep = (genre_matrix @ taste > 0) & (scorer.matrix[:, 0] > 0.5)
+            scorer.top_positions(keep, 0, args.k, genre_vector=taste)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{size:>8} {scorer.matrix.nbytes / 1e6:>8.1f}MB {np.percentile(timings, 50):>7.2f}ms "
+              f"{np.percentile(timings, 99):>7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Item-item CF kurulum süresinin etkileşim sayısıyla nasıl büyüdüğünü ölçer (sentetik veri).
+Kullanım: python backend/scripts/bench_item_cf.py [--items 20000] [--sizes 100000 200000 400000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+
+from backend.src.item_cf import ItemCF
+
+
+def synthetic(n_interactions, n_items, n_users, rng):
+    """Popülerliği uzun kuyruklu (Zipf benzeri) sentetik beğeniler."""
+    popularity = 1.0 / np.arange(1, n_items + 1) ** 0.8
+    items = rng.choice(n_items, size=n_interactions, p=popularity / popularity.sum())
+    users = rng.integers(0, n_users, size=n_interactions)
+    return users, items, rng.random(n_interactions) < 0.7
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 200000, 400000])
+    parser.add_argument("--k", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    movie_ids = np.arange(args.items, dtype=np.int64)
+    print(f"{'etkileşim':>10} {'kullanıcı':>10} {'ortak çift':>12} {'kurulum':>10} {'öneri':>10}")
+    for size in args.sizes:
+        users, items, liked = synthetic(size, args.items, size // 40, rng)
+        start = time.perf_counter()
+        model = ItemCF.from_arrays(movie_ids, users, items, liked, k=args.k)
+        build_s = time.perf_counter() - start
+
+        # Ortak beğeni çifti sayısı = kullanıcı başına beğeni²'nin toplamı
+        per_user = np.diff(model.liked.indptr)
+        pairs = int((per_user.astype(np.int64) ** 2).sum())
+
+        sample = model.user_ids[:200]
+        start = time.perf_counter()
+        for uid in sample:
+            model.recommend(uid, limit=100)
+        rec_ms = (time.perf_counter() - start) * 1000 / len(sample)
+        print(f"{size:>10} {len(model.user_ids):>10} {pairs:>12} {build_s:>9.2f}s {rec_ms:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
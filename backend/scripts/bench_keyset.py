@@ -0,0 +1,96 @@
+"""
+/api/movies sort_by=popularity sayfalaması: OFFSET vs. keyset (cursor) gecikmesinin sayfa derinliğiyle değişimi.
+Gerçek movies tablosu --scale kez çoğaltılarak oturuma özel bir TEMP tabloya kopyalanır (Postgres'te
+geçici tablolar aynı addaki kalıcı tabloyu gölgeler); ORM ifadeleri değişmeden bu tabloda çalışır.
+Kullanım: python backend/scripts/bench_keyset.py [--scale 60] [--repeat 20]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy import desc, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db
+from backend.src.keyset import SORT_KEYS, encode_cursor, fetch_page
+from backend.src.models_pg import Movie
+from backend.scripts.add_sort_indexes import create_sort_indexes
+
+LIMIT = 20
+
+
+async def build_table(conn, scale: int):
+    """public.movies'in scale katı büyüklüğünde, popülerliği biraz karıştırılmış geçici kopyası."""
+    await conn.execute(text("CREATE TEMP TABLE movies (LIKE public.movies INCLUDING DEFAULTS)"))
+    await conn.execute(text(
+        "INSERT INTO pg_temp.movies SELECT m.* FROM public.movies m, generate_series(1, :scale)"
+    ), {"scale": scale})
+    await conn.execute(text("CREATE TEMP SEQUENCE bench_ids"))
+    await conn.execute(text(
+        "UPDATE pg_temp.movies SET movie_id = nextval('bench_ids'), popularity = popularity * (0.5 + random())"
+    ))
+    await conn.execute(text("ALTER TABLE pg_temp.movies ADD PRIMARY KEY (movie_id)"))
+    await create_sort_indexes(conn, "pg_temp.movies")
+    # UPDATE'ten sonra kurulan indeksler, kuran işlem bitene kadar planlayıcıya görünmez (indcheckxmin)
+    await conn.commit()
+    return (await conn.execute(text("SELECT count(*) FROM pg_temp.movies"))).scalar()
+
+
+async def timed(session, run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+async def main(scale: int, repeat: int):
+    await init_db()
+    conditions = [Movie.vote_average > 5.0]
+    key, _ = SORT_KEYS["popularity"]
+    async with engine.connect() as conn:
+        total = await build_table(conn, scale)
+        session = AsyncSession(bind=conn)
+        print(f"{total} film (x{scale}), sayfa boyutu {LIMIT}")
+        print(f"{'derinlik':>9} | {'OFFSET p50/p99 (ms)':>20} | {'keyset p50/p99 (ms)':>20}")
+        for depth in (0, 1000, 10000, 40000, 70000):
+            async def offset_page():
+                stmt = select(Movie).where(*conditions).order_by(desc(Movie.popularity)).offset(depth).limit(LIMIT)
+                return (await session.execute(stmt)).scalars().all()
+
+            # Derinlikteki sayfanın cursor'ı: bir önceki sayfanın son satırı
+            cursor = None
+            if depth:
+                row = (await session.execute(
+                    select(Movie.movieId, key).where(*conditions)
+                    .order_by(desc(key), desc(Movie.movieId)).offset(depth - 1).limit(1)
+                )).first()
+                if row is None:
+                    continue
+                cursor = encode_cursor("popularity", row[1], row[0])
+
+            async def keyset():
+                return await fetch_page(session, conditions, "popularity", cursor=cursor, limit=LIMIT)
+
+            old = await timed(session, offset_page, repeat)
+            new = await timed(session, keyset, repeat)
+            session.expunge_all()
+            print(f"{depth:>9} | {old[0]:9.2f} / {old[1]:8.2f} | {new[0]:9.2f} / {new[1]:8.2f}")
+        await session.close()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.scale, args.repeat))
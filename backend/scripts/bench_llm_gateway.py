@@ -0,0 +1,95 @@
+"""
+Ani trafik: LLM'e doğrudan çağrı vs. LLM geçidi (eşzamanlılık sınırı + kuyruk + tek uçuş + süre sınırı).
+LLM yerine OpenAI uyumlu yerel sahte sunucu (fake_openai_app) kullanılır; gerçek AsyncOpenAI istemcisi
+HTTP üzerinden bağlanır. Aynı anda --burst istek gönderilir, bunların --distinct tanesi farklı prompttur.
+Sahte sunucudaki LLM çağrısı sayısı, aynı anda işlenen en fazla çağrı, yanıt süreleri ve 429'lar ölçülür.
+Kullanım: python backend/scripts/bench_llm_gateway.py [--burst 200] [--distinct 50] [--concurrency 8] [--queue 64] [--timeout 30]
+"""
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+import uvicorn
+from openai import AsyncOpenAI
+
+from backend.src.fake_llm import FakeLLMClient, fake_openai_app
+from backend.src.llm_gateway import GatewayBusy, GatewayTimeout, LLMGateway
+
+
+def request_for(i):
+    return {"model": "gpt-4o-mini", "temperature": 0.7,
+            "messages": [{"role": "system", "content": f"ADAY LİSTESİ:\nFilm {i}"}, {"role": "user", "content": "Bir film öner"}]}
+
+
+async def timed(call):
+    start = time.perf_counter()
+    try:
+        await call
+        status = "ok"
+    except GatewayBusy:
+        status = "busy"
+    except GatewayTimeout:
+        status = "timeout"
+    return status, time.perf_counter() - start
+
+
+async def burst(fake, make_call, size: int, distinct: int):
+    fake.peak = 0
+    calls = fake.calls
+    start = time.perf_counter()
+    results = await asyncio.gather(*[timed(make_call(request_for(i % distinct))) for i in range(size)])
+    wall = time.perf_counter() - start
+    ok = [seconds * 1000 for status, seconds in results if status == "ok"]
+    return {
+        "llm": fake.calls - calls, "peak": fake.peak, "ok": len(ok),
+        "busy": sum(status == "busy" for status, _ in results),
+        "timeout": sum(status == "timeout" for status, _ in results),
+        "p50": np.percentile(ok, 50) if ok else 0.0, "p95": np.percentile(ok, 95) if ok else 0.0, "wall": wall,
+    }
+
+
+async def main(size: int, distinct: int, concurrency: int, queue: int, timeout: float):
+    fake = FakeLLMClient(first_token_ms=400, token_ms=5)
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(fake_openai_app(fake), host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="bench", max_retries=0)
+    await client.chat.completions.create(**request_for(-1))
+
+    gateway = LLMGateway(max_concurrency=concurrency, max_queue=queue, timeout=timeout)
+    rows = [
+        ("doğrudan", await burst(fake, lambda request: client.chat.completions.create(**request), size, distinct)),
+        (f"geçit ({concurrency}+{queue})", await burst(fake, lambda request: gateway.complete(client, **request), size, distinct)),
+    ]
+    print(f"{size} eşzamanlı istek, {distinct} farklı prompt; sahte LLM: ilk token 400 ms")
+    print(f"{'':>16} | {'LLM çağrısı':>11} {'en fazla eşzamanlı':>18} | {'yanıt':>5} {'429':>4} {'504':>4} | {'p50 ms':>7} {'p95 ms':>7} {'toplam s':>8}")
+    for name, r in rows:
+        print(f"{name:>16} | {r['llm']:>11} {r['peak']:>18} | {r['ok']:>5} {r['busy']:>4} {r['timeout']:>4} | "
+              f"{r['p50']:7.0f} {r['p95']:7.0f} {r['wall']:8.2f}")
+    latency = gateway.stats()["latency"]
+    print(f"Geçit histogramı (LLM süresi, kümülatif): {latency['buckets']}")
+
+    server.should_exit = True
+    await serving
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--queue", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+    asyncio.run(main(args.burst, args.distinct, args.concurrency, args.queue, args.timeout))
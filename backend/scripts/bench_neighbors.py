@@ -0,0 +1,52 @@
+"""
+Komşu tablosu kurulumunun çekirdek sayısıyla ölçeklenmesi (sentetik veri).
+Varsayılan: 1/2/4/8 worker × 10k/50k/100k film.
+Kullanım: python backend/scripts/bench_neighbors.py [--sizes 10000 50000] [--workers 1 2 4]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from scipy import sparse
+
+from backend.src.neighbors import build_neighbor_table
+
+
+def synthetic_catalog(n, vocab=5000, words_per_movie=25, seed=0):
+    """llm_metadata'ya benzer seyrek kelime sayımı matrisi + 3 sayısal özellik üretir."""
+    rng = np.random.default_rng(seed)
+    # Kelime sıklıkları Zipf'e yakın dağılsın (türler ve sık kelimeler çok filmde geçer)
+    cols = np.minimum(rng.zipf(1.3, size=n * words_per_movie), vocab) - 1
+    rows = np.repeat(np.arange(n), words_per_movie)
+    text = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, vocab))
+    numeric = rng.random((n, 3), dtype=np.float32)
+    return text, numeric
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--block-size", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"{'film':>8} | " + " | ".join(f"{w:>2} worker (sn / hız)" for w in args.workers))
+    for n in args.sizes:
+        text, numeric = synthetic_catalog(n)
+        base, cells = None, []
+        for w in args.workers:
+            t0 = time.perf_counter()
+            build_neighbor_table(text, numeric, k=args.k, block_size=args.block_size, workers=w)
+            elapsed = time.perf_counter() - t0
+            base = base or elapsed
+            cells.append(f"{elapsed:8.2f} / {base / elapsed:4.1f}x ")
+        print(f"{n:>8} | " + " | ".join(cells))
+
+if __name__ == "__main__":
+    main()
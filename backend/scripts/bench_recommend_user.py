@@ -0,0 +1,50 @@
+"""
+recommend_for_user gecikme ölçümü: eski çok sorgulu akış vs. tek sorgulu CTE akışı.
+Kullanım: python backend/scripts/bench_recommend_user.py [kullanıcı_sayısı] [tekrar]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import User
+from backend.src.recommender import engine as rec_engine
+from backend.test_recommend_pipeline import legacy_recommend_for_user
+
+
+def report(name, timings):
+    ms = np.array(timings) * 1000
+    print(f"{name:<12} n={len(ms):<5} p50={np.percentile(ms, 50):7.2f} ms  p99={np.percentile(ms, 99):7.2f} ms")
+
+
+async def main(n_users: int = 50, repeat: int = 3):
+    await init_db()
+    async with async_session_maker() as session:
+        user_ids = (await session.execute(select(User.user_id).limit(n_users))).scalars().all()
+
+    legacy, pipeline = [], []
+    for _ in range(repeat):
+        for uid in user_ids:
+            async with async_session_maker() as session:
+                t0 = time.perf_counter()
+                await legacy_recommend_for_user(session, uid)
+                legacy.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            await rec_engine.recommend_for_user(uid)
+            pipeline.append(time.perf_counter() - t0)
+
+    report("eski", legacy)
+    report("tek sorgu", pipeline)
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*args))
@@ -0,0 +1,73 @@
+"""
+Rastgele sayfalama gecikmesi: ORDER BY random() + OFFSET vs. seed'li shuffle_key örneklemesi
+(OFFSET ile ve önceki sayfanın cursor'ıyla). skip=0..1400 aralığında p50/p99 gecikmeyi ve
+sayfalar arası tekrar sayısını raporlar.
+Kullanım: python backend/scripts/bench_sampling.py [tekrar]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy.future import select
+from sqlalchemy import func
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie
+from backend.src.sampling import fetch_sampled_page, sampled_page
+
+SKIPS = [0, 100, 500, 1000, 1400]
+LIMIT = 20
+
+
+async def timed(session, stmt):
+    t0 = time.perf_counter()
+    movies = (await session.execute(stmt)).scalars().all()
+    return time.perf_counter() - t0, [m.movieId for m in movies]
+
+
+async def cursor_at(session, conditions, seed: int, skip: int):
+    """skip. satırdan başlayan sayfanın cursor'ı (önceki sayfalar cursor'la gezilerek)."""
+    cursor = None
+    for _ in range(skip // LIMIT):
+        _, cursor = await fetch_sampled_page(session, conditions, seed, cursor=cursor, limit=LIMIT)
+    return cursor
+
+
+async def main(repeat: int = 20):
+    await init_db()
+    conditions = [Movie.vote_average > 5.0]
+    print(f"{'skip':>6} | {'random() p50/p99 (ms)':>22} | {'seed OFFSET p50/p99':>19} | {'seed cursor p50/p99':>19}")
+    async with async_session_maker() as session:
+        for skip in SKIPS:
+            old, new, seek = [], [], []
+            for i in range(repeat):
+                stmt = select(Movie).where(*conditions).order_by(func.random()).offset(skip).limit(LIMIT)
+                old.append((await timed(session, stmt))[0])
+                new.append((await timed(session, sampled_page(conditions, seed=i, skip=skip, limit=LIMIT)))[0])
+                cursor = await cursor_at(session, conditions, i, skip)
+                t0 = time.perf_counter()
+                await fetch_sampled_page(session, conditions, i, cursor=cursor, limit=LIMIT)
+                seek.append(time.perf_counter() - t0)
+            old, new, seek = np.array(old) * 1000, np.array(new) * 1000, np.array(seek) * 1000
+            print(f"{skip:>6} | {np.percentile(old, 50):9.2f} / {np.percentile(old, 99):9.2f}  "
+                  f"| {np.percentile(new, 50):8.2f} / {np.percentile(new, 99):8.2f} "
+                  f"| {np.percentile(seek, 50):8.2f} / {np.percentile(seek, 99):8.2f}")
+
+        # İlk 5 sayfada tekrar eden film sayısı
+        seen_old, seen_new, dup_old, dup_new = set(), set(), 0, 0
+        for page in range(5):
+            _, ids = await timed(session, select(Movie).where(*conditions).order_by(func.random()).offset(page * LIMIT).limit(LIMIT))
+            dup_old += len(seen_old & set(ids)); seen_old |= set(ids)
+            _, ids = await timed(session, sampled_page(conditions, seed=42, skip=page * LIMIT, limit=LIMIT))
+            dup_new += len(seen_new & set(ids)); seen_new |= set(ids)
+        print(f"\n5 sayfada tekrar eden film: random()={dup_old}, seed={dup_new}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:2]]
+    asyncio.run(main(*args))
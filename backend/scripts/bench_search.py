@@ -0,0 +1,98 @@
+"""
+Arama kutusu yük testi: eşzamanlı kullanıcılar film adlarını insan hızında (tuş başına ~150 ms)
+yazar, her tuşta bir istek gider. ILIKE sorgusu ile bellek içi indeks (autocomplete ve search/query
+uç noktaları) p50/p99 gecikmesi karşılaştırılır. Ardından indeksin kendisi sentetik büyük katalogda ölçülür.
+Kullanım: python backend/scripts/bench_search.py [--users 30] [--keystroke-ms 150] [--catalog 100000]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+from backend.src.title_index import TitleIndex
+
+
+async def legacy_search(q):
+    """Eski /search/query: title / original_title üzerinde ILIKE '%q%'."""
+    async with async_session_maker() as session:
+        stmt = select(Movie).where(or_(Movie.title.ilike(f"%{q}%"), Movie.original_title.ilike(f"%{q}%"))).limit(50)
+        return (await session.execute(stmt)).scalars().all()
+
+
+async def typist(words, keystroke_s, call, timings):
+    """Bir kullanıcı: kelimeyi harf harf yazar, her harfte call(önek)."""
+    for i in range(1, len(words) + 1):
+        start = time.perf_counter()
+        await call(words[:i])
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(keystroke_s)
+
+
+async def load_test(client, queries, keystroke_s):
+    paths = {
+        "ILIKE (eski)": legacy_search,
+        "autocomplete": lambda q: client.get("/api/movies/search/autocomplete", params={"q": q}),
+        "search/query": lambda q: client.get("/api/movies/search/query", params={"q": q}),
+        # İkinci tur: sonuçların llm_metadata'sı artık katalogda (ilk turda DB'den yüklendi)
+        "search/query*": lambda q: client.get("/api/movies/search/query", params={"q": q}),
+    }
+    print(f"{len(queries)} eşzamanlı kullanıcı, tuş aralığı {keystroke_s * 1000:.0f} ms")
+    print(f"{'yol':<14} {'istek':>6} {'p50':>9} {'p99':>9}")
+    for name, call in paths.items():
+        timings = []
+        await asyncio.gather(*(typist(q, keystroke_s, call, timings) for q in queries))
+        print(f"{name:<14} {len(timings):>6} {np.percentile(timings, 50):>7.2f}ms {np.percentile(timings, 99):>7.2f}ms")
+
+
+def index_scale(titles, size, rng):
+    """Gerçek adların kelimeleri karıştırılarak üretilmiş size adlık katalogda indeks gecikmesi."""
+    words = [w for t in titles for w in t.split()]
+    names = [(" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))),) for _ in range(size)]
+    start = time.perf_counter()
+    index = TitleIndex(names, np.random.default_rng(0).pareto(1.5, size))
+    build_s = time.perf_counter() - start
+    timings = []
+    for name in rng.sample(names, 200):
+        text = name[0]
+        for i in range(1, len(text) + 1):
+            start = time.perf_counter()
+            index.candidates(text[:i], limit=8, fuzzy=False) or index.candidates(text[:i], limit=8)
+            timings.append((time.perf_counter() - start) * 1000)
+    print(f"\nİndeks, {size} ad: kurulum {build_s:.1f} sn, {len(timings)} tuş vuruşu "
+          f"p50 {np.percentile(timings, 50):.3f} ms, p99 {np.percentile(timings, 99):.3f} ms")
+
+
+async def main(users: int, keystroke_ms: float, catalog: int):
+    await init_db()
+    await rec_engine.refresh_data()
+    rng = random.Random(0)
+    titles = [t for t in rec_engine.catalog.strings["title"] if t]
+    queries = [rng.choice(titles).split(" (")[0][:14] for _ in range(users)]
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        await load_test(client, queries, keystroke_ms / 1000)
+    await engine.dispose()
+    if catalog:
+        index_scale(titles, catalog, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=30)
+    parser.add_argument("--keystroke-ms", type=float, default=150)
+    parser.add_argument("--catalog", type=int, default=100000)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.keystroke_ms, args.catalog))
@@ -0,0 +1,56 @@
+"""
+get_recommendations top-k mikro ölçümü: sorted(enumerate(satır)) vs. argpartition.
+Her katalog boyutu için sorgu başına süre ve tracemalloc ile en yüksek ek bellek.
+Kullanım: python backend/scripts/bench_topk.py [--sizes 1000 10000 100000] [--k 5]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+
+from backend.src.neighbors import top_k_row
+
+
+def old_top_k(row, idx, k):
+    """Eski yol: N tane (index, puan) tuple'ı + tam sıralama."""
+    sim_scores = sorted(list(enumerate(row)), key=lambda x: x[1], reverse=True)
+    return [x for x in sim_scores if x[0] != idx][:k]
+
+
+def measure(fn, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - t0) / repeat
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'film':>8} | {'eski (ms / KB)':>20} | {'argpartition (ms / KB)':>24} | hız")
+    for n in args.sizes:
+        row = rng.random(n, dtype=np.float32)
+        idx = int(rng.integers(n))
+        repeat = max(3, 200_000 // n)
+        old_t, old_mem = measure(lambda: old_top_k(row, idx, args.k), repeat)
+        new_t, new_mem = measure(lambda: top_k_row(row, args.k, exclude=idx), repeat)
+        print(f"{n:>8} | {old_t * 1000:10.3f} / {old_mem / 1024:8.0f} | "
+              f"{new_t * 1000:12.3f} / {new_mem / 1024:8.0f} | {old_t / new_t:6.0f}x")
+
+if __name__ == "__main__":
+    main()
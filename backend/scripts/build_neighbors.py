@@ -0,0 +1,46 @@
+"""
+İçerik benzerliği komşu tablosunu kurar ve artifact olarak diske yazar (build adımı / gecelik yeniden kurulum).
+v3 artifact'i (backend/data/artifacts/recommender-v3) depoya eklenir ve deploy ile gönderilir; API süreçleri
+onu salt okunur mmap ile açar, yeniden hesaplamaz ve diske yazmaz. CSV değişince bu komut yeniden çalıştırılmalı.
+Kullanım: python backend/scripts/build_neighbors.py --engine v3 --workers 4 --k 50 [--out DİZİN]
+"""
+import argparse
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+DATA_DIR = root_path / "backend" / "data"
+DEFAULT_DATA = {
+    "v1": DATA_DIR / "movies (1).csv",
+    "v2": DATA_DIR / "movies_with_metadata.csv",
+    "v3": DATA_DIR / "movies_with_metadata.csv",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CineMatch komşu tablosu kurulumu")
+    parser.add_argument("--engine", choices=sorted(DEFAULT_DATA), default="v3", help="Hangi recommender sürümü")
+    parser.add_argument("--data", default=None, help="Film CSV dosyası (varsayılan: motorun kendi veri seti)")
+    parser.add_argument("--out", default=None, help="Artifact dizini (varsayılan: backend/data/artifacts/<motor>)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Paralel süreç sayısı")
+    parser.add_argument("--k", type=int, default=50, help="Film başına tutulacak komşu sayısı")
+    args = parser.parse_args()
+
+    module = importlib.import_module(f"backend.src.recommender{args.engine}")
+    motor = module.MovieRecommender(str(args.data or DEFAULT_DATA[args.engine]))
+    motor.load_data()
+    if motor.df is None:
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    motor.create_similarity_matrix(k=args.k, workers=args.workers)
+    print(f" Kurulum süresi: {time.perf_counter() - t0:.2f} sn ({args.workers} worker)")
+    motor.save_artifact(args.out)
+
+if __name__ == "__main__":
+    main()
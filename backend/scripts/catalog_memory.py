@@ -0,0 +1,55 @@
+"""
+Katalog anlık görüntüsünün bellek kullanımını ORM nesneleriyle karşılaştırır, 10k film başına raporlar.
+Kullanım: python backend/scripts/catalog_memory.py
+"""
+import asyncio
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from sqlalchemy.future import select
+
+from backend.src.catalog import Catalog
+from backend.src.db_pg import engine, async_session_maker
+from backend.src.models_pg import Movie
+
+
+async def measured(load):
+    """load() sonucunun tuttuğu bellek (tracemalloc, sonuç canlıyken)."""
+    gc.collect()
+    tracemalloc.start()
+    result = await load()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+async def main():
+    async with async_session_maker() as session:
+        async def load_orm():
+            return (await session.execute(select(Movie))).scalars().all()
+        movies, orm_bytes = await measured(load_orm)
+        n = len(movies)
+        session.expunge_all()
+        del movies
+
+        catalog, catalog_bytes = await measured(lambda: Catalog.load(session))
+        await catalog.load_metadata(session, catalog.movie_ids.tolist())
+    await engine.dispose()
+
+    per_10k = lambda b: b * 10000 / max(n, 1) / 2 ** 20
+    print(f"{n} film")
+    print(f"ORM nesneleri (llm_metadata dahil): {per_10k(orm_bytes):7.2f} MB / 10k film")
+    print(f"Katalog (llm_metadata hariç):        {per_10k(catalog_bytes):7.2f} MB / 10k film")
+    print("\nSütun bazında (llm_metadata tamamı yüklenmiş hâliyle):")
+    report = catalog.memory_report()
+    for name, size in sorted(report.items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<18} {per_10k(size):7.3f} MB / 10k film")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
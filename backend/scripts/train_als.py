@@ -0,0 +1,61 @@
+"""
+Implicit ALS modelini interactions tablosundaki beğenilerle çevrimdışı eğitir ve
+float32 kullanıcı / film faktörlerini artifact olarak yazar (API açılışta mmap ile okur).
+Kullanım: python backend/scripts/train_als.py --factors 32 --iterations 10 --reg 0.1 --alpha 40 [--out DİZİN]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(root_path))
+
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, async_session_maker
+from backend.src.models_pg import Interaction, Movie
+from backend.src.als import ALSModel, ARTIFACT_DIR
+
+
+async def load_likes():
+    """Beğeni çiftleri (user_id, movie_id) ve film kataloğu."""
+    async with async_session_maker() as session:
+        likes = (await session.execute(
+            select(Interaction.user_id, Interaction.movie_id)
+            .where(Interaction.is_liked == True)
+            .where(Interaction.user_id.isnot(None))
+            .where(Interaction.movie_id.isnot(None))
+        )).all()
+        catalog = (await session.execute(select(Movie.movieId))).scalars().all()
+    await engine.dispose()
+    return likes, catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CineMatch implicit ALS eğitimi")
+    parser.add_argument("--factors", type=int, default=32, help="Gizli faktör sayısı")
+    parser.add_argument("--iterations", type=int, default=10, help="ALS iterasyon sayısı")
+    parser.add_argument("--reg", type=float, default=0.1, help="L2 düzenlileştirme (lambda)")
+    parser.add_argument("--alpha", type=float, default=40.0, help="Güven katsayısı: c = 1 + alpha * r")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help=f"Artifact dizini (varsayılan: {ARTIFACT_DIR})")
+    args = parser.parse_args()
+
+    likes, catalog = asyncio.run(load_likes())
+    if not likes:
+        print(" Beğeni bulunamadı, eğitim yapılmadı.")
+        sys.exit(1)
+    user_ids, movie_ids = zip(*likes)
+    print(f" {len(likes)} beğeni, {len(set(user_ids))} kullanıcı, {len(catalog)} film")
+
+    t0 = time.perf_counter()
+    model, params = ALSModel.fit(user_ids, movie_ids, catalog, factors=args.factors, iterations=args.iterations,
+                                 reg=args.reg, alpha=args.alpha, seed=args.seed)
+    print(f" Toplam eğitim süresi: {time.perf_counter() - t0:.2f} sn")
+    model.save(args.out, params)
+    print(f" Artifact kaydedildi: {args.out or ARTIFACT_DIR}")
+
+if __name__ == "__main__":
+    main()
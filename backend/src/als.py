@@ -0,0 +1,143 @@
+# Implicit ALS (Hu, Koren, Volinsky 2008) - sadece NumPy; çevrimdışı eğitim, çevrimiçi tek matvec
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+
+from backend.src import artifacts
+from backend.src.item_cf import positions
+from backend.src.neighbors import top_k_row
+
+ENGINE_NAME = "als"
+ARTIFACT_DIR = os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+
+
+def _solve_rows(matrix, fixed, reg):
+    """
+    Diğer taraf (fixed) sabitken her satır için kapalı form çözüm:
+    x_u = (YᵀY + Yᵀ(C_u - I)Y + λI)⁻¹ Yᵀ C_u p_u
+    matrix.data = güven - 1 (alpha * r), p_u = etkileşim olan yerlerde 1.
+    YᵀY tüm satırlar için bir kez hesaplanır; satır başına sadece etkileşimli öğeler işlenir.
+    """
+    factors = fixed.shape[1]
+    gram = fixed.T @ fixed + reg * np.eye(factors)
+    out = np.zeros((matrix.shape[0], factors), dtype=np.float64)
+    for row in range(matrix.shape[0]):
+        start, stop = matrix.indptr[row], matrix.indptr[row + 1]
+        if start == stop:
+            continue
+        out[row] = _fold(fixed, gram, matrix.indices[start:stop], matrix.data[start:stop])
+    return out
+
+
+def _fold(fixed, gram, idx, confidence):
+    """Tek bir satırın (kullanıcının) vektörü; gram = YᵀY + λI."""
+    y = np.asarray(fixed[idx], dtype=np.float64)
+    a = gram + (y.T * confidence) @ y
+    b = y.T @ (confidence + 1.0)
+    return np.linalg.solve(a, b)
+
+
+def train_als(user_rows, item_cols, n_users, n_items, factors=32, iterations=10, reg=0.1, alpha=40.0,
+              seed=0, log=print):
+    """
+    (kullanıcı satırı, film sütunu) beğeni çiftlerinden kullanıcı ve film faktörlerini eğitir.
+    Dönüş: (user_factors float32 [U, f], item_factors float32 [I, f], iterasyon süreleri).
+    """
+    confidence = sparse.csr_matrix(
+        (np.full(len(user_rows), alpha, dtype=np.float64), (user_rows, item_cols)), shape=(n_users, n_items)
+    )
+    confidence.data[:] = alpha  # Tekrarlayan çiftler toplanmasın
+    by_item = confidence.T.tocsr()
+
+    rng = np.random.default_rng(seed)
+    users = rng.normal(scale=0.01, size=(n_users, factors))
+    items = rng.normal(scale=0.01, size=(n_items, factors))
+    timings = []
+    for it in range(iterations):
+        start = time.perf_counter()
+        users = _solve_rows(confidence, items, reg)
+        items = _solve_rows(by_item, users, reg)
+        timings.append(time.perf_counter() - start)
+        if log:
+            log(f" İterasyon {it + 1}/{iterations}: {timings[-1]:.2f} sn")
+    return users.astype(np.float32), items.astype(np.float32), timings
+
+
+class ALSModel:
+    """Eğitilmiş faktörleri mmap ile açar; kullanıcıyı tek matvec + argpartition ile puanlar."""
+
+    def __init__(self, user_ids, movie_ids, user_factors, item_factors, params):
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)      # Sıralı
+        self.movie_ids = np.asarray(movie_ids, dtype=np.int64)    # Sıralı
+        self.user_factors = user_factors
+        self.item_factors = item_factors
+        self.reg = float(params.get("reg", 0.1))
+        self.alpha = float(params.get("alpha", 40.0))
+        self._gram = None
+
+    @classmethod
+    def fit(cls, user_ids, movie_ids, catalog_movie_ids, factors=32, iterations=10, reg=0.1, alpha=40.0,
+            seed=0, log=print):
+        """(user_id, movie_id) beğeni çiftlerinden modeli eğitir; film sütunları katalogdaki ID'lerdir."""
+        catalog = np.unique(np.asarray(catalog_movie_ids, dtype=np.int64))
+        user_index = np.unique(np.asarray(user_ids, dtype=np.int64))
+        rows = positions(user_index, user_ids)
+        cols = positions(catalog, movie_ids)
+        known = cols >= 0
+        user_factors, item_factors, timings = train_als(
+            rows[known], cols[known], len(user_index), len(catalog),
+            factors=factors, iterations=iterations, reg=reg, alpha=alpha, seed=seed, log=log,
+        )
+        params = {"factors": factors, "iterations": iterations, "reg": reg, "alpha": alpha,
+                  "interactions": int(known.sum()), "iteration_seconds": [round(t, 4) for t in timings]}
+        return cls(user_index, catalog, user_factors, item_factors, params), params
+
+    @classmethod
+    def load(cls, artifact_dir: str = None):
+        """Artifact'i açar; yoksa FileNotFoundError."""
+        arrays, manifest = artifacts.load_artifact(artifact_dir or ARTIFACT_DIR, ENGINE_NAME)
+        return cls(arrays["user_ids"], arrays["movie_ids"], arrays["user_factors"], arrays["item_factors"],
+                   manifest["params"])
+
+    def save(self, artifact_dir: str = None, params=None):
+        arrays = {
+            "user_ids": self.user_ids, "movie_ids": self.movie_ids,
+            "user_factors": np.asarray(self.user_factors, dtype=np.float32),
+            "item_factors": np.asarray(self.item_factors, dtype=np.float32),
+        }
+        return artifacts.save_artifact(artifact_dir or ARTIFACT_DIR, arrays, ENGINE_NAME, None, params)
+
+    def fold_in(self, liked_movie_ids):
+        """
+        Eğitimden sonra kaydolan kullanıcı için vektör: film faktörleri sabitken
+        eğitimdeki kullanıcı adımının aynısı (tek bir f×f çözüm).
+        """
+        idx = positions(self.movie_ids, liked_movie_ids)
+        idx = idx[idx >= 0]
+        if len(idx) == 0:
+            return None
+        if self._gram is None:
+            items = np.asarray(self.item_factors, dtype=np.float64)
+            self._gram = items.T @ items + self.reg * np.eye(items.shape[1])
+        confidence = np.full(len(idx), self.alpha)
+        return _fold(self.item_factors, self._gram, idx, confidence).astype(np.float32)
+
+    def user_vector(self, user_id, liked_movie_ids=()):
+        """Eğitimde görülen kullanıcı için kayıtlı vektör, değilse fold-in (beğenisi yoksa None)."""
+        row = positions(self.user_ids, [user_id])[0]
+        if row >= 0 and np.any(self.user_factors[row]):
+            return np.asarray(self.user_factors[row])
+        return self.fold_in(liked_movie_ids)
+
+    def recommend(self, user_id, liked_movie_ids=(), exclude_movie_ids=(), limit: int = 500):
+        """Kullanıcının en yüksek puanlı limit filmi (ID'ler); exclude (izlenenler) hariç."""
+        vector = self.user_vector(user_id, liked_movie_ids)
+        if vector is None:
+            return np.empty(0, dtype=np.int64)
+        scores = self.item_factors @ vector
+        excluded = positions(self.movie_ids, exclude_movie_ids)
+        scores[excluded[excluded >= 0]] = -np.inf
+        top, top_scores = top_k_row(scores, limit)
+        return self.movie_ids[top[np.isfinite(top_scores)]]
@@ -0,0 +1,194 @@
+# Diske kaydedilen, mmap ile açılan benzerlik artifact'leri - her açılışta CSV'den yeniden hesaplamamak için
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"  # Artifact dizininde geçerli sürüm klasörünün adını tutan işaretçi dosya
+KEEP_VERSIONS = 2  # Yeni sürüm yazılınca geçerli + bir önceki sürüm tutulur, daha eskiler silinir
+ARTIFACT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "artifacts")
+
+
+class StaleArtifactError(ValueError):
+    """Artifact, kaynak CSV'ye, format sürümüne veya motor sürümüne uymuyor."""
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_info(path):
+    stat = os.stat(path)
+    return {"path": os.path.basename(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def current_version(artifact_dir):
+    """CURRENT işaretçisinin gösterdiği sürüm klasörünün yolu; işaretçi yoksa FileNotFoundError."""
+    try:
+        with open(os.path.join(artifact_dir, CURRENT), encoding="utf-8") as file:
+            return os.path.join(artifact_dir, file.read().strip())
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Artifact bulunamadı: {artifact_dir}") from None
+
+
+def _prune_versions(out_dir, keep):
+    """keep dışındaki eski sürüm klasörlerini siler (açık mmap'ler POSIX'te silinmeden etkilenmez)."""
+    versions = sorted(
+        (entry for entry in os.scandir(out_dir) if entry.is_dir() and not entry.name.startswith(".")),
+        key=lambda entry: entry.name,
+    )
+    for entry in versions[:-KEEP_VERSIONS]:
+        if entry.name not in keep:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def save_artifact(out_dir, arrays, engine, source_path, params=None):
+    """
+    Dizileri out_dir altında yeni bir sürüm klasörüne .npy olarak, manifest.json ile birlikte yazar;
+    sonra out_dir/CURRENT işaretçisini os.replace ile (atomik) yeni sürüme çevirir.
+    Geçerli sürüm hiçbir an silinmez ya da yarım görünmez: okuyanlar ya eski ya yeni sürümü açar.
+    source_path None ise (ör. DB'den eğitilen modeller) kaynak dosya kaydı tutulmaz.
+    Çalışan API yazmaz; artifact build adımında kurulur (bkz. scripts/build_neighbors.py, train_als.py).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging_", dir=out_dir)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "engine": engine,
+            "params": params or {},
+            "source": {**_source_info(source_path), "sha256": file_checksum(source_path)} if source_path else None,
+            "arrays": {name: {"dtype": str(a.dtype), "shape": list(a.shape)} for name, a in arrays.items()},
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2, ensure_ascii=False)
+
+        # Sürüm adı zamana (ns) göre sıralanır; iki kurulum aynı anda bitse de çakışmasın diye sona rastgele ek
+        now = time.time_ns()
+        suffix = os.path.basename(staging)[len(".staging_"):]
+        version = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(now // 10**9))}.{now % 10**9:09d}-{suffix}"
+        os.chmod(staging, 0o755)
+        os.replace(staging, os.path.join(out_dir, version))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    fd, pointer = tempfile.mkstemp(prefix=".current_", dir=out_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.write(version)
+    os.chmod(pointer, 0o644)
+    os.replace(pointer, os.path.join(out_dir, CURRENT))
+    _prune_versions(out_dir, keep={version})
+    return manifest
+
+
+def load_artifact(artifact_dir, engine, source_path=None):
+    """
+    Artifact'in CURRENT sürümünü salt okunur açar; diziler numpy.load(mmap_mode="r") ile döner, yani
+    sayfa önbelleği üzerinden tüm süreçler (uvicorn worker'ları) aynı fiziksel belleği paylaşır.
+    source_path verilirse CSV değişmişse StaleArtifactError fırlatır.
+    """
+    artifact_dir = current_version(artifact_dir)
+    manifest_path = os.path.join(artifact_dir, MANIFEST)
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Artifact bulunamadı: {artifact_dir}")
+    with open(manifest_path, encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise StaleArtifactError(f"Artifact format sürümü uyumsuz: {manifest.get('format_version')} != {FORMAT_VERSION}")
+    if manifest.get("engine") != engine:
+        raise StaleArtifactError(f"Artifact başka bir motor için kurulmuş: {manifest.get('engine')} != {engine}")
+
+    if source_path is not None and manifest.get("source"):
+        source = manifest["source"]
+        current = _source_info(source_path)
+        # Boyut ve zaman damgası aynıysa dosyayı yeniden hashlemeye gerek yok
+        unchanged = current["size"] == source["size"] and current["mtime_ns"] == source["mtime_ns"]
+        if not unchanged and file_checksum(source_path) != source["sha256"]:
+            raise StaleArtifactError(f"Kaynak veri değişmiş, artifact eski: {source_path}")
+
+    arrays = {
+        name: np.load(os.path.join(artifact_dir, f"{name}.npy"), mmap_mode="r", allow_pickle=False)
+        for name in manifest["arrays"]
+    }
+    return arrays, manifest
+
+
+def sparse_to_arrays(prefix, matrix):
+    """CSR matrisini artifact'e yazılabilecek düz dizilere ayırır."""
+    matrix = sparse.csr_matrix(matrix)
+    return {
+        f"{prefix}_data": matrix.data,
+        f"{prefix}_indices": matrix.indices,
+        f"{prefix}_indptr": matrix.indptr,
+        f"{prefix}_shape": np.asarray(matrix.shape, dtype=np.int64),
+    }
+
+
+def arrays_to_sparse(prefix, arrays):
+    """sparse_to_arrays'in tersi; veriyi kopyalamadan (mmap üzerinde) CSR kurar."""
+    shape = tuple(int(x) for x in arrays[f"{prefix}_shape"])
+    return sparse.csr_matrix(
+        (arrays[f"{prefix}_data"], arrays[f"{prefix}_indices"], arrays[f"{prefix}_indptr"]),
+        shape=shape, copy=False,
+    )
+
+
+def engine_arrays(motor, id_column):
+    """
+    Bir MovieRecommender'ın artifact'e girecek ortak dizilerini toplar:
+    komşu tablosu, satır-normalize özellik matrisi ve film ID / başlık tabloları.
+    """
+    arrays = {
+        "neighbor_indices": motor.neighbor_indices,
+        "neighbor_scores": motor.neighbor_scores,
+        "movie_ids": motor.df[id_column].to_numpy(dtype=np.int64),
+        "titles": motor.df['title'].fillna('').astype(str).to_numpy(dtype=str),
+        "original_titles": motor.df['original_title'].fillna('').astype(str).to_numpy(dtype=str),
+        **sparse_to_arrays("features", motor.feature_matrix),
+    }
+    if "popularity" in motor.df.columns:
+        # Başlık aramasında aynı adlı filmleri popülerliğe göre sıralamak için
+        arrays["popularity"] = motor.df['popularity'].fillna(0).to_numpy(dtype=np.float64)
+    if getattr(motor, "numeric", None) is not None:
+        arrays["numeric"] = np.asarray(motor.numeric, dtype=np.float32)
+    return arrays
+
+
+def restore_engine(motor, arrays, manifest, id_column):
+    """
+    Artifact dizilerini bir MovieRecommender'a bağlar; CSV okumadan sorguya hazır hale getirir.
+    Komşu tablosu, özellik matrisi (CSR) ve sayısal özellikler (motor.numeric) mmap olarak kalır ve
+    recommend / recommend_batch bunları doğrudan okur: worker'lar arasında paylaşılır.
+    motor.df sadece ID / başlık / popülerlik tablosudur (kayıt üretimi ve başlık indeksi Python
+    string'leri ister); her worker'ın kendi kopyasıdır (bkz. scripts/artifact_memory.py).
+    """
+    motor.neighbor_indices = arrays["neighbor_indices"]
+    motor.neighbor_scores = arrays["neighbor_scores"]
+    motor.feature_matrix = arrays_to_sparse("features", arrays)
+    motor.numeric = arrays.get("numeric")
+    motor.df = pd.DataFrame({
+        id_column: arrays["movie_ids"],
+        "title": arrays["titles"],
+        "original_title": arrays["original_titles"],
+    })
+    if "popularity" in arrays:
+        motor.df["popularity"] = np.asarray(arrays["popularity"])
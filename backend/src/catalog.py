@@ -0,0 +1,151 @@
+# Salt okunur film kataloğu - liste/detay uç noktaları her istekte ORM nesnesi yüklemesin diye
+import sys
+
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.models_pg import Movie
+
+FLOAT_COLUMNS = ("popularity", "vote_average", "avg_rating")      # NaN = NULL
+INT_COLUMNS = ("runtime", "rating_count", "tmdbId")                 # INT_NULL = NULL
+STR_COLUMNS = ("title", "original_title", "original_language", "release_date", "poster_url", "imdbId")
+INT_NULL = np.iinfo(np.int32).min
+
+# get_movie_by_id'nin döndüğü alanlar (eski m.__dict__ çıktısıyla aynı anahtarlar)
+RECORD_FIELDS = ("movieId",) + STR_COLUMNS[:4] + ("popularity", "runtime", "vote_average", "rating_count",
+                                                  "poster_url", "avg_rating", "imdbId", "tmdbId", "llm_metadata")
+
+
+class Catalog:
+    """
+    Film satırlarının sütun sütun tutulduğu anlık görüntü: sayılar NumPy dizilerinde,
+    metinler intern edilmiş Python listelerinde (aynı dil kodu / tarih tek nesne).
+    llm_metadata başlangıçta yüklenmez; bir film ilk istendiğinde tek sorguyla çekilip saklanır.
+    """
+
+    def __init__(self):
+        self.movie_ids = np.empty(0, dtype=np.int64)  # Sıralı
+        self.floats = {name: np.empty(0, dtype=np.float64) for name in FLOAT_COLUMNS}
+        self.ints = {name: np.empty(0, dtype=np.int32) for name in INT_COLUMNS}
+        self.strings = {name: [] for name in STR_COLUMNS}
+        self.metadata = {}  # movie_id -> llm_metadata (yüklenenler)
+        self.is_ready = False
+
+    @classmethod
+    def from_rows(cls, rows):
+        """(movieId, *FLOAT_COLUMNS, *INT_COLUMNS, *STR_COLUMNS) satırlarından, movieId'ye göre sıralı."""
+        catalog = cls()
+        rows = sorted(rows, key=lambda r: r[0])
+        columns = list(zip(*rows)) if rows else [()] * (1 + len(FLOAT_COLUMNS) + len(INT_COLUMNS) + len(STR_COLUMNS))
+        catalog.movie_ids = np.asarray(columns[0], dtype=np.int64)
+        offset = 1
+        for name in FLOAT_COLUMNS:
+            catalog.floats[name] = np.asarray(columns[offset], dtype=np.float64)  # None -> NaN
+            offset += 1
+        for name in INT_COLUMNS:
+            catalog.ints[name] = np.array([INT_NULL if v is None else v for v in columns[offset]], dtype=np.int32)
+            offset += 1
+        for name in STR_COLUMNS:
+            catalog.strings[name] = [None if v is None else sys.intern(v) for v in columns[offset]]
+            offset += 1
+        catalog.is_ready = True
+        return catalog
+
+    @classmethod
+    async def load(cls, session):
+        """Movie tablosundan (llm_metadata hariç) anlık görüntüyü kurar."""
+        columns = [Movie.movieId] + [getattr(Movie, name) for name in FLOAT_COLUMNS + INT_COLUMNS + STR_COLUMNS]
+        rows = (await session.execute(select(*columns).order_by(Movie.movieId))).all()
+        return cls.from_rows(rows)
+
+    def positions(self, movie_ids):
+        """Film ID'lerini pozisyonlara çevirir; katalogda olmayanlar -1."""
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        if len(self.movie_ids) == 0:
+            return np.full(len(movie_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.movie_ids, movie_ids), len(self.movie_ids) - 1)
+        return np.where(self.movie_ids[pos] == movie_ids, pos, -1)
+
+    async def load_metadata(self, session, movie_ids):
+        """Katalogdaki filmlerin henüz yüklenmemiş llm_metadata değerlerini tek sorguda çeker."""
+        movie_ids = [int(mid) for mid in movie_ids]
+        known = self.positions(movie_ids) >= 0
+        missing = [mid for mid, ok in zip(movie_ids, known) if ok and mid not in self.metadata]
+        if missing:
+            result = await session.execute(
+                select(Movie.movieId, Movie.llm_metadata).where(Movie.movieId.in_(missing))
+            )
+            self.metadata.update(result.all())
+
+    def _value(self, name, pos):
+        if name in self.floats:
+            value = self.floats[name][pos]
+            return None if np.isnan(value) else float(value)
+        if name in self.ints:
+            value = self.ints[name][pos]
+            return None if value == INT_NULL else int(value)
+        return self.strings[name][pos]
+
+    def record(self, movie_id):
+        """Tek filmin tüm alanları (eski ORM __dict__ çıktısıyla aynı); yoksa None."""
+        pos = self.positions([movie_id])[0]
+        if pos < 0:
+            return None
+        record = {"_id": str(movie_id), "movieId": int(movie_id)}
+        for name in RECORD_FIELDS[1:-1]:
+            record[name] = self._value(name, pos)
+        record["llm_metadata"] = self.metadata.get(int(movie_id))
+        return record
+
+    def records(self, movie_ids):
+        """Birden çok film için record(); katalogda olmayanlar atlanır, sıra korunur."""
+        return [r for r in (self.record(mid) for mid in movie_ids) if r is not None]
+
+    async def get_records(self, session, movie_ids):
+        """records(), eksik llm_metadata'lar yüklendikten sonra."""
+        await self.load_metadata(session, movie_ids)
+        return self.records(movie_ids)
+
+    async def get_cards(self, session, movie_ids):
+        """cards(), eksik llm_metadata'lar yüklendikten sonra."""
+        await self.load_metadata(session, movie_ids)
+        return self.cards(movie_ids)
+
+    def cards(self, movie_ids):
+        """Öneri kartları (CineMatchEngine._format_movies ile aynı biçim); sütunlar toplu okunur."""
+        movie_ids = [int(mid) for mid in movie_ids]
+        pos = self.positions(movie_ids)
+        found = pos >= 0
+        ids, pos = [mid for mid, ok in zip(movie_ids, found) if ok], pos[found]
+        f = {name: np.nan_to_num(self.floats[name][pos]).tolist() for name in FLOAT_COLUMNS}
+        rating_count = self.ints["rating_count"][pos]
+        rating_count = np.where(rating_count == INT_NULL, 0, rating_count).tolist()
+        s = self.strings
+        return [
+            {
+                "movieId": mid,
+                "_id": str(mid),
+                "title": s["title"][p],
+                "original_language": s["original_language"][p] or "en",
+                "vote_average": f["vote_average"][i],
+                "release_date": s["release_date"][p] or "",
+                "poster_url": s["poster_url"][p] or "",
+                "popularity": f["popularity"][i],
+                "llm_metadata": self.metadata.get(mid) or "",
+                "avg_rating": f["avg_rating"][i],
+                "rating_count": rating_count[i],
+            }
+            for i, (mid, p) in enumerate(zip(ids, pos.tolist()))
+        ]
+
+    def memory_report(self):
+        """Sütun başına bayt (metinlerde aynı nesne bir kez sayılır) ve toplam."""
+        report = {"movie_ids": self.movie_ids.nbytes}
+        for name, array in {**self.floats, **self.ints}.items():
+            report[name] = array.nbytes
+        for name, values in self.strings.items():
+            unique = {id(v): v for v in values if v is not None}
+            report[name] = sys.getsizeof(values) + sum(sys.getsizeof(v) for v in unique.values())
+        report["llm_metadata"] = sys.getsizeof(self.metadata) + sum(sys.getsizeof(v) for v in self.metadata.values())
+        report["total"] = sum(report.values())
+        return report
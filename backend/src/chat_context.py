@@ -0,0 +1,105 @@
+# Sohbet bağlamı - LLM promptu için kullanıcı, geçmiş ve aday filmler (etkileşim başına sorgu yok)
+import asyncio
+from typing import List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.future import select
+
+from backend.src.db_pg import async_session_maker
+from backend.src.genre_catalog import genre_catalog
+from backend.src.models_pg import User, Interaction, Movie
+
+CANDIDATE_LIMIT = 15
+CANDIDATE_MIN_VOTE = 6.0
+
+
+class ChatContext(BaseModel):
+    """Prompta giren her şey; tek kullanıcı, tek mesaj için kurulur."""
+    user_id: int
+    fav_genre_names: List[str] = []
+    liked_metadata: List[str] = []      # Beğenilen filmlerin llm_metadata'sı (yoksa adı), etkileşim sırasıyla
+    disliked_ids: List[int] = []
+    watched_ids: List[int] = []
+    candidates: List[str] = []          # Aday filmlerin llm_metadata'sı (yoksa adı), popülerlik sırasıyla
+
+    @property
+    def candidate_context(self) -> str:
+        return "\n".join(self.candidates)
+
+
+def movie_text(title, llm_metadata) -> str:
+    """Prompttaki film satırı: llm_metadata varsa o, yoksa film adı."""
+    return str(llm_metadata) if llm_metadata else str(title)
+
+
+def _user_stmt(user_id):
+    return select(User.selected_genres).where(User.user_id == user_id)
+
+
+def _history_stmt(user_id):
+    """Kullanıcının tüm etkileşimleri ve filmlerinin metni tek join'li sorguda (film silinmişse None)."""
+    return (
+        select(Interaction.movie_id, Interaction.is_liked, Movie.movieId, Movie.title, Movie.llm_metadata)
+        .outerjoin(Movie, Movie.movieId == Interaction.movie_id)
+        .where(Interaction.user_id == user_id)
+        .order_by(Interaction.id)
+    )
+
+
+def _candidates_stmt(user_id):
+    """İzlenmemiş, puanı eşiğin üstündeki en popüler filmler; izlenenler alt sorguyla DB'de çıkarılır."""
+    watched = (
+        select(Interaction.movie_id)
+        .where(Interaction.user_id == user_id)
+        .where(Interaction.movie_id.isnot(None))
+    )
+    return (
+        select(Movie.title, Movie.llm_metadata)
+        .where(Movie.movieId.notin_(watched), Movie.vote_average > CANDIDATE_MIN_VOTE)
+        .order_by(Movie.popularity.desc())
+        .limit(CANDIDATE_LIMIT)
+    )
+
+
+async def _fetch_rows(user_id: int):
+    """
+    Kullanıcı, geçmiş ve aday sorguları tek oturumda (tek havuz bağlantısı) sırayla çalışır.
+    Kullanıcı yoksa diğer iki sorgu hiç gönderilmez: (None, None, None).
+    """
+    async with async_session_maker() as session:
+        user_rows = (await session.execute(_user_stmt(user_id))).all()
+        if not user_rows:
+            return None, None, None
+        history = (await session.execute(_history_stmt(user_id))).all()
+        candidates = (await session.execute(_candidates_stmt(user_id))).all()
+    return user_rows, history, candidates
+
+
+async def build_chat_context(user_id: int) -> Optional[ChatContext]:
+    """
+    Kullanıcı, etkileşim geçmişi ve aday havuzu tek bağlantıda en fazla üç sorguyla çekilir
+    (geçmiş uzunluğundan bağımsız); tür adları bu sırada önbellekten (genre_catalog) hazırlanır.
+    Mesaj başına havuzdan tek bağlantı alınır, küçük havuzlar eşzamanlı sohbetlerde tükenmez.
+    Kullanıcı yoksa None.
+    """
+    (user_rows, history, candidates), genres = await asyncio.gather(
+        _fetch_rows(user_id),
+        genre_catalog.ensure(),
+    )
+    if user_rows is None:
+        return None
+
+    context = ChatContext(
+        user_id=user_id,
+        fav_genre_names=genres.names_of(user_rows[0].selected_genres),
+        candidates=[movie_text(title, metadata) for title, metadata in candidates],
+    )
+    for movie_id, is_liked, found, title, metadata in history:
+        context.watched_ids.append(movie_id)
+        if found is None:
+            continue
+        if is_liked:
+            context.liked_metadata.append(movie_text(title, metadata))
+        elif is_liked is False:
+            context.disliked_ids.append(movie_id)
+    return context
@@ -0,0 +1,144 @@
+# Yerel sahte LLM - ağ ve API anahtarı olmadan sohbet akışını (ilk bayta kadar geçen süre, iptal) ölçmek/test etmek için
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.requests import ClientDisconnect
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+DEFAULT_REPLY = (
+    "Listendeki filmlere bakınca atmosferi güçlü, karakter odaklı hikâyeleri sevdiğini görüyorum. "
+    "Aday listesinden **{title}** tam sana göre: temposu ve anlatımıyla listendeki favorilerine çok yakın.\n\n"
+    "Bir de daha hafif bir şey istersen, yine aday listesinden popüler bir seçimle devam edebiliriz."
+)
+
+
+def _first_candidate(messages) -> str:
+    """Sistem promptundaki ADAY LİSTESİ'nin ilk satırı (yanıt bağlama göre değişsin diye)."""
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    tail = system.split("ADAY LİSTESİ:", 1)[-1].strip().splitlines()
+    return (tail[0].strip()[:60] if tail else "") or "Inception"
+
+
+class FakeStream:
+    """openai.AsyncStream gibi: ChatCompletionChunk'ları gecikmeli üreten, close() ile iptal edilebilen akış."""
+
+    def __init__(self, tokens, model: str, first_token_ms: float, token_ms: float):
+        self.tokens = tokens
+        self.model = model
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.sent = 0          # Gönderilen parça sayısı
+        self.closed = False
+
+    def _chunk(self, content=None, finish_reason=None):
+        return ChatCompletionChunk(
+            id="fake", created=int(time.time()), model=self.model, object="chat.completion.chunk",
+            choices=[{"index": 0, "delta": {"content": content} if content is not None else {},
+                      "finish_reason": finish_reason}],
+        )
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await asyncio.sleep(self.first_token_ms / 1000)
+        for i, token in enumerate(self.tokens):
+            if self.closed:
+                return
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            self.sent += 1
+            yield self._chunk(token)
+        yield self._chunk(finish_reason="stop")
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeLLMClient:
+    """
+    AsyncOpenAI'nin kullandığımız kısmının (chat.completions.create, stream=True/False) yerel taklidi.
+    İlk parça first_token_ms sonra, sonrakiler token_ms arayla gelir; stream=False ise tamamı bekletilip döner.
+    Oluşturulan akışlar streams listesinde tutulur (testler iptali buradan kontrol eder);
+    active / peak, aynı anda işlenen stream=False çağrılarını sayar.
+    """
+
+    def __init__(self, first_token_ms: float = 400, token_ms: float = 25, reply: str = DEFAULT_REPLY):
+        self.first_token_ms = first_token_ms
+        self.token_ms = token_ms
+        self.reply = reply
+        self.calls = 0
+        self.streams = []
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            first_token_ms=float(os.environ.get("FAKE_LLM_FIRST_TOKEN_MS", 400)),
+            token_ms=float(os.environ.get("FAKE_LLM_TOKEN_MS", 25)),
+        )
+
+    def tokens(self, messages):
+        """Yanıt metnini kelime kelime (boşluklarıyla) parçalara böler."""
+        text = self.reply.format(title=_first_candidate(messages))
+        words = text.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    async def create(self, model: str, messages, temperature: float = None, stream: bool = False, **kwargs):
+        self.calls += 1
+        tokens = self.tokens(messages)
+        if stream:
+            fake = FakeStream(tokens, model, self.first_token_ms, self.token_ms)
+            self.streams.append(fake)
+            return fake
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep((self.first_token_ms + self.token_ms * (len(tokens) - 1)) / 1000)
+        finally:
+            self.active -= 1
+        return ChatCompletion(
+            id="fake", created=int(time.time()), model=model, object="chat.completion",
+            choices=[{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "".join(tokens)}}],
+        )
+
+
+def fake_openai_app(fake: FakeLLMClient = None) -> FastAPI:
+    """
+    FakeLLMClient'ı OpenAI uyumlu POST /v1/chat/completions olarak sunan uygulama; gerçek AsyncOpenAI
+    istemcisi (base_url=http://.../v1) HTTP üzerinden, akışlı (SSE) ve akışsız olarak buna bağlanabilir.
+    """
+    fake = fake or FakeLLMClient.from_env()
+    app = FastAPI()
+    app.state.fake = fake
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        try:
+            body = await request.json()
+        except ClientDisconnect:
+            # İstemci (ör. süre sınırı dolan geçit) istek gövdesi okunurken vazgeçti
+            return Response(status_code=499)
+        stream = bool(body.get("stream"))
+        result = await fake.create(model=body["model"], messages=body["messages"],
+                                   temperature=body.get("temperature"), stream=stream)
+        if not stream:
+            return result.model_dump(exclude_none=True)
+
+        async def events():
+            try:
+                async for chunk in result:
+                    yield f"data: {chunk.model_dump_json(exclude_none=True)}\n\n"
+                yield "data: [DONE]\n\n"
+            finally:
+                await result.close()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
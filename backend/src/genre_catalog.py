@@ -0,0 +1,92 @@
+# Süreç genelinde tür kataloğu - küçük ve neredeyse hiç değişmeyen genres tablosu her istekte sorgulanmasın diye
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from sqlalchemy.future import select
+
+from backend.src.db_pg import async_session_maker
+from backend.src.models_pg import Genre
+
+
+class GenreCatalog:
+    """
+    genres tablosunun bellek içi kopyası: genre_id -> ad ve /api/genres'in döndüğü kayıtlar.
+    Uygulama başlarken (lifespan) bir kez yüklenir; refresh_data'da ya da ttl saniye dolunca yeniden okunur.
+    API'de türleri değiştiren bir yol yok (tablo import_neon gibi ayrı süreçlerden yazılır), bu yüzden
+    tazelik sadece TTL'e dayanır: böyle bir değişiklik en geç ttl saniye (GENRE_CATALOG_TTL) sonra görünür.
+    İçerik her değiştiğinde version artar; etag içerikten türetilir, yani aynı tablo
+    her süreçte ve yeniden başlatmadan sonra aynı etag'i verir.
+    """
+
+    def __init__(self, ttl: float = 3600, clock=time.monotonic):
+        self.names = {}     # genre_id -> genre_name
+        self.records = []   # genre_id sırasıyla {"_id", "genre_id", "genre_name"}
+        self.version = 0
+        self.etag = None
+        self.is_ready = False
+        self.ttl = ttl
+        self._clock = clock
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    def _build(self, rows):
+        """(genre_id, genre_name) satırlarından katalog; içerik değiştiyse version'ı artırır."""
+        rows = sorted((int(gid), name) for gid, name in rows)
+        digest = hashlib.sha1(json.dumps(rows, ensure_ascii=False).encode()).hexdigest()[:16]
+        etag = f'W/"genres-{digest}"'
+        if etag != self.etag:
+            self.names = dict(rows)
+            self.records = [{"_id": str(gid), "genre_id": gid, "genre_name": name} for gid, name in rows]
+            self.etag = etag
+            self.version += 1
+        self.is_ready = True
+        self._loaded_at = self._clock()
+
+    async def _read(self, session=None):
+        """genres tablosunu tek sorguda okur (session verilmezse kendi oturumunu açar)."""
+        stmt = select(Genre.genre_id, Genre.genre_name)
+        if session is None:
+            async with async_session_maker() as own:
+                return (await own.execute(stmt)).all()
+        return (await session.execute(stmt)).all()
+
+    async def load(self, session=None):
+        """Tabloyu yeniden okur (başlangıçta ve refresh_data'da)."""
+        async with self._lock:
+            self._build(await self._read(session))
+
+    @property
+    def is_stale(self):
+        return self._loaded_at is None or self._clock() - self._loaded_at > self.ttl
+
+    async def ensure(self, session=None):
+        """
+        Katalog güncelse hiçbir şey yapmaz (DB'ye gidilmez); hiç yüklenmemiş ya da
+        süresi dolmuşsa yükler. Aynı anda gelen istekler tek bir okumayı bekler.
+        """
+        if self.is_stale:
+            async with self._lock:
+                if self.is_stale:
+                    self._build(await self._read(session))
+        return self
+
+    def names_of(self, genre_ids):
+        """Tür ID'lerini adlara çevirir, sıra korunur; bilinmeyenler atlanır."""
+        return [self.names[int(gid)] for gid in genre_ids or [] if int(gid) in self.names]
+
+    def records_of(self, genre_ids):
+        """Tür ID'lerinin /api/genres kayıtları, genre_id sırasıyla."""
+        wanted = {int(gid) for gid in genre_ids or []}
+        return [record for record in self.records if record["genre_id"] in wanted]
+
+    def etag_of(self, *parts):
+        """Katalog sürümüne bağlı, parts ile ayrışan bir etag (ör. tek filmin tür listesi için)."""
+        digest = hashlib.sha1(f"{self.etag}|{parts}".encode()).hexdigest()[:16]
+        return f'W/"genres-{digest}"'
+
+
+# Tüm route'ların ve öneri motorunun paylaştığı tek örnek
+genre_catalog = GenreCatalog(ttl=float(os.environ.get("GENRE_CATALOG_TTL", 3600)))
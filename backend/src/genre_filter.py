@@ -0,0 +1,16 @@
+# Tür filtresi - eşleşen film ID'lerini Python'a çekip IN (...) ile geri göndermek yerine tek tablodan
+from backend.src.models_pg import Movie
+
+
+def genre_condition(genre_ids, match_all: bool = False):
+    """
+    Movie sorgularına eklenecek tür koşulu, movies.genre_ids dizisi üzerinde.
+    match_all=False: türlerden herhangi biri (genre_ids && dizi); True: hepsi (genre_ids @> dizi).
+    Sorgu boyutu film sayısından bağımsızdır: türün kaç filmi olursa olsun sadece tür ID'leri gider.
+    İki operatör de GIN indeksini (ix_movies_genre_ids) kullanabilir; sıralı sayfalarda planlayıcı
+    genelde sıralama indeksinde yürüyüp diziyi satır üzerinde kontrol eder ve limit'e ulaşınca durur.
+    """
+    genre_ids = sorted({int(g) for g in genre_ids})
+    if match_all:
+        return Movie.genre_ids.contains(genre_ids)
+    return Movie.genre_ids.overlap(genre_ids)
@@ -0,0 +1,131 @@
+# Bellek içi tür indeksi - movie_genres'i her istekte DB'den okumamak için
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.models_pg import Movie
+
+
+class GenreIndex:
+    """
+    Her film için türlerini tutan paketlenmiş bir bit maskesi (uint64).
+    "Şu türlerden herhangi biri / hepsi, izlenenler hariç, puanı eşiğin üstünde"
+    sorgusunu NumPy vektör işlemleriyle mikro saniyeler içinde cevaplar.
+    """
+
+    MAX_GENRES = 64
+
+    def __init__(self):
+        self.movie_ids = np.empty(0, dtype=np.int64)     # Sıralı film ID'leri
+        self.vote_average = np.empty(0, dtype=np.float64)
+        self.shuffle_key = np.empty(0, dtype=np.float64)
+        self.masks = np.empty(0, dtype=np.uint64)        # Film başına tür bitleri
+        self.genre_bits = {}                              # genre_id -> bit sırası
+        self._matrix = None
+        self.is_ready = False
+
+    @classmethod
+    def from_arrays(cls, movie_ids, vote_average, shuffle_key, pairs):
+        """
+        (movie_id, genre_id) çiftlerinden indeksi kurar. shuffle_key'i olmayan (NULL) filmler alınmaz:
+        SQL'deki örnekleme yolları da onları dışarıda bırakır, iki yol aynı havuzu ve sırayı görür.
+        """
+        index = cls()
+        shuffle_key = np.asarray(shuffle_key, dtype=np.float64)
+        keyed = np.flatnonzero(~np.isnan(shuffle_key))
+        order = keyed[np.argsort(np.asarray(movie_ids, dtype=np.int64)[keyed], kind="stable")]
+        index.movie_ids = np.asarray(movie_ids, dtype=np.int64)[order]
+        index.vote_average = np.nan_to_num(np.asarray(vote_average, dtype=np.float64)[order])
+        index.shuffle_key = shuffle_key[order]
+        index.masks = np.zeros(len(index.movie_ids), dtype=np.uint64)
+
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        genre_ids = np.unique(pairs[:, 1])
+        if len(genre_ids) > cls.MAX_GENRES:
+            raise ValueError(f"Tür sayısı ({len(genre_ids)}) bit maskesine sığmıyor (en fazla {cls.MAX_GENRES}).")
+        index.genre_bits = {int(g): bit for bit, g in enumerate(genre_ids)}
+
+        # Film tablosunda olmayan ilişkileri at, kalanların bitlerini OR'la
+        pos = index.positions(pairs[:, 0])
+        known = pos >= 0
+        bits = np.searchsorted(genre_ids, pairs[known, 1]).astype(np.uint64)
+        np.bitwise_or.at(index.masks, pos[known], np.left_shift(np.uint64(1), bits))
+
+        index.is_ready = True
+        return index
+
+    @classmethod
+    async def load(cls, session):
+        """movies tablosundan (genre_ids dizisiyle, tek sorguda) indeksi kurar (başlangıçta / refresh'te)."""
+        movies = (await session.execute(
+            select(Movie.movieId, Movie.vote_average, Movie.shuffle_key, Movie.genre_ids)
+        )).all()
+        pairs = [(movie_id, genre_id) for movie_id, _, _, genre_ids in movies for genre_id in genre_ids or []]
+        columns = list(zip(*movies))[:3] if movies else ([], [], [])
+        return cls.from_arrays(*columns, pairs=pairs)
+
+    def positions(self, movie_ids):
+        """Film ID'lerini dizi pozisyonlarına çevirir; bilinmeyenler -1 olur."""
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        if len(self.movie_ids) == 0:
+            return np.full(len(movie_ids), -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(self.movie_ids, movie_ids), len(self.movie_ids) - 1)
+        return np.where(self.movie_ids[pos] == movie_ids, pos, -1)
+
+    def genre_matrix(self):
+        """Film × tür 0/1 matrisi (float32, bit sırasına göre sütunlar); ilk çağrıda kurulur."""
+        if self._matrix is None:
+            bits = np.arange(len(self.genre_bits), dtype=np.uint64)
+            self._matrix = ((self.masks[:, None] >> bits) & np.uint64(1)).astype(np.float32)
+        return self._matrix
+
+    def genre_vector(self, genre_ids):
+        """Tür ID listesini genre_matrix sütunlarına karşılık gelen 0/1 vektöre çevirir."""
+        vector = np.zeros(len(self.genre_bits), dtype=np.float32)
+        for gid in genre_ids or []:
+            bit = self.genre_bits.get(int(gid))
+            if bit is not None:
+                vector[bit] = 1.0
+        return vector
+
+    def genre_mask(self, genre_ids):
+        """Tür ID listesini tek bir bit maskesine çevirir (bilinmeyen türler yok sayılır)."""
+        mask = np.uint64(0)
+        for gid in genre_ids or []:
+            bit = self.genre_bits.get(int(gid))
+            if bit is not None:
+                mask |= np.uint64(1) << np.uint64(bit)
+        return mask
+
+    def genres_of(self, movie_id):
+        """Bir filmin tür ID'lerini döner."""
+        pos = self.positions([movie_id])[0]
+        if pos < 0:
+            return []
+        mask = int(self.masks[pos])
+        return [gid for gid, bit in self.genre_bits.items() if mask >> bit & 1]
+
+    def select(self, any_of=None, all_of=None, exclude=None, min_vote=None):
+        """
+        Koşullara uyan filmlerin pozisyonlarını boolean dizi olarak döner.
+        any_of: bu türlerden en az biri, all_of: bu türlerin hepsi,
+        exclude: hariç tutulacak film ID'leri, min_vote: vote_average > min_vote.
+        """
+        keep = np.ones(len(self.movie_ids), dtype=bool)
+        if any_of:
+            keep &= (self.masks & self.genre_mask(any_of)) != 0
+        if all_of:
+            # Bilinmeyen bir tür istendiyse hiçbir film tümünü sağlayamaz
+            if any(int(g) not in self.genre_bits for g in all_of):
+                keep[:] = False
+            wanted = self.genre_mask(all_of)
+            keep &= (self.masks & wanted) == wanted
+        if min_vote is not None:
+            keep &= self.vote_average > min_vote
+        if exclude is not None and len(exclude):
+            pos = self.positions(exclude)
+            keep[pos[pos >= 0]] = False
+        return keep
+
+    def query(self, any_of=None, all_of=None, exclude=None, min_vote=None):
+        """select() ile aynı koşullar; eşleşen film ID'lerini döner."""
+        return self.movie_ids[self.select(any_of, all_of, exclude, min_vote)]
@@ -0,0 +1,101 @@
+# Hibrit puanlama - puan, popülerlik, yıl ve tür uyumunu tek bir matris-vektör çarpımında birleştirir
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.models_pg import Movie
+from backend.src.neighbors import top_k_row
+
+NUMERIC_FEATURES = ("vote_average", "popularity", "avg_rating", "rating_count", "year")
+
+DEFAULT_WEIGHTS = {
+    "vote_average": 0.30,
+    "popularity": 0.15,
+    "avg_rating": 0.20,
+    "rating_count": 0.10,
+    "year": 0.05,
+    "genre": 0.20,  # Tür uyumu: filmin türlerinin kullanıcı/misafir tür vektörüyle örtüşmesi
+}
+
+
+def _min_max(column):
+    """v3'teki MinMaxScaler'ın aynısı: sütunu [0, 1] aralığına çeker (sabit sütun 0 olur)."""
+    if len(column) == 0 or column.max() <= column.min():
+        return np.zeros_like(column)
+    low = column.min()
+    return (column - low) / (column.max() - low)
+
+
+def release_years(release_dates):
+    """'YYYY-MM-DD' metinlerinden yıl; bilinmeyenler katalog medyanı olur (0 yılı ölçeği bozmasın)."""
+    years = np.array([float(d[:4]) if d and d[:4].isdigit() else np.nan for d in release_dates], dtype=np.float64)
+    known = ~np.isnan(years)
+    years[~known] = np.median(years[known]) if known.any() else 0.0
+    return years
+
+
+class HybridScorer:
+    """
+    Film başına sıkıştırılmış özellik matrisi (float32): ölçeklenmiş sayısal sütunlar + tür bitleri.
+    Puan = matris @ ağırlık vektörü; tür sütunlarının ağırlığı verilen tür vektöründen gelir.
+    Satırlar GenreIndex.movie_ids ile aynı sıradadır.
+    """
+
+    def __init__(self, movie_ids, numeric, genre_matrix):
+        self.movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        self.matrix = np.hstack([numeric, genre_matrix]).astype(np.float32)
+        self.is_ready = True
+
+    @classmethod
+    def from_arrays(cls, movie_ids, vote_average, popularity, avg_rating, rating_count, release_dates, genre_matrix):
+        """
+        Ham sütunlardan matrisi kurar. popularity ve rating_count uzun kuyruklu olduğu için
+        ölçeklemeden önce log1p alınır; yoksa birkaç çok popüler film sütunun tamamını ezer.
+        """
+        clean = lambda col: np.nan_to_num(np.asarray(col, dtype=np.float64))
+        numeric = np.column_stack([
+            _min_max(clean(vote_average)),
+            _min_max(np.log1p(np.maximum(clean(popularity), 0))),
+            _min_max(clean(avg_rating)),
+            _min_max(np.log1p(np.maximum(clean(rating_count), 0))),
+            _min_max(release_years(release_dates)),
+        ])
+        return cls(movie_ids, numeric, np.asarray(genre_matrix, dtype=np.float32))
+
+    @classmethod
+    async def load(cls, session, genre_index):
+        """Movie tablosundan, tür indeksinin film sırasıyla hizalı olarak kurar (shuffle_key'siz filmler indekste yok)."""
+        rows = (await session.execute(select(
+            Movie.movieId, Movie.vote_average, Movie.popularity, Movie.avg_rating,
+            Movie.rating_count, Movie.release_date,
+        ).where(Movie.shuffle_key.isnot(None)).order_by(Movie.movieId))).all()
+        columns = list(zip(*rows)) if rows else [()] * 6
+        if not np.array_equal(np.asarray(columns[0], dtype=np.int64), genre_index.movie_ids):
+            raise ValueError("Film tablosu tür indeksiyle hizalı değil; önce GenreIndex yenilenmeli.")
+        return cls.from_arrays(genre_index.movie_ids, *columns[1:], genre_matrix=genre_index.genre_matrix())
+
+    def weight_vector(self, genre_vector=None, weights=None):
+        """Ağırlık sözlüğünü matris sütunlarına karşılık gelen tek vektöre çevirir."""
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen ağırlık: {sorted(unknown)}")
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        vector[:len(NUMERIC_FEATURES)] = [weights[name] for name in NUMERIC_FEATURES]
+        if genre_vector is not None:
+            genre_vector = np.asarray(genre_vector, dtype=np.float32)
+            total = genre_vector.sum()
+            if total > 0:
+                # Tür uyumu [0, 1]: filmin türlerine düşen tür vektörü payı
+                vector[len(NUMERIC_FEATURES):] = weights["genre"] * genre_vector / total
+        return vector
+
+    def scores(self, genre_vector=None, weights=None):
+        """Tüm katalog için hibrit puan (tek matvec)."""
+        return self.matrix @ self.weight_vector(genre_vector, weights)
+
+    def top_positions(self, keep, skip: int = 0, limit: int = 20, genre_vector=None, weights=None):
+        """keep maskesindeki filmlerden en yüksek puanlı [skip, skip+limit) sıradakilerin pozisyonları."""
+        scores = self.scores(genre_vector, weights)
+        scores[~keep] = -np.inf
+        top, top_scores = top_k_row(scores, min(skip + limit, int(keep.sum())))
+        return top[skip:], top_scores[skip:]
@@ -0,0 +1,337 @@
+# Item-item işbirlikçi filtreleme - "bu filmi beğenenler şunları da beğendi"
+import asyncio
+import threading
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy.future import select
+
+from backend.src.models_pg import Interaction
+from backend.src.neighbors import top_k_row
+
+
+def positions(sorted_ids, ids):
+    """ID'leri sıralı bir ID dizisindeki pozisyonlarına çevirir; bulunmayanlar -1 olur."""
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(sorted_ids) == 0:
+        return np.full(len(ids), -1, dtype=np.int64)
+    pos = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[pos] == ids, pos, -1)
+
+
+def sparse_top_k(matrix, k):
+    """
+    CSR matrisin her satırındaki en büyük k değeri (sıfır olmayanlar arasından) seçer.
+    Dönüş: (indices int32 [N, k], scores float32 [N, k]); eksik kalan yerler -1 / 0.
+    Tamamen vektörel: sıfır olmayan eleman sayısıyla orantılı, satır döngüsü yok.
+    """
+    n = matrix.shape[0]
+    indices = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    rows = np.repeat(np.arange(n), np.diff(matrix.indptr))
+    order = np.lexsort((-matrix.data, rows))
+    rank = np.arange(len(order)) - matrix.indptr[rows[order]]
+    keep = order[rank < k]
+    indices[rows[keep], rank[rank < k]] = matrix.indices[keep]
+    scores[rows[keep], rank[rank < k]] = matrix.data[keep]
+    return indices, scores
+
+
+class ItemCF:
+    """
+    interactions tablosundaki beğenilerden kullanıcı×film seyrek matrisi kurar ve
+    filmler arası kosinüs benzerliğini (ortak beğeni / sqrt(n_i * n_j)) hesaplar.
+    Her film için sadece en benzer k film saklanır. Film sütunları tür indeksindeki
+    sıralı film ID'leriyle aynıdır.
+    """
+
+    MAX_REBUILDS = 32  # Bir etkileşimde baştan hesaplanan en fazla komşu satırı (kalanlar sonrakilere kalır)
+
+    def __init__(self, k: int = 50):
+        self.k = k
+        self.movie_ids = np.empty(0, dtype=np.int64)    # Sıralı film ID'leri (sütunlar)
+        self.user_ids = np.empty(0, dtype=np.int64)     # Sıralı kullanıcı ID'leri (satırlar)
+        self.liked = sparse.csr_matrix((0, 0), dtype=np.float32)    # Beğeniler (1/0)
+        self.watched = sparse.csr_matrix((0, 0), dtype=np.float32)  # Tüm etkileşimler
+        self.neighbor_indices = np.empty((0, k), dtype=np.int32)
+        self.neighbor_scores = np.empty((0, k), dtype=np.float32)
+        # Artımlı güncelleme durumu: beğeni sayıları (norm²) ve kullanıcı/film bazında kümeler
+        self.counts = np.zeros(0, dtype=np.float64)
+        self.likes_by_user = {}     # user_id -> beğenilen film pozisyonları
+        self.watched_by_user = {}   # user_id -> etkileşim kurulan film pozisyonları
+        self.likers = []            # film pozisyonu -> beğenen user_id'ler
+        self.stale = set()          # Bir komşusu k'nın altına düştüğü için baştan hesaplanmayı bekleyen satırlar
+        # Artımlı güncellemeler thread'de (asyncio.to_thread) çalışır; aynı anda tek güncelleme.
+        # Okuyanlar kilit almaz: tek tek küme / satır işlemleri GIL altında bütündür, en kötü bir önceki durumu görürler.
+        self.lock = threading.Lock()
+        self.is_ready = False
+
+    @classmethod
+    def from_arrays(cls, movie_ids, user_ids, item_ids, is_liked, k: int = 50, block_size: int = 2048):
+        """(user_id, movie_id, is_liked) etkileşimlerinden modeli kurar."""
+        model = cls(k)
+        model.movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        is_liked = np.asarray(is_liked, dtype=bool)
+        model.user_ids = np.unique(user_ids)
+
+        rows = positions(model.user_ids, user_ids)
+        cols = positions(model.movie_ids, item_ids)
+        known = (rows >= 0) & (cols >= 0)
+        shape = (len(model.user_ids), len(model.movie_ids))
+        model.watched = model._binary(rows[known], cols[known], shape)
+        liked = known & is_liked
+        model.liked = model._binary(rows[liked], cols[liked], shape)
+
+        model.neighbor_indices, model.neighbor_scores = model.build_neighbors(model.liked, k, block_size)
+        model._init_state()
+        model.is_ready = True
+        return model
+
+    def _init_state(self):
+        """Seyrek matrislerden artımlı güncelleme için kullanıcı/film kümelerini kurar."""
+        self.counts = np.asarray(self.liked.sum(axis=0), dtype=np.float64).ravel()
+        self.likers = [set() for _ in range(len(self.movie_ids))]
+        self.likes_by_user, self.watched_by_user = {}, {}
+        for matrix, by_user in ((self.liked, self.likes_by_user), (self.watched, self.watched_by_user)):
+            for row, uid in enumerate(self.user_ids.tolist()):
+                items = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+                if len(items):
+                    by_user[uid] = set(items.tolist())
+        for uid, items in self.likes_by_user.items():
+            for pos in items:
+                self.likers[pos].add(uid)
+
+    @classmethod
+    async def load(cls, session, movie_ids, k: int = 50):
+        """Interaction tablosundan modeli kurar; matris işlemleri event loop dışında çalışır."""
+        rows = (await session.execute(
+            select(Interaction.user_id, Interaction.movie_id, Interaction.is_liked)
+            .where(Interaction.user_id.isnot(None))
+            .where(Interaction.movie_id.isnot(None))
+        )).all()
+        columns = list(zip(*rows)) if rows else ([], [], [])
+        return await asyncio.to_thread(cls.from_arrays, movie_ids, *columns, k=k)
+
+    @staticmethod
+    def _binary(rows, cols, shape):
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape)
+        matrix.data[:] = 1.0  # Aynı çift iki kez geldiyse toplanmasın
+        return matrix
+
+    @staticmethod
+    def build_neighbors(liked, k, block_size: int = 2048):
+        """
+        Kosinüs benzerliğini film blokları halinde R[:, blok].T @ R ile hesaplar.
+        Maliyet ortak beğeni çiftlerinin sayısıyla orantılıdır (filmler² değil);
+        bellekte aynı anda tek bir bloğun seyrek satırları durur.
+        """
+        n_items = liked.shape[1]
+        counts = np.asarray(liked.sum(axis=0)).ravel()
+        inv_norm = np.zeros(n_items, dtype=np.float32)
+        inv_norm[counts > 0] = 1.0 / np.sqrt(counts[counts > 0])
+
+        by_item = liked.T.tocsr()  # film × kullanıcı
+        indices = np.full((n_items, k), -1, dtype=np.int32)
+        scores = np.zeros((n_items, k), dtype=np.float32)
+        for start in range(0, n_items, block_size):
+            stop = min(start + block_size, n_items)
+            cooc = (by_item[start:stop] @ liked).tocsr()  # Ortak beğeni sayıları
+            block_rows = np.repeat(np.arange(start, stop), np.diff(cooc.indptr))
+            cooc.data = cooc.data * inv_norm[block_rows] * inv_norm[cooc.indices]
+            cooc.data[block_rows == cooc.indices] = 0.0   # Film kendisine komşu olmasın
+            cooc.eliminate_zeros()
+            indices[start:stop], scores[start:stop] = sparse_top_k(cooc, k)
+        return indices, scores
+
+    def scores_for(self, liked_positions):
+        """Beğenilen filmlerin komşu satırlarını toplayarak tüm filmler için puan vektörü üretir."""
+        neighbors = self.neighbor_indices[liked_positions].ravel()
+        weights = self.neighbor_scores[liked_positions].ravel()
+        valid = neighbors >= 0
+        return np.bincount(neighbors[valid], weights=weights[valid], minlength=len(self.movie_ids))
+
+    def recommend(self, user_id, limit: int = 500):
+        """
+        Kullanıcının beğendiklerine en çok benzeyen (henüz etkileşim kurmadığı) filmlerin
+        ID'lerini puana göre azalan sırada döner. Model kullanıcıyı tanımıyorsa boş dizi.
+        """
+        liked = self.likes_by_user.get(user_id)
+        if not liked:
+            return np.empty(0, dtype=np.int64)
+        scores = self.scores_for(np.fromiter(liked, dtype=np.int64, count=len(liked)))
+        watched = self.watched_by_user.get(user_id, ())
+        scores[np.fromiter(watched, dtype=np.int64, count=len(watched))] = 0.0
+        top, top_scores = top_k_row(scores, limit)
+        return self.movie_ids[top[top_scores > 0]]
+
+    def user_movies(self, user_id):
+        """Kullanıcının (beğendiği, etkileşim kurduğu) film ID'leri - artımlı güncellemelerle güncel."""
+        liked = sorted(self.likes_by_user.get(user_id, ()))
+        watched = sorted(self.watched_by_user.get(user_id, ()))
+        return self.movie_ids[liked], self.movie_ids[watched]
+
+    def similar_items(self, movie_id, k: int = 10):
+        """Bu filmi beğenenlerin en çok beğendiği diğer filmler: (film ID'leri, puanlar)."""
+        pos = positions(self.movie_ids, [movie_id])[0]
+        if pos < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        idx, sc = self.neighbor_indices[pos, :k], self.neighbor_scores[pos, :k]
+        return self.movie_ids[idx[idx >= 0]], sc[idx >= 0]
+
+    # ---------------------------------
+    # Artımlı güncelleme (create_interaction / delete_interaction)
+    # ---------------------------------
+    def add_interaction(self, user_id, movie_id, is_liked: bool):
+        """
+        Etkileşimi ekler ya da günceller; beğeni durumu değiştiyse sadece etkilenen komşu satırları düzeltir.
+        Popüler bir filmde binlerce satır etkilenebilir: satırlar O(k) yamalanır, baştan hesaplanması gereken
+        satırlardan en fazla MAX_REBUILDS tanesi bu çağrıda kurulur (bkz. rebuild_stale).
+        Saf Python döngüleri içerdiğinden API'de event loop dışında (asyncio.to_thread) çağrılmalı.
+        Dönüş: beğeni değişimi (+1 yeni beğeni, -1 beğeni geri alındı, 0 değişmedi).
+        """
+        with self.lock:
+            sign = self._add(user_id, movie_id, is_liked)
+            self._rebuild(self.MAX_REBUILDS)
+        return sign
+
+    def remove_interaction(self, user_id, movie_id):
+        """Etkileşimi siler; beğeniyse ortak beğeni sayıları geri alınır. Dönüş ve çağrı şekli add_interaction'daki gibi."""
+        with self.lock:
+            sign = self._remove(user_id, movie_id)
+            self._rebuild(self.MAX_REBUILDS)
+        return sign
+
+    def rebuild_stale(self, limit: int = None):
+        """Bekleyen satırlardan en fazla limit tanesini (None: hepsini) baştan hesaplar; kalan sayıyı döner."""
+        with self.lock:
+            self._rebuild(limit)
+            return len(self.stale)
+
+    def _rebuild(self, limit):
+        for _ in range(len(self.stale) if limit is None else min(limit, len(self.stale))):
+            row = self.stale.pop()
+            self._set_row(row, *self._cooc_row(row))
+
+    def _add(self, user_id, movie_id, is_liked: bool):
+        pos = positions(self.movie_ids, [movie_id])[0]
+        if pos < 0:
+            return 0
+        self.watched_by_user.setdefault(user_id, set()).add(int(pos))
+        was_liked = pos in self.likes_by_user.get(user_id, ())
+        if is_liked and not was_liked:
+            self._change_like(user_id, int(pos), +1)
+            return +1
+        if not is_liked and was_liked:
+            self._change_like(user_id, int(pos), -1)
+            return -1
+        return 0
+
+    def _remove(self, user_id, movie_id):
+        pos = positions(self.movie_ids, [movie_id])[0]
+        if pos < 0:
+            return 0
+        self.watched_by_user.get(user_id, set()).discard(int(pos))
+        if pos in self.likes_by_user.get(user_id, ()):
+            self._change_like(user_id, int(pos), -1)
+            return -1
+        return 0
+
+    def _change_like(self, user_id, pos, sign):
+        """
+        Kullanıcı pos filmini beğendi (+1) ya da beğenisini geri aldı (-1).
+        Değişenler: n_pos, ve kullanıcının diğer beğenileriyle ortak sayılar C[pos, j].
+        Böylece sadece pos satırı ile pos'la ortak beğenisi olan filmlerin satırlarındaki
+        pos girdisi değişir; geri kalan komşu tablosu olduğu gibi kalır.
+        """
+        likes = self.likes_by_user.setdefault(user_id, set())
+        others = np.fromiter(likes - {pos}, dtype=np.int64)
+        if sign > 0:
+            likes.add(pos)
+            self.likers[pos].add(user_id)
+        else:
+            likes.discard(pos)
+            self.likers[pos].discard(user_id)
+        self.counts[pos] += sign
+
+        cols, cooc = self._cooc_row(pos)
+        self._set_row(pos, cols, cooc)
+        # pos ile ortak beğenisi olan filmler + bu kullanıcının diğer beğenileri (ortaklığı 0'a düşmüş olabilir)
+        rows = np.union1d(cols, others)
+        sims = np.zeros(len(rows))
+        sims[np.searchsorted(rows, cols)] = cooc / np.sqrt(self.counts[cols] * self.counts[pos])
+        self._patch_rows(rows, pos, sims)
+
+    def _cooc_row(self, pos):
+        """pos filmini beğenenlerin diğer beğenilerinden ortak beğeni sayılarını çıkarır: (sütunlar, sayılar)."""
+        items = [j for uid in self.likers[pos] for j in self.likes_by_user.get(uid, ())]
+        counts = np.bincount(np.asarray(items, dtype=np.int64), minlength=len(self.movie_ids))
+        counts[pos] = 0
+        cols = np.flatnonzero(counts)
+        return cols, counts[cols].astype(np.float64)
+
+    def _set_row(self, pos, cols, cooc):
+        """Bir filmin komşu satırını ortak beğeni sayılarından baştan yazar."""
+        self.stale.discard(pos)
+        sims = cooc / np.sqrt(self.counts[cols] * self.counts[pos]) if len(cols) else cooc
+        top, top_scores = top_k_row(sims, self.k)
+        self.neighbor_indices[pos] = -1
+        self.neighbor_scores[pos] = 0.0
+        self.neighbor_indices[pos, :len(top)] = cols[top]
+        self.neighbor_scores[pos, :len(top)] = top_scores
+
+    def _patch_rows(self, rows, item, scores):
+        """
+        rows filmlerinin komşu satırlarında item'ın puanını scores yapar (satır döngüsü yok, tek seferde):
+        satırda varsa puanı güncellenir (<= 0 ise çıkarılır), yoksa son sıradan iyiyse eklenir.
+        Dolu bir satırda item'ın puanı son sıranın altına düşerse yerine geçecek (k+1.) aday bilinmez:
+        puan yine yazılır, satır baştan hesaplanmak üzere stale'e eklenir.
+        """
+        indices, current = self.neighbor_indices[rows], self.neighbor_scores[rows]
+        full = indices[:, -1] >= 0
+        last = current[:, -1]
+        hit_mask = indices == item
+        hit = hit_mask.any(axis=1)
+        self.stale.update(rows[hit & full & (scores < last)].tolist())
+
+        # Satırda olan: puanı yaz; <= 0 olan çıkarılır (sıralamada boş yerlerle birlikte sona gider)
+        hit_rows, hit_cols = np.nonzero(hit_mask)
+        removed = scores[hit_rows] <= 0
+        current[hit_rows, hit_cols] = np.where(removed, 0.0, scores[hit_rows])
+        indices[hit_rows[removed], hit_cols[removed]] = -1
+        # Satırda olmayan: boş yer varsa ilkine, yoksa son sıranın yerine (son sıradan iyiyse)
+        insert = ~hit & (scores > 0) & (~full | (scores > last))
+        at = np.where(full, indices.shape[1] - 1, np.argmax(indices < 0, axis=1))
+        indices[insert, at[insert]] = item
+        current[insert, at[insert]] = scores[insert]
+
+        changed = hit | insert
+        if changed.any():
+            indices, current = indices[changed], current[changed]
+            order = np.lexsort((indices < 0, -current))
+            self.neighbor_indices[rows[changed]] = np.take_along_axis(indices, order, axis=1)
+            self.neighbor_scores[rows[changed]] = np.take_along_axis(current, order, axis=1)
+
+    def to_matrix(self):
+        """Güncel beğeni kümelerinden kullanıcı×film matrisini kurar (tam yeniden hesap için)."""
+        user_ids = np.array(sorted(self.likes_by_user), dtype=np.int64)
+        rows = [r for r, uid in enumerate(user_ids.tolist()) for _ in self.likes_by_user[uid]]
+        cols = [pos for uid in user_ids.tolist() for pos in self.likes_by_user[uid]]
+        return self._binary(np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64),
+                            (len(user_ids), len(self.movie_ids)))
+
+    def compare(self, other, tol: float = 1e-5):
+        """
+        İki modelin komşu puanlarını karşılaştırır (eşit puanlı komşuların sırası farklı olabilir,
+        bu yüzden satır başına sıralı puan dizileri karşılaştırılır).
+        Dönüş: {"rows", "mismatched_rows", "max_score_diff"}.
+        """
+        if not np.array_equal(self.movie_ids, other.movie_ids):
+            raise ValueError("Modeller farklı film kataloglarıyla kurulmuş.")
+        k = min(self.neighbor_scores.shape[1], other.neighbor_scores.shape[1])
+        diff = np.abs(self.neighbor_scores[:, :k] - other.neighbor_scores[:, :k]).max(axis=1, initial=0.0)
+        return {
+            "rows": int(len(diff)),
+            "mismatched_rows": int((diff > tol).sum()),
+            "max_score_diff": float(diff.max(initial=0.0)),
+        }
@@ -0,0 +1,75 @@
+# Keyset (seek) sayfalama - derin sayfalarda OFFSET'in atlanan satırları tarama maliyetini kaldırır
+import base64
+import json
+
+from sqlalchemy import asc, desc, func, literal_column, tuple_
+from sqlalchemy.future import select
+
+from backend.src.models_pg import Movie
+
+# sort_by -> (sıralama ifadesi, yön). NULL'lar sabit bir taban değere çekilir ki satır
+# karşılaştırması (değer, movie_id) her satır için tanımlı olsun ve sona düşsün.
+# Aynı ifadelerle kurulan indeksler: scripts/add_sort_indexes.py. Taban değerler bağlı parametre
+# değil sabit olarak yazılır; yoksa planlayıcı ifadeyi indeksle eşleştiremez.
+SORT_KEYS = {
+    "popularity": (func.coalesce(Movie.popularity, literal_column("-1.0")), desc),
+    "vote_average": (func.coalesce(Movie.vote_average, literal_column("-1.0")), desc),
+    "release_date": (func.coalesce(Movie.release_date, literal_column("''")), desc),
+    "title": (func.coalesce(Movie.title, literal_column("''")), asc),
+}
+
+# Cursor'daki sıralama değerinin beklenen JSON tipi; kurcalanmış cursor SQL'e gitmeden reddedilsin
+SORT_VALUE_TYPES = {"popularity": (int, float), "vote_average": (int, float), "release_date": str, "title": str}
+
+
+def encode_cursor(sort_by: str, value, movie_id: int) -> str:
+    """Son satırın sıralama değeri + ID'si -> opak, URL-güvenli metin."""
+    payload = json.dumps({"s": sort_by, "v": value, "i": movie_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str):
+    """
+    encode_cursor'ın tersi: (değer, movie_id). Bozuk, başka sıralamaya ait ya da sort_by için
+    değeri yanlış tipte (SORT_VALUE_TYPES) cursor için ValueError.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort_by:
+            raise ValueError(f"cursor '{payload['s']}' sıralamasına ait")
+        value, expected = payload["v"], SORT_VALUE_TYPES.get(sort_by)
+        if expected is not None and (not isinstance(value, expected) or isinstance(value, bool)):
+            raise ValueError(f"'{sort_by}' için değer tipi hatalı: {value!r}")
+        return value, int(payload["i"])
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise ValueError(f"Geçersiz cursor: {e}") from e
+
+
+def keyset_page(conditions, sort_by: str, after=None, limit: int = 20, skip: int = 0):
+    """
+    (sıralama değeri, movie_id) sırasında after'dan sonraki limit film.
+    after yoksa (cursor'sız eski istemciler) ilk skip satır OFFSET ile atlanır.
+    Satır karşılaştırması indeksle aynı yönde olduğu için Postgres doğrudan
+    cursor konumuna iner: sayfa derinliği maliyeti değiştirmez.
+    İfade (Movie, sort_value) satırları döner; sort_value sonraki cursor'a yazılır.
+    """
+    key, direction = SORT_KEYS[sort_by]
+    stmt = select(Movie, key.label("sort_value")).where(*conditions)
+    if after is not None:
+        value, movie_id = after
+        row, bound = tuple_(key, Movie.movieId), tuple_(value, movie_id)
+        stmt = stmt.where(row < bound if direction is desc else row > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.order_by(direction(key), direction(Movie.movieId)).limit(limit)
+
+
+async def fetch_page(session, conditions, sort_by: str, cursor: str = None, skip: int = 0, limit: int = 20):
+    """keyset_page'i çalıştırır. Dönüş: (filmler, sonraki sayfanın cursor'ı ya da None)."""
+    after = decode_cursor(cursor, sort_by) if cursor else None
+    rows = (await session.execute(keyset_page(conditions, sort_by, after, limit, skip))).all()
+    movies = [movie for movie, _ in rows]
+    if len(rows) < limit:
+        return movies, None
+    last, value = rows[-1]
+    return movies, encode_cursor(sort_by, value, last.movieId)
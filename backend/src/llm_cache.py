@@ -0,0 +1,180 @@
+# LLM yanıt önbelleği - aynı bağlamla gelen neredeyse aynı sohbet mesajları için LLM'e tekrar gitmemek için
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+KEY_VERSION = 1  # Sistem promptunun şablonu değişirse artırılır (eski girdiler artık eşleşmez)
+PRUNE_EVERY = 100  # Disk katmanında her bu kadar yazmada süresi dolanlar temizlenir
+
+
+def normalize_message(text: str) -> str:
+    """
+    "Bana bir film öner!" ile "bana bir film öner" aynı anahtarı versin: Unicode NFKC,
+    Türkçe büyük İ dahil küçük harf, noktalama/semboller atılır, boşluklar teke indirilir.
+    """
+    text = unicodedata.normalize("NFKC", text).replace("İ", "i").lower()
+    text = "".join(ch if not unicodedata.category(ch).startswith(("P", "S")) else " " for ch in text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def llm_cache_key(message: str, context, model: str, temperature: float, liked_limit: int = 10) -> str:
+    """
+    (normalize mesaj, aday listesi, beğeni listesi özeti, model, sıcaklık) -> anahtar.
+    Beğeni listesinin promptta görünen kısmı (ilk liked_limit film) ve favori tür adları da
+    prompta girdiği için özete dahildir; aynı listeye sahip farklı kullanıcılar aynı anahtarı paylaşır.
+    """
+    liked = digest([context.liked_metadata[:liked_limit], context.fav_genre_names])
+    return digest([KEY_VERSION, normalize_message(message), context.candidates, liked, model, float(temperature)])
+
+
+class DiskTier:
+    """
+    Süreç yeniden başlasa da (ve aynı makinedeki diğer süreçlerle) paylaşılan SQLite katmanı.
+    Senkrondur; LLMCache onu olay döngüsünü bekletmemek için thread'de (asyncio.to_thread) çağırır.
+    Tek bağlantı, kilitle aynı anda tek thread tarafından kullanılır.
+    """
+
+    def __init__(self, path: str, capacity: int = 10000):
+        self.path = path
+        self.capacity = capacity
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, latency REAL NOT NULL)"
+        )
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT count(*) FROM responses").fetchone()[0]
+
+    def get(self, key, now: float):
+        """(son geçerlilik, yanıt, LLM süresi) ya da None; süresi dolmuşsa silinir."""
+        with self._lock:
+            row = self._db.execute("SELECT expires_at, value, latency FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            return row
+
+    def put(self, key, value: str, expires_at: float, latency: float, now: float):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, expires_at, latency))
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.capacity,)
+                )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class LLMCache:
+    """
+    anahtar -> LLM yanıt metni; bellekte süre (TTL) ve boyut (LRU) sınırlı, isteğe bağlı disk katmanıyla.
+    Bellekte yoksa diske bakılır, diskte bulunan bellek katmanına da alınır.
+    Her girdi, yanıtın LLM'den kaç saniyede geldiğini de saklar; isabetlerde bu süre
+    saved_seconds'a eklenir (önbelleğin kazandırdığı gecikme).
+    Disk girdileri yeniden başlatmadan sonra da geçerli olsun diye zaman duvar saatiyle tutulur.
+    get / put async'tir: bellek katmanı olay döngüsünde, disk katmanı thread'de (asyncio.to_thread) çalışır.
+    """
+
+    def __init__(self, capacity: int = 1000, ttl: float = 3600.0, disk_path: str = None, clock=time.time):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self.disk = DiskTier(disk_path, capacity=capacity * 10) if disk_path else None
+        self._entries = OrderedDict()  # key -> (son geçerlilik zamanı, yanıt, LLM süresi)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """LLM_CACHE_SIZE (0 ise önbellek yok -> None), LLM_CACHE_TTL, LLM_CACHE_PATH (disk katmanı, isteğe bağlı)."""
+        capacity = int(os.environ.get("LLM_CACHE_SIZE", 1000))
+        if capacity <= 0:
+            return None
+        return cls(
+            capacity=capacity,
+            ttl=float(os.environ.get("LLM_CACHE_TTL", 3600)),
+            disk_path=os.environ.get("LLM_CACHE_PATH") or None,
+        )
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key):
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= now:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key, now)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.saved_seconds += entry[2]
+        return entry[1]
+
+    async def put(self, key, response: str, latency: float = 0.0):
+        """LLM'den latency saniyede gelen yanıtı saklar."""
+        now = self.clock()
+        self._remember(key, (now + self.ttl, response, latency))
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, key, response, now + self.ttl, latency, now)
+
+    def _remember(self, key, entry):
+        self._entries[key] = tuple(entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        """Disk katmanı varsa boyutu için SQLite'a gider; route'larda thread'de çağrılmalı."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries), "capacity": self.capacity, "ttl": self.ttl,
+            "disk_size": len(self.disk) if self.disk is not None else None,
+            "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "evictions": self.evictions, "expirations": self.expirations,
+        }
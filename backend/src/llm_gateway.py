@@ -0,0 +1,198 @@
+# LLM geçidi - ani trafikte LLM'e giden çağrılar sınırsız birikmesin diye (eşzamanlılık sınırı, kuyruk, süre sınırı)
+import asyncio
+import bisect
+import os
+import time
+from contextlib import asynccontextmanager
+
+from backend.src.llm_cache import digest
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # saniye
+
+
+class GatewayBusy(Exception):
+    """Tüm slotlar ve bekleme kuyruğu dolu: çağıran beklemeden 429 dönmeli."""
+
+
+class GatewayTimeout(Exception):
+    """Çağrı (kuyrukta bekleme dahil) süre sınırını aştı."""
+
+
+class LatencyHistogram:
+    """Sabit kovalı süre histogramı; kova sayıları kümülatiftir (le = en fazla)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # son kova: +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float):
+        """q. yüzdeliğin üst sınırı (içine düştüğü kovanın sınırı); gözlem yoksa None."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        cumulative, seen = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[f"{bound:g}"] = seen
+        cumulative["+Inf"] = self.count
+        return {
+            "count": self.count, "sum": round(self.sum, 4), "buckets": cumulative,
+            "p50": self.quantile(0.5), "p95": self.quantile(0.95), "p99": self.quantile(0.99),
+        }
+
+
+class LLMGateway:
+    """
+    chat.completions.create çağrılarının önündeki geçit:
+    - Aynı anda en fazla max_concurrency çağrı; slot bekleyen en fazla max_queue çağrı,
+      ikisi de doluysa beklemeden GatewayBusy.
+    - Aynı istek (model, mesajlar, sıcaklık) zaten yoldaysa yeni çağrı açılmaz, onun sonucu beklenir
+      (tek uçuş; akışlı çağrılar birleştirilmez, her dinleyici kendi parçalarını alır).
+    - Her çağrının, kuyrukta bekleme dahil, timeout saniyelik süre sınırı vardır (aşılırsa GatewayTimeout).
+    - Kuyrukta bekleme, ilk parça (akışta) ve toplam süre histogramlarda tutulur.
+    İstemci çağrı başına verilir; geçit hangi istemcinin (OpenAI ya da yerel sahte) kullanıldığını bilmez.
+    """
+
+    def __init__(self, max_concurrency: int = 8, max_queue: int = 16, timeout: float = 30.0, clock=time.perf_counter):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.clock = clock
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight = {}  # istek özeti -> asyncio.Task (tek uçuş)
+        self.active = 0
+        self.waiting = 0
+        self.peak_active = 0
+        self.calls = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.queue_wait = LatencyHistogram()
+        self.first_token = LatencyHistogram()
+        self.latency = LatencyHistogram()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 8)),
+            max_queue=int(os.environ.get("LLM_MAX_QUEUE", 16)),
+            timeout=float(os.environ.get("LLM_TIMEOUT", 30)),
+        )
+
+    @property
+    def is_saturated(self):
+        """Yeni bir çağrı şu an reddedilir mi (tüm slotlar dolu ve kuyruk dolu)."""
+        return self._semaphore.locked() and self.waiting >= self.max_queue
+
+    def check_capacity(self):
+        """Geçit doluysa (reddedilen olarak sayıp) GatewayBusy; yanıt başlamadan karar vermek için de kullanılır."""
+        if self.is_saturated:
+            self.rejected += 1
+            raise GatewayBusy("Öneri motoru şu an çok yoğun, lütfen birazdan tekrar deneyin.")
+
+    async def _within(self, deadline: float, awaitable):
+        """awaitable'ı olay döngüsü saatine göre deadline'a kadar bekler."""
+        try:
+            async with asyncio.timeout_at(deadline):
+                return await awaitable
+        except TimeoutError:
+            self.timeouts += 1
+            raise GatewayTimeout(f"LLM yanıtı {self.timeout:g} sn içinde gelmedi.") from None
+
+    @asynccontextmanager
+    async def slot(self, deadline: float):
+        """Bir eşzamanlılık slotu; slot yoksa kuyrukta (deadline'a kadar) bekler, kuyruk da doluysa GatewayBusy."""
+        self.check_capacity()
+        started = self.clock()
+        self.waiting += 1
+        try:
+            await self._within(deadline, self._semaphore.acquire())
+        finally:
+            self.waiting -= 1
+        self.queue_wait.observe(self.clock() - started)
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def _deadline(self):
+        return asyncio.get_running_loop().time() + self.timeout
+
+    async def complete(self, client, **request) -> str:
+        """
+        client.chat.completions.create(**request) yanıtının metni.
+        Aynı istek zaten yoldaysa onun sonucu (ya da hatası) paylaşılır. Bekleyen biri iptal edilirse
+        (istemci bağlantıyı kesti) ortak çağrı diğerleri için sürer.
+        """
+        key = digest(request)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._complete(client, request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # Kimse beklemiyorsa "exception was never retrieved" uyarısı çıkmasın
+
+    async def _complete(self, client, request) -> str:
+        deadline = self._deadline()
+        async with self.slot(deadline):
+            self.calls += 1
+            started = self.clock()
+            response = await self._within(deadline, client.chat.completions.create(**request))
+            self.latency.observe(self.clock() - started)
+        return response.choices[0].message.content
+
+    async def stream(self, client, **request):
+        """
+        client.chat.completions.create(stream=True, **request) parçalarını üreten async generator.
+        Slot akış bitene ya da generator kapatılana kadar tutulur; süre sınırı tüm akışı kapsar.
+        """
+        deadline = self._deadline()
+        async with self.slot(deadline):
+            self.calls += 1
+            started = self.clock()
+            stream = await self._within(deadline, client.chat.completions.create(stream=True, **request))
+            try:
+                chunks = aiter(stream)
+                first = True
+                while (chunk := await self._within(deadline, anext(chunks, None))) is not None:
+                    if first:
+                        self.first_token.observe(self.clock() - started)
+                        first = False
+                    yield chunk
+            finally:
+                await stream.close()
+            self.latency.observe(self.clock() - started)
+
+    def stats(self):
+        return {
+            "max_concurrency": self.max_concurrency, "max_queue": self.max_queue, "timeout": self.timeout,
+            "active": self.active, "waiting": self.waiting, "peak_active": self.peak_active,
+            "calls": self.calls, "coalesced": self.coalesced, "rejected": self.rejected, "timeouts": self.timeouts,
+            "queue_wait": self.queue_wait.snapshot(),
+            "first_token": self.first_token.snapshot(),
+            "latency": self.latency.snapshot(),
+        }
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, ARRAY, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, ARRAY, JSON, func
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects import postgresql
 from backend.src.db_pg import Base
 
 class User(Base):
@@ -34,6 +35,13 @@ class Movie(Base):
     
     # Optional / Extra fields for LLM mappings
     llm_metadata = Column(JSON, nullable=True)
+
+    # Seed'li örnekleme için sabit rastgele sıra anahtarı; yeni filmler DB'de DEFAULT random() ile alır
+    # (mevcut tablolara sütunu ekleyip dolduran: scripts/add_shuffle_key.py)
+    shuffle_key = deferred(Column(Float, nullable=True, index=True, server_default=func.random()))
+
+    # movie_genres'in film başına sıralı kopyası, trigger ile güncel tutulur; GIN indeksli (scripts/add_genre_array.py)
+    genre_ids = deferred(Column(postgresql.ARRAY(Integer), nullable=False, default=[]))
     
     interactions = relationship("Interaction", back_populates="movie")
 
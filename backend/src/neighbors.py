@@ -0,0 +1,246 @@
+# Seyrek top-k komşu tablosu - N×N yoğun benzerlik matrisi yerine
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import sparse
+
+# Paralel kurulumda her worker'ın mmap ile açtığı ortak diziler
+_worker_state = {}
+
+
+def normalize_rows(matrix):
+    """Satırları L2 normuna böler; böylece iç çarpım = kosinüs benzerliği olur. Sıfır satırlar sıfır kalır."""
+    if sparse.issparse(matrix):
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(block_scores, k):
+    """Her satırın en yüksek k puanını (büyükten küçüğe) ve sütun indekslerini döner."""
+    k = min(k, block_scores.shape[1])
+    part = np.argpartition(-block_scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(block_scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def top_k_row(scores, k, exclude=None):
+    """
+    Tek bir benzerlik satırından en yüksek k puanı seçer: önce argpartition (O(N)),
+    sonra sadece seçilen k+1 eleman sıralanır. exclude (genelde tohum filmin kendisi) atlanır.
+    """
+    scores = np.asarray(scores)
+    n = len(scores)
+    want = min(k + (exclude is not None), n)
+    if want <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    part = np.argpartition(scores, n - want)[n - want:]
+    part = part[np.argsort(-scores[part], kind="stable")]
+    if exclude is not None:
+        part = part[part != exclude]
+    part = part[:k]
+    return part, scores[part]
+
+
+def similarity_row(features, idx, numeric=None, text_weight=0.85):
+    """Bir filmin tüm filmlerle hibrit benzerlik satırını tek bir seyrek çarpımla hesaplar."""
+    row = features[idx].dot(features.T)
+    row = (row.toarray() if sparse.issparse(row) else np.asarray(row)).ravel().astype(np.float32)
+    if numeric is not None:
+        numeric = normalize_rows(numeric)
+        row = text_weight * row + (1.0 - text_weight) * (numeric @ numeric[idx])
+    return row
+
+
+def neighbors_for(idx, k, neighbor_indices, neighbor_scores, features, numeric=None, text_weight=0.85):
+    """
+    Bir film için en benzer k filmi (satır numaraları, puanlar) döner.
+    k komşu tablosuna sığıyorsa doğrudan tablodan okunur; daha büyük k için
+    satır anında hesaplanıp top_k_row ile seçilir.
+    """
+    if k <= neighbor_indices.shape[1]:
+        return np.asarray(neighbor_indices[idx, :k]), np.asarray(neighbor_scores[idx, :k])
+    return top_k_row(similarity_row(features, idx, numeric, text_weight), k, exclude=idx)
+
+
+def _assign_rows(seed_pos, cand, sc, k):
+    """
+    Adayları tekilleştirir (her film sadece en yüksek puanlı tohumda kalır),
+    tohum sırasına + azalan puana göre dizer ve tohum başına ilk k'yı bırakır.
+    """
+    order = np.argsort(-sc, kind="stable")
+    _, first = np.unique(cand[order], return_index=True)
+    keep = order[first]
+    seed_pos, cand, sc = seed_pos[keep], cand[keep], sc[keep]
+
+    order = np.lexsort((-sc, seed_pos))
+    seed_pos, cand, sc = seed_pos[order], cand[order], sc[order]
+    rank = np.arange(len(seed_pos)) - np.searchsorted(seed_pos, seed_pos)
+    keep = rank < k
+    return seed_pos[keep], cand[keep], sc[keep]
+
+
+def batch_neighbors(seeds, k, neighbor_indices, neighbor_scores, features=None, numeric=None,
+                    text_weight=0.85, exclude=None):
+    """
+    Birden fazla tohum film için komşuları tek seferde bulur.
+    Dönüş: (seed_pos, indices, scores) - her aday için hangi tohumdan geldiği (seeds içindeki sırası),
+    satır numarası ve puanı; tohum sırasına, sonra puana göre sıralı, tohum başına en fazla k aday.
+    Aynı film birden çok tohumda çıkarsa sadece en yüksek puanlı tohumda kalır; tohumlar ve
+    exclude (ör. izlenenler) hiç dönmez.
+
+    Önce komşu tablosundan tek bir gather yapılır. Bir satır k'dan kısa kalırsa ve features
+    verilmişse, tüm tohumların satırları tek bir seyrek çarpımla kesin olarak hesaplanır.
+    """
+    seeds = np.asarray(seeds, dtype=np.int64)
+    banned = np.union1d(seeds, np.asarray(exclude if exclude is not None else [], dtype=np.int64))
+
+    # 1) Tablodan tek gather: (S, width)
+    table_scores = np.asarray(neighbor_scores[seeds], dtype=np.float32)
+    cand = np.asarray(neighbor_indices[seeds], dtype=np.int64).ravel()
+    sc = table_scores.ravel()
+    seed_pos = np.repeat(np.arange(len(seeds)), table_scores.shape[1])
+    keep = ~np.isin(cand, banned) & np.isfinite(sc)
+    result = _assign_rows(seed_pos[keep], cand[keep], sc[keep], k)
+    if features is None:
+        return result
+
+    # Hariç tutulanlar ve tekilleştirme yüzünden k'dan kısa kalan satır yoksa tablo yeterli.
+    # (Bir film, tablo dışında kaldığı bir tohumda daha yüksek puan alsa da tablodaki tohumuna atanır.)
+    if np.bincount(result[0], minlength=len(seeds)).min() >= k:
+        return result
+
+    # 2) Kesin yol: (S, N) blok tek seyrek çarpımla; her film sadece en iyi tohumunda kalır
+    # features @ (F, S) yoğun: seyrek×seyrek çarpımdan (ve features.T dönüşümünden) çok daha hızlı
+    seed_rows = features[seeds]
+    seed_rows = seed_rows.toarray() if sparse.issparse(seed_rows) else np.asarray(seed_rows)
+    block = np.asarray(features @ seed_rows.T, dtype=np.float32).T.copy()
+    if numeric is not None:
+        numeric = normalize_rows(numeric)
+        block = text_weight * block + (1.0 - text_weight) * (numeric[seeds] @ numeric.T)
+    block[:, banned] = -np.inf
+    best_seed = block.argmax(axis=0)
+    block[best_seed != np.arange(len(seeds))[:, None]] = -np.inf
+    cand, sc = _top_k(block, k)
+    seed_pos = np.repeat(np.arange(len(seeds)), cand.shape[1])
+    cand, sc = cand.ravel(), sc.ravel()
+    keep = np.isfinite(sc)
+    return _assign_rows(seed_pos[keep], cand[keep], sc[keep], k)
+
+
+def to_records(df, id_column, indices, scores):
+    """Satır numarası + puan dizilerini [{"movie_id", "title", "original_title", "score"}] listesine çevirir."""
+    rows = df.iloc[np.asarray(indices, dtype=np.int64)]
+    return [
+        {"movie_id": int(mid), "title": title, "original_title": original, "score": float(score)}
+        for mid, title, original, score in zip(
+            rows[id_column].tolist(), rows['title'].fillna('İsimsiz Film').tolist(),
+            rows['original_title'].fillna('').tolist(), np.asarray(scores).tolist(),
+        )
+    ]
+
+
+def build_block(text, numeric, start, stop, k, text_weight=0.85):
+    """
+    [start, stop) satırları için hibrit benzerliği hesaplar ve sadece top-k komşuyu tutar.
+    text ve numeric önceden satır-normalize edilmiş olmalıdır.
+    Bellekte aynı anda yalnızca (stop - start) × N'lik tek bir blok bulunur.
+    """
+    block = text[start:stop].dot(text.T)
+    block = block.toarray() if sparse.issparse(block) else np.asarray(block)
+    block = block.astype(np.float32, copy=False)
+    if numeric is not None:
+        block *= text_weight
+        block += (1.0 - text_weight) * (numeric[start:stop] @ numeric.T)
+
+    # Film kendisine komşu olmasın
+    rows = np.arange(stop - start)
+    block[rows, rows + start] = -np.inf
+    return _top_k(block, k)
+
+
+def _init_worker(workdir, shape, k, text_weight, has_numeric):
+    """Worker başlangıcı: girdileri ve çıktı tablolarını kopyalamadan mmap ile açar."""
+    load = lambda name, mode="r": np.load(os.path.join(workdir, f"{name}.npy"), mmap_mode=mode)
+    text = sparse.csr_matrix((load("data"), load("indices"), load("indptr")), shape=shape, copy=False)
+    _worker_state.update(
+        text=text,
+        numeric=load("numeric") if has_numeric else None,
+        out_indices=load("out_indices", "r+"),
+        out_scores=load("out_scores", "r+"),
+        k=k,
+        text_weight=text_weight,
+    )
+
+
+def _run_block(bounds):
+    """Tek bir satır bloğunu hesaplar ve sonucu ortak çıktı tablosuna yazar."""
+    start, stop = bounds
+    st = _worker_state
+    idx, sc = build_block(st["text"], st["numeric"], start, stop, st["k"], st["text_weight"])
+    st["out_indices"][start:stop] = idx
+    st["out_scores"][start:stop] = sc
+    return stop - start
+
+
+def _build_parallel(text, numeric, k, text_weight, block_size, workers):
+    """
+    Satır bloklarını ProcessPoolExecutor'a dağıtır. Seyrek matris (data/indices/indptr)
+    ve sayısal özellikler geçici dizine .npy olarak bir kez yazılır; worker'lar onları
+    mmap ile açar, yani her göreve matris pickle edilip gönderilmez.
+    """
+    n = text.shape[0]
+    with tempfile.TemporaryDirectory(prefix="cinematch_nn_") as workdir:
+        np.save(os.path.join(workdir, "data.npy"), text.data)
+        np.save(os.path.join(workdir, "indices.npy"), text.indices)
+        np.save(os.path.join(workdir, "indptr.npy"), text.indptr)
+        if numeric is not None:
+            np.save(os.path.join(workdir, "numeric.npy"), numeric)
+        out_indices = np.lib.format.open_memmap(os.path.join(workdir, "out_indices.npy"), "w+", np.int32, (n, k))
+        out_scores = np.lib.format.open_memmap(os.path.join(workdir, "out_scores.npy"), "w+", np.float32, (n, k))
+
+        blocks = [(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(workdir, text.shape, k, text_weight, numeric is not None),
+        ) as pool:
+            for _ in pool.map(_run_block, blocks):
+                pass
+
+        # Geçici dizin silinmeden önce sonuçları belleğe al
+        return np.array(out_indices), np.array(out_scores)
+
+
+def build_neighbor_table(text_matrix, numeric=None, k=50, text_weight=0.85, block_size=512, workers=1):
+    """
+    Seyrek metin matrisini satır blokları halinde işleyerek her film için
+    en benzer k filmi bulur. Dönüş: (indices int32 [N, k], scores float32 [N, k]).
+    numeric verilirse puan = text_weight * metin + (1 - text_weight) * sayısal kosinüs.
+    En yüksek bellek kullanımı O(N·k + block_size·N), yani N² değil.
+    workers > 1 ise bloklar o kadar sürece paralel dağıtılır.
+    """
+    text = normalize_rows(text_matrix)
+    numeric = normalize_rows(numeric) if numeric is not None else None
+    n = text.shape[0]
+    k = max(1, min(k, n - 1))
+
+    if workers > 1 and n > block_size:
+        return _build_parallel(text, numeric, k, text_weight, block_size, workers)
+
+    indices = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        idx, sc = build_block(text, numeric, start, stop, k, text_weight)
+        indices[start:stop] = idx
+        scores[start:stop] = sc
+    return indices, scores
@@ -1,135 +1,525 @@
 # DB-driven recommender - no cosine similarity OOM
+import asyncio
+import os
+
 from sqlalchemy.future import select
-from sqlalchemy import desc, and_, or_, func
+from sqlalchemy import desc, and_, or_, func, exists, union, true, bindparam, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import aliased
 import pandas as pd
 import numpy as np
 
 from backend.src.db_pg import engine as db_engine, async_session_maker
-from backend.src.models_pg import Movie, User, Interaction, Genre, MovieGenre
+from backend.src.models_pg import Movie, User, Interaction
+from backend.src.sampling import decode_offset_cursor, new_seed, offset_cursor, sample_keys, sample_order, sample_positions
+from backend.src.genre_index import GenreIndex
+from backend.src.item_cf import ItemCF
+from backend.src.als import ALSModel
+from backend.src.taste import TasteCache, TasteProfile
+from backend.src.hybrid import HybridScorer
+from backend.src.catalog import Catalog
+from backend.src.genre_catalog import genre_catalog
+from backend.src.title_index import TitleIndex
+from backend.src.result_cache import RESULT_DEPTH, ResultCache, encode_cursor, result_key
+from backend.src.recommenderv3 import MovieRecommender
+
+CF_POOL = 500  # Kullanıcı başına sıralanan en fazla CF adayı
+
+CONTENT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "movies_with_metadata.csv")
+
+
+def load_content_model(data_path: str = CONTENT_DATA_PATH):
+    """
+    İçerik tabanlı motoru (v3) build adımında kurulup depoyla gönderilen artifact'ten salt okunur açar
+    (python backend/scripts/build_neighbors.py). Artifact yoksa ya da eskiyse CSV'den sadece bellekte
+    kurar; çalışan süreç diske yazmaz (Vercel'de uygulama dizini salt okunur, worker'lar da aynı dizine yarışırdı).
+    """
+    motor = MovieRecommender(data_path)
+    if not motor.load_artifact():
+        print(" Komşu tablosu bellekte kuruluyor; kalıcı olması için build_neighbors.py çalıştırılmalı.")
+        motor.load_data()
+        motor.create_similarity_matrix()
+    return motor
 
 
 class CineMatchEngine:
     def __init__(self):
         self.is_ready = False
+        self.genre_index = GenreIndex()
+        self.catalog = Catalog()  # Film satırlarının salt okunur anlık görüntüsü (kart/detay için)
+        self.search_index = None  # Katalog satırları üzerinde başlık arama indeksi (TitleIndex)
+        self.hybrid = None  # Puan/popülerlik/yıl/tür özellik matrisi (ranking="hybrid" için)
+        self.item_cf = ItemCF()
+        self.als = None  # Çevrimdışı eğitilmiş ALS faktörleri (artifact varsa)
+        self._cf_pending = None  # Tam yeniden kurulum sürerken gelen etkileşimler (sonra tekrar uygulanır)
+        self.taste = TasteCache()  # user_id -> tür uzayında zevk vektörü (LRU)
+        self.results = ResultCache(
+            capacity=int(os.environ.get("RESULT_CACHE_SIZE", 2000)),
+            ttl=float(os.environ.get("RESULT_CACHE_TTL", 600)),
+        )  # (kullanıcı / tür kümesi, seed) -> sıralı film ID'leri
+        self.content = None  # İçerik tabanlı komşu tablosu (ilk benzer-film isteğinde açılır)
+        self._content_lock = asyncio.Lock()
 
     async def refresh_data(self):
-        """Sadece hazır bayrağını ayarlar (ağır hesaplama yok)."""
+        """Bellek içi tür indeksini, kataloğları ve item-item CF modelini DB'den yeniden kurar, motoru hazır işaretler."""
+        async with async_session_maker() as session:
+            self.genre_index = await GenreIndex.load(session)
+            self.catalog = await Catalog.load(session)
+            self.search_index = TitleIndex(
+                list(zip(self.catalog.strings["title"], self.catalog.strings["original_title"])),
+                self.catalog.floats["popularity"],
+            )
+            self.hybrid = await HybridScorer.load(session, self.genre_index)
+            self.item_cf = await ItemCF.load(session, self.genre_index.movie_ids)
+            await genre_catalog.load(session)
+        self.taste.clear()
+        self.results.clear()
+        try:
+            self.als = ALSModel.load()
+        except (FileNotFoundError, ValueError) as e:
+            self.als = None
+            print(f" ALS modeli yok, item-item CF kullanılacak: {e}")
         self.is_ready = True
-        print(" Motor Hazır (DB-driven mod).")
+        print(f" Motor Hazır (DB-driven mod, {len(self.genre_index.movie_ids)} film indekslendi, "
+              f"{self.item_cf.liked.nnz} beğeniden item-item CF kuruldu).")
+
+    async def record_interaction(self, user_id, movie_id, is_liked: bool):
+        """
+        create_interaction sonrası: CF modelini ve zevk profilini artımlı günceller (tam yeniden kurulum yok).
+        Komşu satırı güncellemeleri thread'de çalışır; popüler bir film event loop'u bloklamaz.
+        """
+        if self._cf_pending is not None:  # Tam kurulum sürüyorsa yeni modele de uygulansın
+            self._cf_pending.append((user_id, movie_id, bool(is_liked)))
+        model = self.item_cf
+        if model.is_ready:
+            cached = self.taste.peek(user_id)
+            sign = await asyncio.to_thread(model.add_interaction, user_id, movie_id, bool(is_liked))
+            self._taste_like(user_id, movie_id, sign, cached)
+        self.results.invalidate_user(user_id)
+
+    async def forget_interaction(self, user_id, movie_id):
+        """delete_interaction sonrası: etkileşimi CF modelinden ve zevk profilinden de çıkarır (thread'de)."""
+        if self._cf_pending is not None:  # Tam kurulum sürüyorsa yeni modele de uygulansın
+            self._cf_pending.append((user_id, movie_id, None))
+        model = self.item_cf
+        if model.is_ready:
+            cached = self.taste.peek(user_id)
+            sign = await asyncio.to_thread(model.remove_interaction, user_id, movie_id)
+            self._taste_like(user_id, movie_id, sign, cached)
+        self.results.invalidate_user(user_id)
+
+    def _taste_like(self, user_id, movie_id, sign: int, cached):
+        """
+        Beğeni değiştiyse önbellekteki zevk vektörüne filmin tür satırını ekler/çıkarır.
+        cached, CF güncellemesi thread'e gitmeden önce önbellekteki profildir. Güncelleme sürerken
+        profil (likes_by_user'dan) yeniden kurulduysa beğeniyi zaten içeriyor olabilir: yamalanmaz, atılır.
+        """
+        if not sign:
+            return
+        if self.taste.peek(user_id) is not cached:
+            self.taste.drop(user_id)
+            return
+        pos = self.genre_index.positions([movie_id])[0]
+        if pos >= 0:
+            self.taste.add_like(user_id, self.genre_index.genre_matrix()[pos], sign)
+
+    def update_preferences(self, user_id, genre_ids):
+        """save_user_preferences sonrası: selected_genres kısmını yeniler."""
+        if self.genre_index.is_ready:
+            self.taste.set_selected(user_id, self.genre_index.genre_vector(genre_ids))
+        self.results.invalidate_user(user_id)
+
+    async def taste_profile(self, session, user_id):
+        """
+        Kullanıcının zevk profili; önbellekte yoksa selected_genres (tek sorgu) ve
+        CF modelindeki beğenilerden kurulur. Kullanıcı yoksa None.
+        """
+        profile = self.taste.get(user_id)
+        if profile is None:
+            row = (await session.execute(
+                select(User.selected_genres).where(User.user_id == user_id)
+            )).first()
+            if row is None:
+                return None
+            liked = self.item_cf.likes_by_user.get(user_id, ())
+            profile = TasteProfile.build(
+                self.genre_index.genre_matrix(), self.genre_index.genre_vector(row[0]), sorted(liked)
+            )
+            self.taste.put(user_id, profile)
+        return profile
+
+    def taste_page(self, user_id, profile, skip: int = 0, limit: int = 20, seed: int = None, exclude_ids=None,
+                   ranking: str = "shuffle", weights=None):
+        """
+        _user_page_stmt'in bellek içi karşılığı: aday havuzu zevk vektörüyle puanı > 0 olan
+        (yani hedef türlerden en az birinde), izlenmemiş filmler. Sıra: puan azalan,
+        eşit puanlılar seed'li karıştırma sırasında. Sadece skip + limit kadar film sıralanır.
+        ranking="hybrid" ise havuz aynı kalır, sıra hibrit puandır (tür uyumu = zevk vektörü).
+        """
+        index = self.genre_index
+        scores = index.genre_matrix() @ profile.vector()
+        unwatched = np.ones(len(index.movie_ids), dtype=bool)
+        unwatched[list(self.item_cf.watched_by_user.get(user_id, ()))] = False
+
+        in_pool = (scores > 0) & unwatched
+        if in_pool.any():
+            keep = in_pool & (index.vote_average > 5.5)
+        else:
+            keep = unwatched & (index.vote_average > 5.0)
+            scores = np.zeros_like(scores)
+        if exclude_ids is not None and len(exclude_ids):
+            pos = index.positions(exclude_ids)
+            keep[pos[pos >= 0]] = False
+
+        if ranking == "hybrid":
+            top, _ = self.hybrid.top_positions(keep, skip, limit, profile.vector(), weights)
+            return index.movie_ids[top].tolist()
+
+        candidates = np.flatnonzero(keep)
+        stop = skip + limit
+        if stop <= skip or skip >= len(candidates):
+            return []
+        cand_scores = scores[candidates]
+        if stop < len(candidates):
+            # Sayfanın son sırasındaki puan eşiği; eşitlerin hepsi sıralamaya girer
+            threshold = np.partition(-cand_scores, stop - 1)[stop - 1]
+            top = -cand_scores <= threshold
+            candidates, cand_scores = candidates[top], cand_scores[top]
+        shuffled = sample_keys(index.shuffle_key[candidates], new_seed() if seed is None else seed)
+        order = np.lexsort((shuffled, -cand_scores))[skip:stop]
+        return index.movie_ids[candidates[order]].tolist()
+
+    async def rebuild_item_cf(self):
+        """
+        CF modelini DB'den baştan kurar, artımlı güncellenen modelle karşılaştırır ve yerine koyar.
+        Kurulum sırasında gelen etkileşimler yeni modele tekrar uygulanır (işlemler idempotent).
+        Dönüş: karşılaştırma sonucu (ItemCF.compare) ya da ilk kurulumsa None.
+        """
+        self._cf_pending = []
+        try:
+            async with async_session_maker() as session:
+                fresh = await ItemCF.load(session, self.genre_index.movie_ids)
+            # Bekleyenler await'ler arasında da gelebilir; liste boşalana kadar thread'de uygulanır
+            applied = 0
+            while applied < len(self._cf_pending):
+                user_id, movie_id, is_liked = self._cf_pending[applied]
+                applied += 1
+                if is_liked is None:
+                    await asyncio.to_thread(fresh.remove_interaction, user_id, movie_id)
+                else:
+                    await asyncio.to_thread(fresh.add_interaction, user_id, movie_id, is_liked)
+            await asyncio.to_thread(fresh.rebuild_stale)
+            if self.item_cf.is_ready:
+                await asyncio.to_thread(self.item_cf.rebuild_stale)  # Bekleyen satırlar kayma sayılmasın
+            drift = self.item_cf.compare(fresh) if self.item_cf.is_ready else None
+            self.item_cf = fresh
+            self.taste.clear()  # Profiller yeni modeldeki beğenilerden tekrar kurulsun
+        finally:
+            self._cf_pending = None
+        if drift and drift["mismatched_rows"]:
+            print(f" Item-item CF artımlı model kaymış: {drift}")
+        return drift
+
+    async def run_periodic_rebuild(self, interval: float):
+        """Arka plan görevi: her interval saniyede bir CF modelini tam kurulumla doğrular."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.rebuild_item_cf()
+            except Exception as e:
+                print(f"Item-item CF yeniden kurulamadı: {e}")
+
+    def search(self, query, limit: int = 50, fuzzy: bool = True, substring: bool = True):
+        """Başlık araması: [(movie_id, puan, eşleşme türü)], en iyi eşleşme önce (bkz. TitleIndex.candidates)."""
+        found = self.search_index.candidates(query, limit=limit, fuzzy=fuzzy, substring=substring)
+        return [(int(self.catalog.movie_ids[row]), score, kind) for row, score, kind in found]
+
+    def search_ids(self, query):
+        """
+        Liste filtresi için eşleşen tüm filmlerin ID'leri (tam ad, önek, kelime önekleri, ILIKE '%q%' karşılığı;
+        bu sırayla, her katmanda popüler olan önce). Sınır yok: sayfalama filtrelenmiş küme üzerinde yapılır.
+        Yazım hatası toleransı (fuzzy) yok: eşleşme yoksa boş liste, fuzzy adaylar sadece
+        /search/query ve /search/autocomplete'te.
+        """
+        return [mid for mid, _, _ in self.search(query, limit=len(self.catalog.movie_ids), fuzzy=False)]
 
     async def get_genre_names(self, genre_ids):
-        """Sayısal Tür ID'lerini 'Action' gibi isimlere çevirir."""
+        """Sayısal Tür ID'lerini 'Action' gibi isimlere çevirir (süreç genelindeki tür kataloğundan)."""
         if not genre_ids:
             return []
-        async with async_session_maker() as session:
-            result = await session.execute(select(Genre).where(Genre.genre_id.in_(genre_ids)))
-            genres = result.scalars().all()
-            return [g.genre_name for g in genres]
+        return (await genre_catalog.ensure()).names_of(genre_ids)
 
-    async def recommend_for_guest(self, selected_genre_ids, skip: int = 0, limit: int = 20):
-        """GUEST: Seçili türlerde yüksek puanlı ve rastgele filmler döner."""
+    async def recommend_for_guest(self, selected_genre_ids, skip: int = 0, limit: int = 20, seed: int = None,
+                                  ranking: str = "shuffle", weights=None):
+        """
+        GUEST: Seçili türlerde yüksek puanlı filmleri seed'e göre karıştırılmış sırayla döner.
+        ranking="hybrid" ise aynı filmler hibrit puana göre sıralanır (weights ile ayarlanabilir).
+        """
+        page_ids = self.guest_ids(selected_genre_ids, skip, limit, seed=seed, ranking=ranking, weights=weights)
         async with async_session_maker() as session:
-            if selected_genre_ids:
-                genre_movie_ids_result = await session.execute(
-                    select(MovieGenre.movie_id)
-                    .where(MovieGenre.genre_id.in_(selected_genre_ids))
-                    .distinct()
-                )
-                genre_movie_ids = [r[0] for r in genre_movie_ids_result.fetchall()]
-
-                if genre_movie_ids:
-                    stmt = (
-                        select(Movie)
-                        .where(Movie.movieId.in_(genre_movie_ids))
-                        .where(Movie.vote_average > 6.0)
-                        .order_by(func.random())
-                        .offset(skip)
-                        .limit(limit)
-                    )
-                else:
-                    stmt = select(Movie).where(Movie.vote_average > 5.0).order_by(func.random()).offset(skip).limit(limit)
-            else:
-                stmt = select(Movie).where(Movie.vote_average > 5.0).order_by(func.random()).offset(skip).limit(limit)
+            return await self.movie_cards(session, page_ids)
 
-            result = await session.execute(stmt)
-            movies = result.scalars().all()
+    def guest_ids(self, selected_genre_ids, skip: int = 0, limit: int = 20, seed: int = None,
+                  ranking: str = "shuffle", weights=None):
+        """recommend_for_guest sayfasının film ID'leri (tamamen bellekte)."""
+        index = self.genre_index
+        keep = index.vote_average > 5.0
+        if selected_genre_ids:
+            in_genres = index.select(any_of=selected_genre_ids)
+            if in_genres.any():
+                keep = in_genres & (index.vote_average > 6.0)
 
-        return self._format_movies(movies)
+        if ranking == "hybrid":
+            top, _ = self.hybrid.top_positions(keep, skip, limit, index.genre_vector(selected_genre_ids), weights)
+            return index.movie_ids[top].tolist()
+        return self.sample_ids(keep, seed, skip=skip, limit=limit)
+
+    def sample_ids(self, keep, seed: int = None, skip: int = 0, limit: int = 20):
+        """Tür indeksindeki seçili filmlerden seed'li sıradaki bir sayfanın ID'lerini döner."""
+        return self.sample_page(keep, new_seed() if seed is None else seed, skip=skip, limit=limit)[0]
+
+    def sample_page(self, keep, seed: int, cursor: str = None, skip: int = 0, limit: int = 20):
+        """
+        sample_ids'in sayfalı hâli: cursor (önceki sayfanın offset_cursor'ı) verilirse skip yerine o konumdan
+        başlar. Dönüş: (film ID'leri, sonraki sayfanın cursor'ı ya da None). Başka seed'in cursor'ı ValueError.
+        """
+        if cursor:
+            skip = decode_offset_cursor(cursor, seed)
+        positions = np.flatnonzero(keep)
+        page = sample_positions(self.genre_index.shuffle_key[positions], seed, skip=skip, limit=limit)
+        more = len(page) == limit and skip + limit < len(positions)
+        return self.genre_index.movie_ids[positions[page]].tolist(), offset_cursor(seed, skip + limit) if more else None
 
-    async def recommend_for_user(self, user_id, skip: int = 0, limit: int = 20):
-        """LOGIN: Kullanıcının selected_genres + beğendiği filmlere göre öneri yapar."""
+    async def movie_cards(self, session, movie_ids):
+        """Verilen ID'lerin öneri kartları, sıra korunur: katalogdan, katalog yüklenmemişse DB'den."""
+        if self.catalog.is_ready:
+            return await self.catalog.get_cards(session, movie_ids)
+        return self._format_movies(await self.fetch_movies(session, movie_ids))
+
+    async def fetch_movies(self, session, movie_ids):
+        """Verilen ID'lerdeki filmleri primary key ile tek sorguda çeker, sırayı korur."""
+        if not movie_ids:
+            return []
+        result = await session.execute(select(Movie).where(Movie.movieId.in_(movie_ids)))
+        by_id = {m.movieId: m for m in result.scalars().all()}
+        return [by_id[mid] for mid in movie_ids if mid in by_id]
+
+    def _user_page_stmt(self, user_id, skip: int = 0, limit=20, order_by=None, seed: int = None, exclude_ids=None):
+        """
+        recommend_for_user'ın tüm adımlarını (kullanıcı, izlenenler, beğenilen türler,
+        aday havuzu, yedek havuz) tek bir SQL ifadesinde CTE'ler ile kurar.
+        order_by verilmezse sayfa seed'li örnekleme ile seçilir. exclude_ids (ör. CF'nin zaten
+        gösterdiği filmler) havuzdan çıkarılır.
+        Dönen satırlar (user_id, Movie) çiftidir; kullanıcı yoksa hiç satır dönmez,
+        kullanıcı var ama film yoksa Movie kısmı None olan tek satır döner.
+        """
+        target_user = (
+            select(User.user_id, User.selected_genres)
+            .where(User.user_id == user_id)
+            .cte("target_user")
+        )
+
+        # İzlenen (etkileşim kurulan) tüm filmler
+        watched = (
+            select(Interaction.movie_id)
+            .where(Interaction.user_id == user_id)
+            .where(Interaction.movie_id.isnot(None))
+        )
+
+        # Kayıtta seçilen türler + beğenilen filmlerin türleri (movies.genre_ids dizisinden)
+        fav_genres = select(func.unnest(target_user.c.selected_genres).label("genre_id"))
+        liked_genres = (
+            select(func.unnest(Movie.genre_ids).label("genre_id"))
+            .join(Interaction, Interaction.movie_id == Movie.movieId)
+            .where(and_(Interaction.user_id == user_id, Interaction.is_liked == True))
+        )
+        target_genres = union(fav_genres, liked_genres).cte("target_genres")
+        target_array = select(func.array_agg(target_genres.c.genre_id)).scalar_subquery()
+
+        # Aday havuzu: hedef türlerden birine sahip (genre_ids && hedef dizi), henüz izlenmemiş filmler
+        candidate = aliased(Movie)
+        has_candidates = exists(
+            select(candidate.movieId)
+            .where(candidate.genre_ids.overlap(target_array))
+            .where(candidate.movieId.notin_(watched))
+        )
+
+        conditions = [or_(
+            and_(has_candidates,
+                 Movie.genre_ids.overlap(target_array),
+                 Movie.movieId.notin_(watched),
+                 Movie.vote_average > 5.5),
+            # Aday yoksa: izlenmemiş herhangi bir makul film
+            and_(~has_candidates,
+                 Movie.movieId.notin_(watched),
+                 Movie.vote_average > 5.0),
+        )]
+        if exclude_ids:
+            # Tek dizi parametresi: CF listesi 500 ayrı bind parametresine açılmaz, SQL metni liste uzunluğundan
+            # bağımsız kalır (hazırlanmış ifade önbelleği) ve NOT IN (SELECT unnest(...)) hash'lenmiş alt plan olur
+            excluded = bindparam("exclude_ids", list(exclude_ids), type_=ARRAY(Integer))
+            conditions.append(Movie.movieId.notin_(select(func.unnest(excluded))))
+        if order_by is None:
+            # Havuz koşulları (izlenenler, tür kesişimi, EXISTS) zaten tüm filmlerde değerlendiriliyor:
+            # sampled_page'in tur başına aralık taramaları yerine havuz tek seferde seed'li anahtara göre sıralanır
+            conditions.append(Movie.shuffle_key.isnot(None))
+            order_by = [sample_order(Movie.shuffle_key, new_seed() if seed is None else seed), Movie.movieId]
+        page = select(Movie).where(*conditions).order_by(*order_by).offset(skip).limit(limit)
+        page = page.subquery("page").lateral()
+        page_movie = aliased(Movie, page)
+
+        return (
+            select(target_user.c.user_id, page_movie)
+            .select_from(target_user)
+            .outerjoin(page, true())
+        )
+
+    def rank_for_user(self, user_id, limit: int = None):
+        """
+        Kullanıcı için kişisel sıralama: ALS modeli varsa faktörlerle (tek matvec + argpartition;
+        eğitimden sonra gelen kullanıcılar güncel beğenileriyle fold-in edilir), yoksa item-item CF.
+        """
+        limit = limit or CF_POOL
+        if not self.item_cf.is_ready:
+            return np.empty(0, dtype=np.int64)
+        if self.als is not None:
+            liked, watched = self.item_cf.user_movies(user_id)
+            ranked = self.als.recommend(user_id, liked, watched, limit=limit)
+            if len(ranked):
+                return ranked
+        return self.item_cf.recommend(user_id, limit=limit)
+
+    async def recommend_for_user(self, user_id, skip: int = 0, limit: int = 20, seed: int = None,
+                                 ranking: str = "shuffle", weights=None):
+        """
+        LOGIN: Önce kişisel sıralama (ALS ya da item-item CF, bkz. rank_for_user),
+        o liste bitince kullanıcının selected_genres + beğendiği türlerdeki havuz.
+        Havuz önbellekteki zevk vektörüyle bellekte puanlanır (taste_page); bellek içi
+        modeller hazır değilse aynı havuz tek SQL ifadesiyle seçilir (_user_page_stmt).
+        ranking/weights havuzun sırasını belirler (bkz. taste_page).
+        """
         async with async_session_maker() as session:
-            result_user = await session.execute(select(User).where(User.user_id == user_id))
-            user = result_user.scalars().first()
-            if not user:
+            if self.in_memory_ready:
+                page_ids = await self.user_ids(session, user_id, skip, limit, seed=seed, ranking=ranking, weights=weights)
+                if page_ids is None:
+                    return {"error": "Kullanıcı bulunamadı"}
+                return await self.movie_cards(session, page_ids)
+
+            ranked = self.rank_for_user(user_id).tolist()
+            cf_page = ranked[skip:skip + limit]
+            pool_skip, pool_limit = max(0, skip - len(ranked)), limit - len(cf_page)
+            result = await session.execute(self._user_page_stmt(
+                user_id, skip=pool_skip, limit=pool_limit, seed=seed, exclude_ids=ranked
+            ))
+            rows = result.all()
+            if not rows:
                 return {"error": "Kullanıcı bulunamadı"}
+            cf_movies = await self.fetch_movies(session, cf_page)
 
-            fav_genre_ids = user.selected_genres or []
+        movies = cf_movies + [movie for _, movie in rows if movie is not None]
+        return self._format_movies(movies)
 
-            # Get liked movie IDs
-            result_interact = await session.execute(
-                select(Interaction).where(
-                    and_(Interaction.user_id == user_id, Interaction.is_liked == True)
-                )
-            )
-            liked_interactions = result_interact.scalars().all()
-            liked_movie_ids = [i.movie_id for i in liked_interactions]
-            all_watched_ids = [i.movie_id for i in (await session.execute(
-                select(Interaction).where(Interaction.user_id == user_id)
-            )).scalars().all()]
-
-            # Build candidate pool: movies in user's fav genres, not yet watched
-            candidate_ids = []
-            if fav_genre_ids:
-                genre_movie_res = await session.execute(
-                    select(MovieGenre.movie_id)
-                    .where(MovieGenre.genre_id.in_(fav_genre_ids))
-                    .distinct()
-                )
-                candidate_ids = [r[0] for r in genre_movie_res.fetchall()]
-
-            # Also include movies from genres of liked films
-            if liked_movie_ids:
-                liked_genre_ids_res = await session.execute(
-                    select(MovieGenre.genre_id)
-                    .where(MovieGenre.movie_id.in_(liked_movie_ids))
-                    .distinct()
-                )
-                liked_genre_ids = [r[0] for r in liked_genre_ids_res.fetchall()]
-                if liked_genre_ids:
-                    extra_movies_res = await session.execute(
-                        select(MovieGenre.movie_id)
-                        .where(MovieGenre.genre_id.in_(liked_genre_ids))
-                        .distinct()
-                    )
-                    candidate_ids = list(set(candidate_ids + [r[0] for r in extra_movies_res.fetchall()]))
-
-            # Exclude watched movies
-            candidate_ids = [mid for mid in candidate_ids if mid not in all_watched_ids]
-
-            if not candidate_ids:
-                stmt = (
-                    select(Movie)
-                    .where(Movie.movieId.notin_(all_watched_ids) if all_watched_ids else True)
-                    .where(Movie.vote_average > 5.0)
-                    .order_by(func.random())
-                    .offset(skip)
-                    .limit(limit)
-                )
+    @property
+    def in_memory_ready(self):
+        """Kullanıcı önerileri bellekte (SQL'siz) hesaplanabilir mi?"""
+        return self.genre_index.is_ready and self.item_cf.is_ready
+
+    async def user_ids(self, session, user_id, skip: int = 0, limit: int = 20, seed: int = None,
+                       ranking: str = "shuffle", weights=None):
+        """recommend_for_user sayfasının film ID'leri (bellek içi yol); kullanıcı yoksa None."""
+        profile = await self.taste_profile(session, user_id)
+        if profile is None:
+            return None
+        ranked = self.rank_for_user(user_id).tolist()
+        cf_page = ranked[skip:skip + limit]
+        pool_skip, pool_limit = max(0, skip - len(ranked)), limit - len(cf_page)
+        return cf_page + self.taste_page(user_id, profile, pool_skip, pool_limit, seed=seed, exclude_ids=ranked,
+                                         ranking=ranking, weights=weights)
+
+    async def recommend_page(self, user_id=None, selected_genre_ids=(), skip: int = 0, limit: int = 20,
+                             seed: int = None, ranking: str = "shuffle", weights=None):
+        """
+        Önbellekli öneri sayfası. İlk istekte ilk RESULT_DEPTH film sıralanıp (kullanıcı ya da
+        tür kümesi, seed, sıralama) anahtarıyla saklanır; sonraki sayfalar bu listeden dilimlenir.
+        Dönüş: (kartlar ya da {"error"}, sonraki sayfanın cursor'ı ya da None).
+        """
+        seed = new_seed() if seed is None else seed
+        if user_id and not self.in_memory_ready:
+            movies = await self.recommend_for_user(user_id, skip, limit, seed=seed, ranking=ranking, weights=weights)
+            return movies, None
+
+        key = result_key(user_id, selected_genre_ids, seed, ranking, weights)
+        async with async_session_maker() as session:
+            ids = self.results.get(key)
+            if ids is None:
+                # Hesaplama await'ler arasında sürer; bu sırada etkileşim gelirse eski liste önbelleğe yazılmaz
+                generation = self.results.generation(user_id)
+                if user_id:
+                    ids = await self.user_ids(session, user_id, 0, RESULT_DEPTH, seed=seed, ranking=ranking, weights=weights)
+                    if ids is None:
+                        return {"error": "Kullanıcı bulunamadı"}, None
+                else:
+                    ids = self.guest_ids(selected_genre_ids, 0, RESULT_DEPTH, seed=seed, ranking=ranking, weights=weights)
+                self.results.put(key, ids, generation=generation)
+
+            if skip + limit <= len(ids) or len(ids) < RESULT_DEPTH:
+                page_ids = ids[skip:skip + limit]
+            elif user_id:
+                # Önbellek derinliğinin ötesi: aynı sıranın devamı doğrudan hesaplanır
+                page_ids = await self.user_ids(session, user_id, skip, limit, seed=seed, ranking=ranking, weights=weights)
             else:
-                stmt = (
-                    select(Movie)
-                    .where(Movie.movieId.in_(candidate_ids))
-                    .where(Movie.vote_average > 5.5)
-                    .order_by(func.random())
-                    .offset(skip)
-                    .limit(limit)
+                page_ids = self.guest_ids(selected_genre_ids, skip, limit, seed=seed, ranking=ranking, weights=weights)
+            movies = await self.movie_cards(session, page_ids or [])
+
+        more = len(page_ids or []) == limit and (skip + limit < len(ids) or len(ids) >= RESULT_DEPTH)
+        return movies, encode_cursor(key, skip + limit) if more else None
+
+    async def get_content_model(self):
+        """Komşu tablosunu bir kez (thread'de, event loop'u bloklamadan) yükler."""
+        if self.content is None:
+            async with self._content_lock:
+                if self.content is None:
+                    self.content = await asyncio.to_thread(load_content_model)
+        return self.content
+
+    async def similar_movies(self, movie_ids=None, user_id=None, k: int = 10, max_seeds: int = 10):
+        """
+        "X'i beğendiğin için" satırları: her tohum film için en benzer k film, tek bir toplu çağrıda.
+        movie_ids verilmezse kullanıcının son beğendiği (en fazla max_seeds) filmler tohum olur.
+        user_id verilirse kullanıcının etkileşim kurduğu filmler hiçbir satırda çıkmaz.
+        """
+        content = await self.get_content_model()
+        seeds = list(movie_ids or [])
+        watched = []
+        async with async_session_maker() as session:
+            if user_id is not None:
+                result = await session.execute(
+                    select(Interaction.movie_id, Interaction.is_liked)
+                    .where(Interaction.user_id == user_id)
+                    .where(Interaction.movie_id.isnot(None))
+                    .order_by(desc(Interaction.id))
                 )
+                interactions = result.all()
+                watched = [mid for mid, _ in interactions]
+                if not seeds:
+                    seeds = [mid for mid, liked in interactions if liked][:max_seeds]
 
-            result = await session.execute(stmt)
-            movies = result.scalars().all()
+            batch = content.recommend_batch(seeds, k=k, exclude_ids=watched)
 
-        return self._format_movies(movies)
+            # Satırlardaki tüm filmleri (poster, puan vs. için) tek sorguda çek
+            wanted = {r["seed"]["movie_id"] for r in batch["rows"]}
+            wanted.update(m["movie_id"] for r in batch["rows"] for m in r["movies"])
+            cards = await self.movie_cards(session, list(wanted))
+
+        by_id = {m["movieId"]: m for m in cards}
+        pick = lambda records: [{**by_id[r["movie_id"]], "score": r["score"]} for r in records if r["movie_id"] in by_id]
+        return {
+            "rows": [
+                {"seed": by_id[r["seed"]["movie_id"]], "movies": pick(r["movies"])}
+                for r in batch["rows"] if r["seed"]["movie_id"] in by_id
+            ],
+            "merged": pick(batch["merged"]),
+        }
 
     def _format_movies(self, movies):
         """SQLAlchemy model listesini frontend dict listesine çevirir."""
@@ -5,7 +5,17 @@ import pandas as pd #pd kısaltmasıyla pandas kütüphanesini çağırdık, pd
 import os #OS Neydi? os emekti, şaka, OS meaning of Operating System.
 from sklearn.feature_extraction.text import CountVectorizer # "Kelimeleri say ve bana kaç adım sağa, kaç adım yukarı gideceğimi söyleyen listeyi (vektörü) çıkar" 
                                                             #diyen araçtır.
-from sklearn.metrics.pairwise import cosine_similarity #"O noktalar arasındaki açıyı ölç ve bana 0 ile 1 arasında bir puan ver" diyen matematikçidir.
+#"O noktalar arasındaki açıyı ölç ve bana 0 ile 1 arasında bir puan ver" diyen matematikçi artık neighbors.py'de, blok blok çalışıyor.
+try:
+    from backend.src.neighbors import build_neighbor_table, normalize_rows, neighbors_for, to_records # Blok blok kosinüs + top-k, N×N matris yok.
+    from backend.src.title_index import TitleIndex # Başlık -> satır: tam eşleşme, önek, kelime, fuzzy
+    from backend.src import artifacts # Tabloları diske yazıp mmap ile geri açmak için
+except ImportError:
+    from neighbors import build_neighbor_table, normalize_rows, neighbors_for, to_records # Dosya doğrudan çalıştırıldığında
+    from title_index import TitleIndex
+    import artifacts
+
+ENGINE_NAME = "recommender-v1"
 
 class MovieRecommender:
     def __init__(self, data_path: str):
@@ -16,6 +26,10 @@ class MovieRecommender:
         """
         self.data_path = data_path
         self.df = None
+        self.feature_matrix = None
+        self.neighbor_indices = None # Her filmin en benzer k filmi (satır numaraları)
+        self.neighbor_scores = None # ve benzerlik puanları
+        self.title_index = None # Film adı indeksi, ilk aramada kurulur
 
     def load_data(self):
         """
@@ -24,45 +38,77 @@ class MovieRecommender:
         """
         if os.path.exists(self.data_path):
             self.df = pd.read_csv(self.data_path)
+            self.title_index = TitleIndex.from_frame(self.df)
             print("Dosya bulundu, yükleniyor...")
         else:
             print("Dosya bulunamadı!")
 
-    def create_similarity_matrix(self):
+    def create_similarity_matrix(self, k: int = 50, workers: int = 1):
         # Bilgisayara "Kelimeleri saymaya başla" diyoruz
         # Boş olan türler (genre) varsa hata vermemesi için fillna('') ekliyoruz
         cv = CountVectorizer()
-        count_matrix = cv.fit_transform(self.df['genres'].fillna(''))
+        self.feature_matrix = normalize_rows(cv.fit_transform(self.df['genres'].fillna('')))
 
-        # Puanları hesapla ve hafızaya (self) kaydet
-        self.similarity_matrix = cosine_similarity(count_matrix)
+        # Puanları hesapla, her film için en benzer k filmi hafızaya (self) kaydet
+        self.neighbor_indices, self.neighbor_scores = build_neighbor_table(self.feature_matrix, k=k, workers=workers)
         print(" Benzerlik motoru Adal tarafından başarıyla kuruldu!")
 
-    def get_recommendations(self, movie_title: str):
+    def save_artifact(self, artifact_dir: str = None):
+        """Komşu tablosunu ve başlık/ID tablolarını diske yazar (bir sonraki açılış CSV'siz olur)."""
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        params = {"k": int(self.neighbor_indices.shape[1])}
+        artifacts.save_artifact(artifact_dir, artifacts.engine_arrays(self, 'movieId'), ENGINE_NAME, self.data_path, params)
+        print(f" Artifact kaydedildi: {artifact_dir}")
+
+    def load_artifact(self, artifact_dir: str = None):
+        """Kayıtlı artifact'i mmap ile açar. Yoksa veya CSV değiştiyse False döner."""
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        source = self.data_path if os.path.exists(self.data_path) else None
         try:
-            # 1. Girilen filmin tablodaki yerini (index) bulalım; Aramayı küçült
-            search_term = movie_title.lower().strip()
-            
-            # 2. 'original_title' içinde bu kelime geçiyor mu? (Tam eşitlik bekleme)
-            mask = self.df['original_title'].str.lower().str.contains(search_term, na=False)
-            idx = self.df[mask].index[0]
-
-            # 2. Bu filmin diğerleriyle olan puanlarını bir listeye alalım
-            # (enumerate kullanıyoruz ki hangi puanın hangi filme ait olduğunu unutmayalım)
-            sim_scores = list(enumerate(self.similarity_matrix[idx]))
-            
-            # 3. Puanlara göre büyükten küçüğe sıralayalım (X[1] puandır)
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            # 4. İlk film kendisidir, o yüzden 1'den 6'ya kadar olanları (en benzer 5) alalım
-            sim_scores = sim_scores[1:6]
-            
-            # 5. Bu indexleri film isimlerine geri çevirelim
-            movie_indices = [i[0] for i in sim_scores]
-            return self.df['title'].iloc[movie_indices].tolist()
-            
-        except IndexError:
+            arrays, manifest = artifacts.load_artifact(artifact_dir, ENGINE_NAME, source)
+        except (FileNotFoundError, artifacts.StaleArtifactError) as e:
+            print(f" Artifact kullanılamadı: {e}")
+            return False
+        artifacts.restore_engine(self, arrays, manifest, 'movieId')
+        self.title_index = TitleIndex.from_frame(self.df)
+        print(f" Artifact açıldı! Toplam Film: {len(self.df)}")
+        return True
+
+    def find_movies(self, movie_title: str, limit: int = 5):
+        """
+        Başlığa en çok uyan filmleri sıralı döner: [{"movie_id", "title", "original_title", "score", "match"}].
+        match: 'exact' / 'prefix' / 'token' / 'fuzzy' (yazım hatalı aramalar için).
+        """
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        found = self.title_index.candidates(movie_title, limit)
+        records = to_records(self.df, 'movieId', [f[0] for f in found], [f[1] for f in found])
+        return [{**record, "match": f[2]} for record, f in zip(records, found)]
+
+    def recommend(self, movie_title: str, k: int = 5):
+        """
+        Filme en benzer k filmi ID ve benzerlik puanlarıyla döner:
+        [{"movie_id", "title", "original_title", "score"}, ...]. Film bulunamazsa boş liste.
+        """
+        # 1-2. Girilen filmin tablodaki yerini (index) başlık indeksinden bulalım:
+        # önce tam eşleşme, sonra önek, sonra kelime, en son yazım hatası toleranslı arama.
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        idx = self.title_index.resolve(movie_title)
+        if idx is None:
+            return []
+
+        # 3. En benzer k film: tabloya sığıyorsa tablodan, sığmıyorsa tek satır hesaplayıp
+        # argpartition ile (tüm listeyi sıralamadan) seçiyoruz. Film kendisi hariç.
+        indices, scores = neighbors_for(idx, k, self.neighbor_indices, self.neighbor_scores, self.feature_matrix)
+        return to_records(self.df, 'movieId', indices, scores)
+
+    def get_recommendations(self, movie_title: str, k: int = 5):
+        results = self.recommend(movie_title, k)
+        if not results:
             return ["Hata: Film veritabanında bulunamadı!"]
+        # Bu sonuçları film isimlerine geri çevirelim
+        return [r["title"] for r in results]
 
 
 
@@ -78,13 +124,15 @@ if __name__ == "__main__":
     print(f"Aranan tam yol: {yol}") # Hangi adrese baktığını terminalde görelim
     
     adal_motoru = MovieRecommender(yol)
-    adal_motoru.load_data()
 
-    # Motoru çalıştır
-    adal_motoru.create_similarity_matrix()
+    # Kayıtlı artifact varsa onu aç, yoksa motoru CSV'den çalıştır
+    if not adal_motoru.load_artifact():
+        adal_motoru.load_data()
+        adal_motoru.create_similarity_matrix()
+        adal_motoru.save_artifact()
     
     # Gerçekten oluştu mu? Boyutuna bakalım:
-    print(f" Matris Hazır! Boyut: {adal_motoru.similarity_matrix.shape}") #Burada veriyi elde ettik aslında.
+    print(f" Tablo Hazır! Boyut: {adal_motoru.neighbor_indices.shape}") #Burada veriyi elde ettik aslında.
 
     #Gelen veriyle konuşmamız lazım; bakalım motorumuz çalışıyor mu?
     test_film = "     toy story      " # Veritabanında olduğundan emin olduğun bir film yaz
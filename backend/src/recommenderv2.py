@@ -10,8 +10,17 @@ import os # İşletim sistemiyle konuşur. "Şu dosya orada mı?" kontrolünü y
 #* Neden: Dosya yolu (path) hatalarını önlemek için.
 from sklearn.feature_extraction.text import CountVectorizer # Kelime sayıcı. Metinleri bilgisayarın anlayacağı sayılara (vektörlere) çevirir.
 #* Neden: Bilgisayar kelimelerden anlamaz, "1" ve "0"dan anlar. Çevirici lazım.
-from sklearn.metrics.pairwise import cosine_similarity # İki sayı dizisi arasındaki benzerliği ölçer.
-#* Neden: Hangi filmin diğerine ne kadar benzediğini matematiksel olarak hesaplamak için.
+try:
+    from backend.src.neighbors import build_neighbor_table, normalize_rows, neighbors_for, to_records # Blok blok kosinüs + top-k, N×N matris yok.
+    from backend.src.title_index import TitleIndex # Başlık -> satır: tam eşleşme, önek, kelime, fuzzy
+    from backend.src import artifacts # Tabloları diske yazıp mmap ile geri açmak için
+except ImportError:
+    from neighbors import build_neighbor_table, normalize_rows, neighbors_for, to_records # Dosya doğrudan çalıştırıldığında
+    from title_index import TitleIndex
+    import artifacts
+
+ENGINE_NAME = "recommender-v2"
+#* Neden: Hangi filmin diğerine ne kadar benzediğini hesaplamak için; ama N×N matrisi hiç kurmadan.
 
 # ---------------------------------
 # Kalıbı Kurmak (Class ve Init)
@@ -24,7 +33,10 @@ class MovieRecommender: # Recommender motorumuz.
         """
         self.data_path = data_path # Dosyanın nerede olduğunu hafızaya atar. Beyin bedava.
         self.df = None # Verisizken patlamayalım. Henüz yüklemedik çünkü de veriyi destur.
-        self.similarity_matrix = None # Henüz hesaplama yapmadık, sonuçlar için yer ayırdık.
+        self.feature_matrix = None # Satır-normalize edilmiş kelime matrisi
+        self.neighbor_indices = None # Henüz hesaplama yapmadık, sonuçlar için yer ayırdık: her filmin en benzer k filmi
+        self.neighbor_scores = None # ve bu filmlerin benzerlik puanları
+        self.title_index = None # Film adı indeksi, ilk aramada kurulur
         #* Neden inite ekliyoruz peki?
         #* Çünkü canısı motor başlar başlamaz ağır işlemleri yapıp bilgisayarı kilitlemeyelim. Veriyi sonra yükleyeceğiz (Lazy Loading).
 
@@ -38,6 +50,7 @@ class MovieRecommender: # Recommender motorumuz.
             if os.path.exists(self.data_path): # Burdaki amaç: Kör uçuş yapmamak. Dosya orada yoksa programın çökmesini engeller.
 
                 self.df = pd.read_csv(self.data_path) # CSV dosyasındaki virgülle ayrılmış yazıları alır, satır ve sütunlardan oluşan bir tabloya (DataFrame) çevirir.
+                self.title_index = TitleIndex.from_frame(self.df) # Film adı -> satır numarası indeksi (arama tek sözlük bakışı)
                 print(f" Dosya yüklendi! Toplam Film: {len(self.df)}")
                 print("Örnek veri (ilk satır):")
                 print(self.df.iloc[0]['llm_metadata']) # Buradaki amaç, verinin doğru formatta gelip gelmediğini gözle teyit etmek.
@@ -48,7 +61,7 @@ class MovieRecommender: # Recommender motorumuz.
 # ---------------------------------
 # Beyin (Matris Oluşturma)
 # ---------------------------------
-    def create_similarity_matrix(self): # Burası projenin beyni 
+    def create_similarity_matrix(self, k: int = 50, workers: int = 1): # Burası projenin beyni 
         """
         Artık sadece türlere değil, llm_metadata içindeki tüm bilgilere
         (Tür, Yıl, Puan, Popülerlik) bakarak benzerlik kuruyoruz.
@@ -58,45 +71,82 @@ class MovieRecommender: # Recommender motorumuz.
         
         #* self.df['llm_metadata'].fillna(''): Tablodaki llm_metadata sütununu alıyoruz ve boş bir hücre varsa hata vermesin diye orayı boşlukla dolduruyoruz (fillna).
         #* cv.fit_transform(...): Tüm filmlerin açıklamalarını alıyor ve devasa bir sayı tablosuna çeviriyor.
-        count_matrix = cv.fit_transform(self.df['llm_metadata'].fillna(''))
+        self.feature_matrix = normalize_rows(cv.fit_transform(self.df['llm_metadata'].fillna('')))
         
-        #* cosine_similarity(count_matrix): Her filmin sayı dizisini diğerleriyle karşılaştırır.
-        self.similarity_matrix = cosine_similarity(count_matrix)
-        print(" Gelişmiş Benzerlik Matrisi oluşturuldu!")
+        #* build_neighbor_table: Her filmin sayı dizisini diğerleriyle karşılaştırır, sadece en benzer k tanesini tutar.
+        self.neighbor_indices, self.neighbor_scores = build_neighbor_table(self.feature_matrix, k=k, workers=workers)
+        print(" Gelişmiş Benzerlik Tablosu oluşturuldu!")
+
+# ---------------------------------
+# Diske Kaydetme / Geri Açma (Artifact)
+# ---------------------------------
+    def save_artifact(self, artifact_dir: str = None):
+        """Komşu tablosunu ve başlık/ID tablolarını diske yazar (bir sonraki açılış CSV'siz olur)."""
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        params = {"k": int(self.neighbor_indices.shape[1])}
+        artifacts.save_artifact(artifact_dir, artifacts.engine_arrays(self, 'movie_id'), ENGINE_NAME, self.data_path, params)
+        print(f" Artifact kaydedildi: {artifact_dir}")
+
+    def load_artifact(self, artifact_dir: str = None):
+        """Kayıtlı artifact'i mmap ile açar. Yoksa veya CSV değiştiyse False döner."""
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        source = self.data_path if os.path.exists(self.data_path) else None
+        try:
+            arrays, manifest = artifacts.load_artifact(artifact_dir, ENGINE_NAME, source)
+        except (FileNotFoundError, artifacts.StaleArtifactError) as e:
+            print(f" Artifact kullanılamadı: {e}")
+            return False
+        artifacts.restore_engine(self, arrays, manifest, 'movie_id')
+        self.title_index = TitleIndex.from_frame(self.df)
+        print(f" Artifact açıldı! Toplam Film: {len(self.df)}")
+        return True
 
 # ---------------------------------
 # Cevap Verme (get_recommendations)
 # ---------------------------------
-    def get_recommendations(self, movie_title: str):
+    def find_movies(self, movie_title: str, limit: int = 5):
+        """
+        Başlığa en çok uyan filmleri sıralı döner: [{"movie_id", "title", "original_title", "score", "match"}].
+        match: 'exact' / 'prefix' / 'token' / 'fuzzy' (yazım hatalı aramalar için).
+        """
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        found = self.title_index.candidates(movie_title, limit)
+        records = to_records(self.df, 'movie_id', [f[0] for f in found], [f[1] for f in found])
+        return [{**record, "match": f[2]} for record, f in zip(records, found)]
+
+    def recommend(self, movie_title: str, k: int = 5):
+        """
+        Filme en benzer k filmi ID ve benzerlik puanlarıyla döner:
+        [{"movie_id", "title", "original_title", "score"}, ...]. Film bulunamazsa boş liste.
+        """
+        # 1-2. Filmin satır numarasını başlık indeksinden bul
+        #* Önce tam eşleşme (sözlük), sonra önek (sıralı dizi), sonra kelime indeksi, en son fuzzy.
+        #* Aynı seviyedeki eşleşmelerde en popüler film seçilir; eskisi gibi "ilk bulunan" değil.
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        idx = self.title_index.resolve(movie_title) # idx: Bulunan filmin satır numarası
+        if idx is None:
+            return []
+
+        # 3. En benzer k filmi seç
+        #* k komşu tablosuna sığıyorsa tablodan okunur (zaten sıralı, film kendisi yok).
+        #* Sığmıyorsa filmin satırı anında hesaplanır ve argpartition ile sadece en iyi k tanesi sıralanır.
+        indices, scores = neighbors_for(idx, k, self.neighbor_indices, self.neighbor_scores, self.feature_matrix)
+        return to_records(self.df, 'movie_id', indices, scores)
+
+    def get_recommendations(self, movie_title: str, k: int = 5):
         try:
-            # 1. Arama terimini temizle
-            search_term = movie_title.lower().strip()
-            # 2. 'original_title' içinde arama yap (En güvenli sütun burası)
-            #* str.contains: "içinde geçiyor mu?" diye soruyoruz.
-            #* na=False: Eğer veritabanında ismi olmayan (boş) bir film varsa, hata verme, onu "bulunamadı" say.
-            mask = self.df['original_title'].str.lower().str.contains(search_term, na=False)
-            
+            results = self.recommend(movie_title, k)
+
             # --- GÜVENLİK KİLİDİ ---
-            # Eğer maske tamamen False ise (hiçbir şey bulunamadıysa):
-            if not mask.any():
+            # Hiçbir şey bulunamadıysa:
+            if not results:
                 return [f"Üzgünüm, veritabanımızda '{movie_title}' diye bir film bulamadım. Başka bir tane dener misin?"]
             # -----------------------
 
-            idx = self.df[mask].index[0] # idx: Bulunan filmin satır numarası
-            
-            # 3. Benzerlik puanlarını al ve sırala
-            sim_scores = list(enumerate(self.similarity_matrix[idx])) # enumerate kullanıyoruz ki hangi puanın hangi filme ait olduğunu unutmayalım
-
-            #* sorted: Puanı en yüksek olanı en başa al (reverse=True).
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            # 4. En iyi 5 filmi seç (İlk film kendisi olduğu için [1:6] alıyoruz)
-            sim_scores = sim_scores[1:6]
-
-            # Dönüşüm (Hayır kafkanınki değil)
-            movie_indices = [i[0] for i in sim_scores]
             # Sonuçları 'original_title' olarak döndür
-            return self.df['original_title'].iloc[movie_indices].tolist()
+            return [r["original_title"] for r in results]
             
         except Exception as e:
             return [f"Bir hata oluştu: {str(e)}"]
@@ -111,12 +161,16 @@ if __name__ == "__main__":
     yol = os.path.abspath(os.path.join(current_dir, '..', 'data', 'movies_with_metadata.csv'))
     
     adal_motoru = MovieRecommender(yol)
-    adal_motoru.load_data()
+
+    # Kayıtlı artifact varsa onu aç, yoksa CSV'den kur ve kaydet
+    if not adal_motoru.load_artifact():
+        adal_motoru.load_data()
+        if adal_motoru.df is not None:
+            adal_motoru.create_similarity_matrix()
+            adal_motoru.save_artifact()
     
     # Sadece veri yüklendiyse devam et
     if adal_motoru.df is not None:
-        adal_motoru.create_similarity_matrix()
-        
         # Test edelim: (inputla test, ama 2000e kadar idi veriler test aşamasında.)
         test_film = input("Film ismi: ")
         print(f"\n '{test_film}' için Adal'ın Önerileri:")
@@ -12,9 +12,17 @@ import numpy as np  # Matematiksel ağırlıklandırma için şart.
 import re # Metin temizliği için
 from sklearn.feature_extraction.text import CountVectorizer # Kelime sayıcı. Metinleri bilgisayarın anlayacağı sayılara (vektörlere) çevirir.
 #* Neden: Bilgisayar kelimelerden anlamaz, "1" ve "0"dan anlar. Çevirici lazım.
-from sklearn.metrics.pairwise import cosine_similarity # İki sayı dizisi arasındaki benzerliği ölçer.
-#* Neden: Hangi filmin diğerine ne kadar benzediğini matematiksel olarak hesaplamak için.
 from sklearn.preprocessing import MinMaxScaler # Her sütundaki en küçük sayıya 0, en büyük sayıya 1 der. Aradakileri de orantılar. Her şeyi 0 ile 1 arasına hapseder.
+try:
+    from backend.src.neighbors import build_neighbor_table, normalize_rows, neighbors_for, batch_neighbors, to_records # Blok blok kosinüs + top-k. N×N matrisi hiç kurmaz.
+    from backend.src.title_index import TitleIndex # Başlık -> satır: tam eşleşme, önek, kelime, fuzzy
+    from backend.src import artifacts # Hesaplanan tabloları diske yazıp mmap ile geri açmak için
+except ImportError:
+    from neighbors import build_neighbor_table, normalize_rows, neighbors_for, batch_neighbors, to_records # Dosya doğrudan çalıştırıldığında (python recommenderv3.py)
+    from title_index import TitleIndex
+    import artifacts
+
+ENGINE_NAME = "recommender-v3" # Artifact'in hangi motor için kurulduğunu ayırt etmek için
 
 # ---------------------------------
 # Kalıbı Kurmak (Class ve Init)
@@ -27,8 +35,13 @@ class MovieRecommender: # Recommender motorumuz.
         """
         self.data_path = data_path # Dosyanın nerede olduğunu hafızaya atar. Beyin bedava.
         self.df = None # Verisizken patlamayalım. Henüz yüklemedik çünkü de veriyi destur.
-        self.similarity_matrix = None # Henüz hesaplama yapmadık, sonuçlar için yer ayırdık.
+        self.neighbor_indices = None # Her filmin en benzer k komşusunun satır numaraları (int32, N×k)
+        self.neighbor_scores = None # Bu komşuların hibrit benzerlik puanları (float32, N×k)
+        self.title_index = None # Film adı indeksi, ilk aramada kurulur
+        self.id_lookup = None # (movie_id dizisi, sıralama) - ID -> satır numarası için
+        self.feature_matrix = None # Satır-normalize edilmiş seyrek metin matrisi
         self.normalized_df = None # Sayısal verilerin tutulacağı yer
+        self.numeric = None # Aynı veriler düz dizi olarak (artifact'ten açıldıysa mmap, normalized_df kurulmaz)
         #* Neden inite ekliyoruz peki?
         #* Çünkü canısı motor başlar başlamaz ağır işlemleri yapıp bilgisayarı kilitlemeyelim. Veriyi sonra yükleyeceğiz (Lazy Loading).
 
@@ -44,6 +57,8 @@ class MovieRecommender: # Recommender motorumuz.
             
             # 1. Adım: Dosyayı oku
                 self.df = pd.read_csv(self.data_path) # CSV dosyasındaki virgülle ayrılmış yazıları alır, satır ve sütunlardan oluşan bir tabloya (DataFrame) çevirir.
+                self.id_lookup = None
+                self.title_index = TitleIndex.from_frame(self.df) # Film adı -> satır numarası indeksi (arama tek sözlük bakışı)
                 print(f" Dosya yüklendi! Toplam Film: {len(self.df)}")
 
             # 2. Adım: Veri Temizliği 
@@ -64,6 +79,7 @@ class MovieRecommender: # Recommender motorumuz.
             # İşlemi yap ve 'normalized_df' içine kaydet
                 scaled_data = scaler.fit_transform(self.df[cols_to_scale])
                 self.normalized_df = pd.DataFrame(scaled_data, columns=cols_to_scale)
+                self.numeric = scaled_data
             
                 print(" Sayısal veriler (Popülerlik, Puan, Yıl) 0-1 arasına normalize edildi.")
 
@@ -73,10 +89,12 @@ class MovieRecommender: # Recommender motorumuz.
 # ---------------------------------
 # Beyin (Matris Oluşturma)
 # ---------------------------------
-    def create_similarity_matrix(self): # Burası projenin beyni 
+    def create_similarity_matrix(self, k: int = 50, block_size: int = 512, workers: int = 1): # Burası projenin beyni 
         """
         Hem kelimelere (Text) hem de sayılara (Metadata) bakarak
-        Hibrit bir benzerlik matrisi oluşturur.
+        Hibrit bir benzerlik tablosu oluşturur.
+        N×N matris yerine her film için sadece en benzer k filmi tutar.
+        workers > 1 ise satır blokları birden fazla CPU çekirdeğine dağıtılır.
         """
         # 1. Adım: Metin Hazırlığı
         def clear_text(text):
@@ -86,63 +104,141 @@ class MovieRecommender: # Recommender motorumuz.
         # llm_metadata sütununu temizle
         clean_metadata = self.df['llm_metadata'].fillna('').apply(clear_text)
 
-        # 2. Adım: Metin Benzerliği
+        # 2. Adım: Metin Matrisi (seyrek kalıyor, yoğun matrise çevirmiyoruz)
         cv = CountVectorizer()
-        text_matrix = cv.fit_transform(clean_metadata)
-        
-        # Sadece kelimelere göre benzerlik (0 ile 1 arası)
-        text_sim = cosine_similarity(text_matrix)
-        print(" Metin tabanlı benzerlik hesaplandı.")
+        self.feature_matrix = normalize_rows(cv.fit_transform(clean_metadata))
 
-        # 3. Adım: Sayısal Benzerlik
+        # 3. Adım HİBRİT KARIŞIM + TOP-K
+        #* Satırları blok blok (block_size kadar film) işliyoruz: her blokta
+        #* %85 Metin (Konu) + %15 Sayısal (Puan/Yıl) karışımı hesaplanıp sadece en iyi k komşu saklanıyor.
+        #* Böylece bellek N² değil N·k kadar büyüyor.
+        self.neighbor_indices, self.neighbor_scores = build_neighbor_table(
+            self.feature_matrix, self.numeric, k=k, text_weight=0.85, block_size=block_size, workers=workers
+        )
+        
+        print(f" HİBRİT Komşu Tablosu oluşturuldu! (Boyut: {self.neighbor_indices.shape})")
 
-        num_sim = cosine_similarity(self.normalized_df) # Popülerlik, Puan ve Yıl açısından ne kadar benziyorlar?
-        print(" Sayısal veriye dayalı benzerlik hesaplandı.")
+# ---------------------------------
+# Diske Kaydetme / Geri Açma (Artifact)
+# ---------------------------------
+    def save_artifact(self, artifact_dir: str = None):
+        """
+        Komşu tablosunu, normalize sayısal özellikleri ve başlık/ID tablolarını diske yazar.
+        Bir sonraki açılışta CSV okunup matris yeniden hesaplanmaz.
+        """
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        params = {"k": int(self.neighbor_indices.shape[1]), "numeric_columns": ['popularity', 'vote_average', 'year']}
+        artifacts.save_artifact(artifact_dir, artifacts.engine_arrays(self, 'movie_id'), ENGINE_NAME, self.data_path, params)
+        print(f" Artifact kaydedildi: {artifact_dir}")
 
-        # 4. Adım HİBRİT KARIŞIM
-        # %70 Metin (Konu) + %30 Sayısal (Puan/Yıl)
-        self.similarity_matrix = (text_sim * 0.85) + (num_sim * 0.15)
-        
-        print(f" HİBRİT Benzerlik Matrisi oluşturuldu! (Boyut: {self.similarity_matrix.shape})")
+    def load_artifact(self, artifact_dir: str = None):
+        """
+        Kayıtlı artifact'i mmap ile açar (neredeyse anında). CSV değiştiyse artifact
+        eski sayılır ve False döner; o zaman load_data + create_similarity_matrix gerekir.
+        """
+        artifact_dir = artifact_dir or os.path.join(artifacts.ARTIFACT_ROOT, ENGINE_NAME)
+        source = self.data_path if os.path.exists(self.data_path) else None
+        try:
+            arrays, manifest = artifacts.load_artifact(artifact_dir, ENGINE_NAME, source)
+        except (FileNotFoundError, artifacts.StaleArtifactError) as e:
+            print(f" Artifact kullanılamadı: {e}")
+            return False
+        artifacts.restore_engine(self, arrays, manifest, 'movie_id')
+        self.id_lookup = None
+        self.title_index = TitleIndex.from_frame(self.df)
+        print(f" Artifact açıldı! Toplam Film: {len(self.df)}")
+        return True
 
 # ---------------------------------
 # Cevap Verme (get_recommendations)
 # ---------------------------------
-    def get_recommendations(self, movie_title: str):
+    def find_movies(self, movie_title: str, limit: int = 5):
+        """
+        Başlığa en çok uyan filmleri sıralı döner: [{"movie_id", "title", "original_title", "score", "match"}].
+        match: 'exact' / 'prefix' / 'token' / 'fuzzy' (yazım hatalı aramalar için).
+        """
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        found = self.title_index.candidates(movie_title, limit)
+        records = to_records(self.df, 'movie_id', [f[0] for f in found], [f[1] for f in found])
+        return [{**record, "match": f[2]} for record, f in zip(records, found)]
+
+    def recommend(self, movie_title: str, k: int = 5):
+        """
+        Filme en benzer k filmi ID ve hibrit benzerlik puanlarıyla döner:
+        [{"movie_id", "title", "original_title", "score"}, ...]. Film bulunamazsa boş liste.
+        """
+        # 1-2. Filmin satır numarasını başlık indeksinden bul
+        #* Önce tam eşleşme (sözlük), sonra önek (sıralı dizi), sonra kelime indeksi, en son fuzzy.
+        #* Aynı seviyedeki eşleşmelerde en popüler film seçilir; eskisi gibi "ilk bulunan" değil.
+        if self.title_index is None:
+            self.title_index = TitleIndex.from_frame(self.df)
+        idx = self.title_index.resolve(movie_title) # idx: Bulunan filmin satır numarası
+        if idx is None:
+            return []
+
+        # 3. En benzer k filmi seç
+        #* k komşu tablosuna sığıyorsa tablodan okunur (zaten büyükten küçüğe sıralı, film kendisi yok).
+        #* Sığmıyorsa filmin hibrit satırı anında hesaplanır; argpartition ile sadece en iyi k tanesi sıralanır.
+        indices, scores = neighbors_for(
+            idx, k, self.neighbor_indices, self.neighbor_scores, self.feature_matrix, self.numeric, text_weight=0.85
+        )
+        return to_records(self.df, 'movie_id', indices, scores)
+
+    def rows_for_ids(self, movie_ids):
+        """movie_id listesini satır numaralarına çevirir; tabloda olmayanlar -1 olur."""
+        if self.id_lookup is None or len(self.id_lookup[0]) != len(self.df):
+            ids = self.df['movie_id'].to_numpy(dtype=np.int64)
+            self.id_lookup = (ids, np.argsort(ids, kind="stable"))
+        ids, order = self.id_lookup
+        wanted = np.asarray(movie_ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(ids, wanted, sorter=order), len(ids) - 1)
+        rows = order[pos]
+        return np.where(ids[rows] == wanted, rows, -1)
+
+    def recommend_batch(self, movie_ids, k: int = 10, exclude_ids=None):
+        """
+        Birden fazla tohum film için "X'i beğendiğin için" satırlarını tek seferde üretir.
+        Dönüş: {"rows": [{"seed": kayıt, "movies": [kayıtlar]}], "merged": [kayıtlar]}.
+        Bir film sadece en çok benzediği tohumun satırında çıkar; tohumlar ve exclude_ids
+        (ör. izlenenler) hiçbir satırda yer almaz. merged: tüm satırların puana göre birleşimi.
+        """
+        seeds = self.rows_for_ids(movie_ids)
+        seeds = seeds[seeds >= 0]
+        seeds = seeds[np.sort(np.unique(seeds, return_index=True)[1])] # Tekrarları at, sırayı koru
+        if len(seeds) == 0:
+            return {"rows": [], "merged": []}
+
+        exclude = self.rows_for_ids(exclude_ids) if exclude_ids is not None and len(exclude_ids) else []
+        seed_pos, indices, scores = batch_neighbors(
+            seeds, k, self.neighbor_indices, self.neighbor_scores, self.feature_matrix, self.numeric,
+            text_weight=0.85, exclude=[r for r in exclude if r >= 0],
+        )
+
+        # Tüm satırların kayıtlarını tek seferde üret, sonra tohumlara böl
+        records = to_records(self.df, 'movie_id', np.concatenate([seeds, indices]),
+                             np.concatenate([np.ones(len(seeds)), scores]))
+        seed_records, records = records[:len(seeds)], records[len(seeds):]
+        bounds = np.searchsorted(seed_pos, np.arange(len(seeds) + 1))
+        rows = [
+            {"seed": seed_records[i], "movies": records[lo:hi]}
+            for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ]
+        top = np.argsort(-scores, kind="stable")[:k]
+        return {"rows": rows, "merged": [records[i] for i in top]}
+
+    def get_recommendations(self, movie_title: str, k: int = 5):
         try:
-            # 1. Arama terimini temizle
-            search_term = movie_title.lower().strip()
-            # 2. 'original_title' içinde arama yap (En güvenli sütun burası)
-            #* str.contains: "içinde geçiyor mu?" diye soruyoruz.
-            #* na=False: Eğer veritabanında ismi olmayan (boş) bir film varsa, hata verme, onu "bulunamadı" say.
-            mask = self.df['original_title'].str.lower().str.contains(search_term, na=False)
-            
+            results = self.recommend(movie_title, k)
+
             # --- GÜVENLİK KİLİDİ ---
-            # Eğer maske tamamen False ise (hiçbir şey bulunamadıysa):
-            if not mask.any():
+            # Hiçbir şey bulunamadıysa:
+            if not results:
                 return [f"Üzgünüm, veritabanımızda '{movie_title}' diye bir film bulamadım. Başka bir tane dener misin?"]
             # -----------------------
 
-            # Filmin satır numarasını (indeksini) al
-            idx = self.df[mask].index[0] # idx: Bulunan filmin satır numarası
-            
-            # 3. Benzerlik puanlarını al ve sırala
-            sim_scores = list(enumerate(self.similarity_matrix[idx])) # enumerate kullanıyoruz ki hangi puanın hangi filme ait olduğunu unutmayalım
-
-            #* sorted: Puanı en yüksek olanı en başa al (reverse=True).
-            sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-            
-            # 4. En iyi 5 filmi seç (İlk film kendisi olduğu için [1:6] alıyoruz)
-            # x[0] filmin satır numarasıdır. Eğer satır numarası idx (aranan film) değilse listeye al.
-            sim_scores = [x for x in sim_scores if x[0] != idx]
-            sim_scores = sim_scores[:5]
-
-            # 5. Sonuçları hazırla: Dönüşüm (Hayır kafkanınki değil)
-            movie_indices = [i[0] for i in sim_scores]
-
             # Sonuçları liste biçiminde döndür
-            movie_titles = self.df['title'].iloc[movie_indices].fillna('İsimsiz Film').tolist()
-            return movie_titles
+            return [r["title"] for r in results]
             
         except Exception as e:
             return [f"Bir hata oluştu: {str(e)}"]
@@ -163,10 +259,15 @@ if __name__ == "__main__":
     print(f" Denenen dosya yolu: {yol}")
 
     adal_motoru = MovieRecommender(yol)
-    adal_motoru.load_data()
+
+    # Kayıtlı artifact varsa onu aç, yoksa CSV'den kur ve kaydet
+    if not adal_motoru.load_artifact():
+        adal_motoru.load_data()
+        if adal_motoru.df is not None:
+            adal_motoru.create_similarity_matrix()
+            adal_motoru.save_artifact()
     
     if adal_motoru.df is not None:
-        adal_motoru.create_similarity_matrix()
         test_film = input("\n🎥 Hangi filmi çok sevdin?: ")
         oneriler = adal_motoru.get_recommendations(test_film)
         
@@ -0,0 +1,113 @@
+# Öneri sonuç önbelleği - sonsuz kaydırmada her sayfa için tüm hattı yeniden çalıştırmamak için
+import base64
+import json
+import time
+from collections import OrderedDict
+
+RESULT_DEPTH = 1000  # Bir girdide saklanan en fazla sıralı film ID'si (~50 sayfa)
+
+
+def result_key(user_id=None, genre_ids=(), seed: int = 0, ranking: str = "shuffle", weights=None):
+    """İsteğin sonucunu belirleyen parametrelerden hashlenebilir anahtar."""
+    genres = () if user_id else tuple(sorted({int(g) for g in genre_ids or ()}))
+    return (user_id, genres, int(seed), ranking, tuple(sorted((str(k), float(v)) for k, v in (weights or {}).items())))
+
+
+def encode_cursor(key, offset: int) -> str:
+    """Anahtar + ofset -> opak, URL-güvenli metin. Girdi tahliye edilse bile istek tekrar kurulabilir."""
+    user_id, genres, seed, ranking, weights = key
+    payload = {"u": user_id, "g": list(genres), "s": seed, "r": ranking, "w": dict(weights), "o": offset}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """encode_cursor'ın tersi: (anahtar, ofset). Bozuk cursor için ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        p = json.loads(raw)
+        key = result_key(p["u"], p["g"], p["s"], p["r"], p["w"])
+        return key, int(p["o"])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Geçersiz cursor: {e}") from e
+
+
+class ResultCache:
+    """
+    anahtar -> sıralı film ID listesi; süre (TTL) ve boyut (LRU) sınırlı.
+    Kullanıcıya ait girdiler user_id ile bulunup tek seferde silinebilir.
+    Silme kullanıcının neslini (generation) artırır: hesaplaması silmeden önce başlamış bir liste
+    put(..., generation=...) ile yazılmak istenirse yazılmaz, eski sonuç TTL boyunca sunulmaz.
+    """
+
+    def __init__(self, capacity: int = 2000, ttl: float = 600.0, clock=time.monotonic):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (son geçerlilik zamanı, ID listesi)
+        self._by_user = {}             # user_id -> {key}
+        self._generations = {}         # user_id -> silme sayısı (hiç silinmediyse yok)
+        self._epoch = 0                # clear() sayısı; tüm kullanıcıların nesli
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            self._drop(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def generation(self, user_id):
+        """user_id (misafir için None) sonuçlarının şu anki nesli; hesaplamaya başlamadan okunur."""
+        return self._epoch, self._generations.get(user_id, 0)
+
+    def put(self, key, movie_ids, generation=None):
+        """generation verilmişse ve o zamandan beri kullanıcının girdileri silindiyse liste yazılmaz."""
+        if generation is not None and generation != self.generation(key[0]):
+            return
+        self._entries[key] = (self.clock() + self.ttl, movie_ids)
+        self._entries.move_to_end(key)
+        if key[0] is not None:
+            self._by_user.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Kullanıcının tüm girdilerini siler (etkileşim / tercih değişince) ve neslini artırır."""
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        for key in self._by_user.pop(user_id, ()):
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+    def clear(self):
+        self._entries.clear()
+        self._by_user.clear()
+        self._epoch += 1
+
+    def stats(self):
+        return {
+            "size": len(self._entries), "capacity": self.capacity, "ttl": self.ttl,
+            "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+            "expirations": self.expirations, "invalidations": self.invalidations,
+        }
@@ -0,0 +1,177 @@
+# Seed'li, sayfalar arası kararlı örnekleme - ORDER BY random() yerine
+import random
+import secrets
+
+import numpy as np
+
+from sqlalchemy.future import select
+from sqlalchemy import Float, func, literal, tuple_, union_all
+from sqlalchemy.dialects.postgresql import array
+
+from backend.src.keyset import decode_cursor, encode_cursor
+from backend.src.models_pg import Movie
+
+# shuffle_key ekseni bu kadar kovaya bölünür; 2'nin kuvveti olduğundan kova sınırları ve
+# key * SHUFFLE_BUCKETS hem SQL'de hem NumPy'da birebir aynı (yuvarlamasız) hesaplanır.
+SHUFFLE_BUCKETS = 16
+START_BITS = 20  # Kova içi başlangıç noktası 2^-20'nin katı (sınır karşılaştırmaları kesin olsun diye)
+LAP_COUNT = 2 * SHUFFLE_BUCKETS  # Her kova başlangıç noktasına göre iki tur
+FIRST_WINDOW = 2  # fetch_sampled_page'in ilk sorguda taradığı tur sayısı (sayfa dolmazsa kalan turların hepsi)
+
+
+def new_seed() -> int:
+    """İstemci seed göndermediğinde kullanılacak rastgele bir oturum seed'i üretir."""
+    return secrets.randbits(31)
+
+
+def seed_layout(seed: int):
+    """
+    Seed'in örnekleme düzeni: kovaların ziyaret sırası ve her kovada başlangıç noktası.
+    Dönüş: (order, starts) - order[r] r. ziyaret edilen kova, starts[b] b kovasının [0, 1) içindeki başlangıcı.
+    """
+    rng = random.Random(seed)
+    order = list(range(SHUFFLE_BUCKETS))
+    rng.shuffle(order)
+    starts = [rng.getrandbits(START_BITS) / (1 << START_BITS) for _ in range(SHUFFLE_BUCKETS)]
+    return order, starts
+
+
+def sample_keys(keys, seed: int):
+    """
+    shuffle_key'lerin seed'li sıradaki sıralama anahtarı (küçük olan önce): kovanın ziyaret sırası +
+    kova içinde seed'in başlangıç noktasından başa saran konum. sampled_page'in SQL sırasıyla aynıdır.
+    """
+    order, starts = seed_layout(seed)
+    ranks = np.empty(SHUFFLE_BUCKETS, dtype=np.float64)
+    ranks[order] = np.arange(SHUFFLE_BUCKETS)
+    scaled = np.asarray(keys, dtype=np.float64) * SHUFFLE_BUCKETS
+    buckets = np.clip(np.floor(scaled), 0, SHUFFLE_BUCKETS - 1).astype(np.int64)
+    return ranks[buckets] + (scaled - buckets - np.asarray(starts)[buckets]) % 1.0
+
+
+def sample_order(key, seed: int):
+    """
+    sample_keys'in SQL karşılığı: key (ör. Movie.shuffle_key) için seed'li sıralama anahtarı ifadesi.
+    Aynı float işlemleri yapıldığından (sample_keys, movie_id) sırası SQL'de birebir aynıdır.
+    İndeks kullanmaz; zaten tamamı hesaplanan küçük havuzları (ör. _user_page_stmt) tek sıralamayla
+    örneklemek için. Geniş filtrelerde sampled_page tercih edilmeli.
+    """
+    order, starts = seed_layout(seed)
+    ranks = [0.0] * SHUFFLE_BUCKETS
+    for rank, bucket in enumerate(order):
+        ranks[bucket] = float(rank)
+    scaled = key * SHUFFLE_BUCKETS
+    bucket = func.least(func.floor(scaled), SHUFFLE_BUCKETS - 1)
+    offset = scaled - bucket - array([literal(s, Float) for s in starts])[bucket + 1]
+    return array([literal(r, Float) for r in ranks])[bucket + 1] + (offset - func.floor(offset))
+
+
+def sampled_page(conditions, seed: int, skip: int = 0, limit: int = 20, after=None, laps=None):
+    """
+    Filtrelenmiş film kümesinden seed'e göre karıştırılmış bir sayfa seçen ifadeyi kurar.
+
+    Her filmin sabit, indeksli bir rastgele anahtarı (movies.shuffle_key) var. Eksen
+    SHUFFLE_BUCKETS kovaya bölünür; seed kovaların ziyaret sırasını ve her kovada başlangıç
+    noktasını seçer (bkz. seed_layout). Böylece başlangıçları yakın iki seed en fazla bir kova
+    parçası boyunca aynı filmleri görür, akışın geri kalanı farklıdır.
+    Sıra (tur, shuffle_key, movie_id); her tur bir kovanın başlangıca göre bir yarısıdır ve
+    shuffle_key indeksi üzerinde sıralı, limitli bir aralık taramasıdır, tam sıralama yapılmaz.
+    after=(tur, shuffle_key, movie_id) verilirse (önceki sayfanın son satırı) önceki turlar hiç
+    taranmaz ve sayfa doğrudan o konumdan başlar: derin sayfalar ilk sayfa kadar ucuzdur.
+    after yoksa ilk skip satır OFFSET ile atlanır (cursor'sız istemciler).
+    laps=(ilk, son) verilirse sadece o aralıktaki turlar taranır (bkz. fetch_sampled_page);
+    verilmezse tüm turlar tek ifadededir (ör. _user_page_stmt'e gömülürken).
+    İfade (Movie, tur, shuffle_key) satırları döner.
+    """
+    first, stop = laps or (0, LAP_COUNT)
+    order, starts = seed_layout(seed)
+    key = Movie.shuffle_key
+    per_branch = limit if after is not None else skip + limit
+    branches = []
+    for rank, bucket in enumerate(order):
+        low, high = bucket / SHUFFLE_BUCKETS, (bucket + 1) / SHUFFLE_BUCKETS
+        middle = (bucket + starts[bucket]) / SHUFFLE_BUCKETS
+        for part, window in enumerate(((key >= middle, key < high), (key >= low, key < middle))):
+            lap = 2 * rank + part
+            if not first <= lap < stop or (after is not None and lap < after[0]):
+                continue
+            if after is not None and lap == after[0]:
+                window += (tuple_(key, Movie.movieId) > tuple_(after[1], after[2]),)
+            branches.append(
+                select(Movie.movieId.label("movie_id"), literal(lap).label("lap"), key.label("sk"))
+                .where(*conditions)
+                .where(*window)
+                .order_by(key, Movie.movieId)
+                .limit(per_branch)
+            )
+    # Kollar sadece (movie_id, tur, anahtar) taşır; film satırları sayfa seçildikten sonra PK ile eklenir
+    pool = union_all(*branches).subquery("sampled_ids")
+    page = (
+        select(pool)
+        .order_by(pool.c.lap, pool.c.sk, pool.c.movie_id)
+        .limit(limit)
+        .offset(skip if after is None else 0)
+        .subquery("sampled")
+    )
+    return (
+        select(Movie, page.c.lap, page.c.sk)
+        .join(page, Movie.movieId == page.c.movie_id)
+        .order_by(page.c.lap, page.c.sk, page.c.movie_id)
+    )
+
+
+async def fetch_sampled_page(session, conditions, seed: int, cursor: str = None, skip: int = 0, limit: int = 20):
+    """
+    sampled_page'i çalıştırır. Sayfa cursor'dan (ya da baştan) başlıyorsa önce sadece FIRST_WINDOW tur
+    taranır; bir sayfa genellikle bir iki turdan dolar, her sayfada tüm turları planlayıp taramaya gerek
+    yoktur. Dolmazsa (seyrek filtre) kalan turların hepsi ikinci bir sorguda taranır.
+    Cursor'sız derin sayfalar (skip > 0) tüm turları içeren tek OFFSET'li ifadeyle alınır.
+    Dönüş: (filmler, sonraki sayfanın cursor'ı ya da None).
+    Cursor seed'e bağlıdır; başka bir seed'le verilirse ValueError.
+    """
+    sort_name = f"shuffle:{seed}"
+    after = None
+    if cursor:
+        (lap, sk), movie_id = decode_cursor(cursor, sort_name)
+        after = (int(lap), float(sk), movie_id)
+    if after is None and skip:
+        rows = (await session.execute(sampled_page(conditions, seed, skip=skip, limit=limit))).all()
+    else:
+        first = after[0] if after else 0
+        stop = min(first + FIRST_WINDOW, LAP_COUNT)
+        rows = (await session.execute(sampled_page(conditions, seed, limit=limit, after=after, laps=(first, stop)))).all()
+        if len(rows) < limit and stop < LAP_COUNT:
+            rest = sampled_page(conditions, seed, limit=limit - len(rows), laps=(stop, LAP_COUNT))
+            rows += (await session.execute(rest)).all()
+    movies = [movie for movie, _, _ in rows]
+    if len(rows) < limit:
+        return movies, None
+    last, lap, sk = rows[-1]
+    return movies, encode_cursor(sort_name, [lap, sk], last.movieId)
+
+
+def offset_cursor(seed: int, offset: int) -> str:
+    """Bellek içi seed'li sayfalar (sample_positions) için cursor: sıradaki konum. Seed'e bağlıdır."""
+    return encode_cursor(f"shuffle-offset:{seed}", offset, 0)
+
+
+def decode_offset_cursor(cursor: str, seed: int) -> int:
+    """offset_cursor'ın tersi: atlanacak satır sayısı. Bozuk ya da başka seed'e ait cursor için ValueError."""
+    offset, _ = decode_cursor(cursor, f"shuffle-offset:{seed}")
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ValueError(f"Geçersiz cursor: konum {offset!r}")
+    return offset
+
+
+def sample_positions(keys, seed: int, skip: int = 0, limit: int = 20):
+    """
+    sampled_page ile aynı sırayı bellek içinde uygular: shuffle_key dizisinin (film ID sırasıyla)
+    seed'li sıradaki [skip, skip+limit) pozisyonları. Eşit anahtarlarda küçük pozisyon önce gelir.
+    """
+    ordered = sample_keys(keys, seed)
+    stop = min(skip + limit, len(ordered))
+    if stop <= skip:
+        return np.empty(0, dtype=np.int64)
+    head = np.argpartition(ordered, stop - 1)[:stop] if stop < len(ordered) else np.arange(len(ordered))
+    head = head[np.lexsort((head, ordered[head]))]
+    return head[skip:stop]
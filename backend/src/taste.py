@@ -0,0 +1,85 @@
+# Kullanıcı zevk profili önbelleği - her istekte beğeni -> tür -> aday zincirini yeniden kurmamak için
+from collections import OrderedDict
+
+import numpy as np
+
+SELECTED_WEIGHT = 1.0  # Kayıtta seçilen türlerin ağırlığı; beğenilerden gelen kısım toplamda 1'e normalize
+
+
+class TasteProfile:
+    """
+    Tür uzayında bir zevk vektörü: seçilen türler + beğenilen filmlerin tür vektörlerinin ortalaması.
+    Beğeni eklemek/çıkarmak tek bir satır toplama/çıkarmadır (katalog boyutundan bağımsız).
+    """
+
+    __slots__ = ("selected", "liked_sum", "n_liked")
+
+    def __init__(self, selected, liked_sum, n_liked: int):
+        self.selected = np.asarray(selected, dtype=np.float32)
+        self.liked_sum = np.asarray(liked_sum, dtype=np.float32)
+        self.n_liked = int(n_liked)
+
+    @classmethod
+    def build(cls, item_matrix, selected, liked_positions):
+        """item_matrix: film × tür (0/1); selected: tür vektörü; liked_positions: beğenilen film satırları."""
+        liked_positions = np.asarray(liked_positions, dtype=np.int64)
+        liked_sum = item_matrix[liked_positions].sum(axis=0) if len(liked_positions) else np.zeros(item_matrix.shape[1])
+        return cls(selected, liked_sum, len(liked_positions))
+
+    def add_like(self, genre_row, sign: int):
+        self.liked_sum += sign * genre_row
+        self.n_liked += sign
+
+    def vector(self):
+        return SELECTED_WEIGHT * self.selected + self.liked_sum / max(self.n_liked, 1)
+
+
+class TasteCache:
+    """user_id -> TasteProfile, LRU tahliyeli. Güncellemeler sadece önbellekteki profillere uygulanır."""
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._profiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def get(self, user_id):
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            self.misses += 1
+            return None
+        self._profiles.move_to_end(user_id)
+        self.hits += 1
+        return profile
+
+    def peek(self, user_id):
+        """Önbellekteki profil (yoksa None); isabet sayaçlarını ve LRU sırasını değiştirmez."""
+        return self._profiles.get(user_id)
+
+    def drop(self, user_id):
+        """Profili önbellekten atar; bir sonraki istekte güncel beğenilerden yeniden kurulur."""
+        self._profiles.pop(user_id, None)
+
+    def put(self, user_id, profile):
+        self._profiles[user_id] = profile
+        self._profiles.move_to_end(user_id)
+        while len(self._profiles) > self.capacity:
+            self._profiles.popitem(last=False)
+
+    def add_like(self, user_id, genre_row, sign: int):
+        """Beğeni (+1) ya da beğeniyi geri alma (-1)."""
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            profile.add_like(genre_row, sign)
+
+    def set_selected(self, user_id, selected):
+        """Kullanıcı tercihlerini (selected_genres) değiştirdi."""
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            profile.selected = np.asarray(selected, dtype=np.float32)
+
+    def clear(self):
+        self._profiles.clear()
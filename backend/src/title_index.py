@@ -0,0 +1,175 @@
+# Film adı arama indeksi - her sorguda DataFrame üzerinde str.contains taraması yapmamak için
+import re
+import unicodedata
+from bisect import bisect_left
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize_title(text):
+    """Küçük harf, aksansız, noktalama yerine tek boşluk: 'Amélie (2001)' -> 'amelie 2001'."""
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """
+    Normalize edilmiş film adları üzerinde beş katmanlı arama:
+    1) tam eşleşme sözlüğü, 2) sıralı dizi üzerinde önek (bisect),
+    3) kelime ters indeksi (her sorgu kelimesi bir başlık kelimesinin öneki),
+    4) ad içinde geçen (ILIKE '%q%' karşılığı; trigram kesişimi + doğrulama),
+    5) trigram benzerliği ile yazım hatası toleranslı (fuzzy) adaylar.
+    Aynı katmandaki eşleşmeler popülerliğe (yoksa satır sırasına) göre sıralanır.
+    """
+
+    EXACT, PREFIX, TOKEN, SUBSTRING, FUZZY = 1.0, 0.9, 0.8, 0.75, 0.7
+
+    def __init__(self, names, popularity=None):
+        """
+        names: her satır için ad listesi (ör. [title, original_title]).
+        popularity: satır başına eşit puanlı adayları ayırmak için (büyük olan önce).
+        """
+        n_rows = len(names)
+        if popularity is None:
+            self.rank = np.arange(n_rows, dtype=np.int64)
+        else:
+            popularity = np.nan_to_num(np.asarray(popularity, dtype=np.float64))
+            self.rank = np.empty(n_rows, dtype=np.int64)
+            self.rank[np.argsort(-popularity, kind="stable")] = np.arange(n_rows)
+
+        # Tekil normalize adlar ve her adın en iyi (rank'ı en küçük) satırı
+        exact = {}
+        for row, row_names in enumerate(names):
+            for name in row_names:
+                key = normalize_title(name)
+                if key:
+                    exact.setdefault(key, []).append(row)
+        self.exact = {key: np.array(sorted(set(rows), key=lambda r: self.rank[r]), dtype=np.int64)
+                      for key, rows in exact.items()}
+
+        self.keys = sorted(self.exact)
+        self.key_row = np.array([self.exact[k][0] for k in self.keys], dtype=np.int64)
+
+        # Kelime -> satırlar ve trigram -> ad (key) ters indeksleri
+        tokens, grams = {}, {}
+        self.key_gram_count = np.zeros(len(self.keys), dtype=np.int32)
+        for key_id, key in enumerate(self.keys):
+            for token in set(key.split()):
+                tokens.setdefault(token, []).append(key_id)
+            key_grams = _trigrams(key)
+            self.key_gram_count[key_id] = len(key_grams)
+            for gram in key_grams:
+                grams.setdefault(gram, []).append(key_id)
+        self.vocab = sorted(tokens)
+        self.token_keys = [np.array(tokens[t], dtype=np.int64) for t in self.vocab]
+        self.gram_keys = {g: np.array(ids, dtype=np.int64) for g, ids in grams.items()}
+
+    @classmethod
+    def from_frame(cls, df, columns=("original_title", "title")):
+        """DataFrame'deki başlık sütunlarından indeks kurar (popularity sütunu varsa kullanır)."""
+        present = [c for c in columns if c in df.columns]
+        names = list(zip(*(df[c].fillna("").astype(str) for c in present)))
+        popularity = df["popularity"].to_numpy() if "popularity" in df.columns else None
+        return cls(names, popularity)
+
+    def _by_rank(self, rows):
+        rows = np.unique(rows)
+        return rows[np.argsort(self.rank[rows], kind="stable")]
+
+    def _prefix_keys(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff")
+        return lo, hi
+
+    def _token_rows(self, query):
+        """Her sorgu kelimesi, başlıktaki bir kelimenin öneki olmalı (sıra önemsiz)."""
+        matched = None
+        for token in query.split():
+            lo = bisect_left(self.vocab, token)
+            hi = bisect_left(self.vocab, token + "\uffff")
+            if lo == hi:
+                return np.empty(0, dtype=np.int64)
+            key_ids = np.unique(np.concatenate(self.token_keys[lo:hi]))
+            matched = key_ids if matched is None else np.intersect1d(matched, key_ids, assume_unique=True)
+            if len(matched) == 0:
+                break
+        return self.key_row[matched] if matched is not None else np.empty(0, dtype=np.int64)
+
+    def _substring_rows(self, query):
+        """
+        Sorgu bir adın içinde geçiyorsa: sorgunun tüm iç trigramlarını içeren adlar, metinle doğrulanır.
+        Trigramı olmayan 1-2 harflik sorgularda adlar doğrudan taranır.
+        """
+        if len(query) < 3:
+            key_ids = [k for k, key in enumerate(self.keys) if query in key]
+            return self.key_row[key_ids] if key_ids else np.empty(0, dtype=np.int64)
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        if any(g not in self.gram_keys for g in grams):
+            return np.empty(0, dtype=np.int64)
+        key_ids = None
+        for gram in sorted(grams, key=lambda g: len(self.gram_keys[g])):
+            key_ids = self.gram_keys[gram] if key_ids is None else np.intersect1d(key_ids, self.gram_keys[gram])
+        key_ids = [k for k in key_ids.tolist() if query in self.keys[k]]
+        return self.key_row[key_ids] if key_ids else np.empty(0, dtype=np.int64)
+
+    def _fuzzy(self, query, limit, min_score=0.3):
+        """Trigram Jaccard benzerliğine göre en iyi `limit` adı döner: (satırlar, puanlar)."""
+        query_grams = [g for g in _trigrams(query) if g in self.gram_keys]
+        if not query_grams:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        hits = np.concatenate([self.gram_keys[g] for g in query_grams])
+        key_ids, shared = np.unique(hits, return_counts=True)
+        score = shared / (len(_trigrams(query)) + self.key_gram_count[key_ids] - shared)
+        keep = score >= min_score
+        key_ids, score = key_ids[keep], score[keep]
+        if len(key_ids) > limit:
+            top = np.argpartition(-score, limit - 1)[:limit]
+            key_ids, score = key_ids[top], score[top]
+        order = np.lexsort((self.rank[self.key_row[key_ids]], -score))
+        return self.key_row[key_ids[order]], score[order]
+
+    def candidates(self, query, limit=5, fuzzy=True, substring=True):
+        """
+        Sorgu için sıralı adaylar: [(satır, puan, tür), ...].
+        Tür 'exact' / 'prefix' / 'token' / 'substring' / 'fuzzy'; puan katmana göre
+        (fuzzy'de benzerliğe göre) azalır.
+        """
+        query = normalize_title(query)
+        if not query:
+            return []
+        results, seen = [], set()
+
+        def extend(rows, score, kind):
+            for row in rows:
+                if len(results) >= limit:
+                    return
+                if row not in seen:
+                    seen.add(row)
+                    results.append((int(row), float(score), kind))
+
+        extend(self.exact.get(query, ()), self.EXACT, "exact")
+        if len(results) < limit:
+            lo, hi = self._prefix_keys(query)
+            extend(self._by_rank(self.key_row[lo:hi]), self.PREFIX, "prefix")
+        if len(results) < limit:
+            extend(self._by_rank(self._token_rows(query)), self.TOKEN, "token")
+        if substring and len(results) < limit:
+            extend(self._by_rank(self._substring_rows(query)), self.SUBSTRING, "substring")
+        if fuzzy and len(results) < limit:
+            rows, scores = self._fuzzy(query, limit)
+            for row, score in zip(rows, scores):
+                extend([row], self.FUZZY * score, "fuzzy")
+        return results
+
+    def resolve(self, query, fuzzy=True):
+        """Sorguya en iyi uyan satır numarası; bulunamazsa None."""
+        found = self.candidates(query, limit=1, fuzzy=fuzzy)
+        return found[0][0] if found else None
@@ -0,0 +1,76 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+
+from backend.src import artifacts
+from backend.src.recommender import load_content_model
+from backend.src.recommenderv3 import MovieRecommender
+
+DATA_PATH = root_path / "backend" / "data" / "movies_with_metadata.csv"
+
+
+def test():
+    workdir = Path(tempfile.mkdtemp())
+    try:
+        csv_path = workdir / "movies.csv"
+        shutil.copy(DATA_PATH, csv_path)
+        artifact_dir = str(workdir / "artifact")
+
+        built = MovieRecommender(str(csv_path))
+        built.load_data()
+        built.create_similarity_matrix(k=20)
+        built.save_artifact(artifact_dir)
+
+        t0 = time.perf_counter()
+        opened = MovieRecommender(str(csv_path))
+        ok = opened.load_artifact(artifact_dir)
+        print(f"Açılış süresi: {(time.perf_counter() - t0) * 1000:.1f} ms, mmap: {isinstance(opened.neighbor_indices, np.memmap)}")
+
+        same = (
+            ok
+            and np.array_equal(built.neighbor_indices, opened.neighbor_indices)
+            and np.array_equal(built.neighbor_scores, opened.neighbor_scores)
+            and built.get_recommendations("toy story") == opened.get_recommendations("toy story")
+        )
+        print(f"Artifact ile aynı sonuç: {same}")
+
+        # Yeniden kurulum yeni sürüm klasörüne yazar, CURRENT'ı çevirir; açık olan sürüm yerinde kalır
+        first_version = artifacts.current_version(artifact_dir)
+        for _ in range(2):
+            built.save_artifact(artifact_dir)
+        versions = sorted(name for name in os.listdir(artifact_dir) if name != artifacts.CURRENT)
+        switched = (
+            artifacts.current_version(artifact_dir) != first_version
+            and len(versions) == artifacts.KEEP_VERSIONS
+            and opened.get_recommendations("toy story") == built.get_recommendations("toy story")
+        )
+        print(f"Sürümler: {versions}, işaretçi çevrildi ve açık artifact okunabiliyor: {switched}")
+
+        # CSV değişince artifact reddedilmeli
+        with open(csv_path, "a", encoding="utf-8") as file:
+            file.write("\n")
+        refused = not MovieRecommender(str(csv_path)).load_artifact(artifact_dir)
+        print(f"Eski artifact reddedildi: {refused}")
+
+        # Çalışan API artifact'i sadece okur: eski/eksik artifact'te motor bellekte kurulur, diske yazılmaz
+        before = sorted(os.walk(artifacts.ARTIFACT_ROOT))
+        in_memory = load_content_model(str(csv_path))
+        read_only = sorted(os.walk(artifacts.ARTIFACT_ROOT)) == before \
+            and in_memory.get_recommendations("toy story") == built.get_recommendations("toy story")
+        print(f"load_content_model diske yazmadı: {read_only}")
+
+        if same and switched and refused and read_only:
+            print("All tests passed!")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+
+from backend.src.recommenderv3 import MovieRecommender
+from backend.src.neighbors import neighbors_for
+
+DATA_PATH = root_path / "backend" / "data" / "movies_with_metadata.csv"
+
+
+def per_seed_loop(motor, movie_ids, k, exclude_ids, width):
+    """Eski yol: her tohum için ayrı sorgu (width komşu), sonra Python'da birleştirme."""
+    ids = motor.df['movie_id'].tolist()
+    banned = set(movie_ids) | set(exclude_ids)
+    numeric = motor.normalized_df.to_numpy()
+    best = {}
+    for seed in movie_ids:
+        idx = ids.index(seed)
+        indices, scores = neighbors_for(idx, width, motor.neighbor_indices, motor.neighbor_scores,
+                                        motor.feature_matrix, numeric)
+        for row, score in zip(indices, scores):
+            mid = ids[row]
+            if mid not in banned and score > best.get(mid, (None, -np.inf))[1]:
+                best[mid] = (seed, float(score))
+    rows = {}
+    for mid, (seed, score) in best.items():
+        rows.setdefault(seed, []).append((score, mid))
+    return {seed: [mid for _, mid in sorted(r, reverse=True)[:k]] for seed, r in rows.items()}
+
+
+def check(motor, seeds, k, exclude):
+    batch = motor.recommend_batch(seeds, k=k, exclude_ids=exclude)
+    expected = per_seed_loop(motor, seeds, k, exclude, width=motor.neighbor_indices.shape[1])
+    if any(len(expected.get(s, [])) < k for s in seeds):
+        # Tablo yetmediyse toplu yol kesin hesaba geçer; karşılaştırma da tam satırla yapılır
+        expected = per_seed_loop(motor, seeds, k, exclude, width=len(motor.df) - 1)
+    got = {r["seed"]["movie_id"]: [m["movie_id"] for m in r["movies"]] for r in batch["rows"]}
+    all_ids = [mid for row in got.values() for mid in row]
+    ok = len(all_ids) == len(set(all_ids)) and not (set(all_ids) & (set(seeds) | set(exclude)))
+    # Eşit puanlarda sıra farklı olabilir; kümeleri karşılaştır
+    mismatch = sum(set(got.get(s, [])) != set(expected.get(s, [])) for s in seeds)
+    return ok and mismatch == 0, batch
+
+
+async def db_smoke():
+    from sqlalchemy import select
+    from backend.src.db_pg import async_session_maker, close_db
+    from backend.src.models_pg import Interaction
+    from backend.src.recommender import engine
+
+    async with async_session_maker() as session:
+        user_id = (await session.execute(
+            select(Interaction.user_id).where(Interaction.is_liked == True).limit(1)
+        )).scalar()
+        watched = set((await session.execute(
+            select(Interaction.movie_id).where(Interaction.user_id == user_id)
+        )).scalars().all())
+    result = await engine.similar_movies(user_id=user_id, k=10)
+    shown = [m["movieId"] for r in result["rows"] for m in r["movies"]]
+    print(f"Kullanıcı {user_id}: {len(result['rows'])} satır, {len(shown)} film, izlenen çakışma: {len(set(shown) & watched)}")
+    await close_db()
+    return bool(result["rows"]) and not set(shown) & watched
+
+
+def test():
+    motor = MovieRecommender(str(DATA_PATH))
+    motor.load_data()
+    motor.create_similarity_matrix(k=50)
+    ids = motor.df['movie_id'].to_numpy()
+    rng = np.random.default_rng(0)
+
+    seeds = rng.choice(ids, 8, replace=False).tolist()
+    exclude = rng.choice(ids, 60, replace=False).tolist()
+    table_ok, _ = check(motor, seeds[:2], 5, [])
+    # Çok tohum + k tabloya yakın + hariç tutulanlar: satırlar kısa kalır, kesin seyrek çarpım yolu
+    fallback_ok, _ = check(motor, seeds, 45, exclude)
+    print(f"Tablo yolu: {table_ok}, seyrek çarpım yolu: {fallback_ok}")
+
+    # Verim: tohum başına get_recommendations vs tek toplu çağrı
+    seeds = rng.choice(ids, 20, replace=False).tolist()
+    titles = motor.df.set_index('movie_id').loc[seeds, 'original_title'].tolist()
+    start = time.perf_counter()
+    for _ in range(20):
+        for title in titles:
+            motor.get_recommendations(title, k=10)
+    loop_ms = (time.perf_counter() - start) * 1000 / 20
+    start = time.perf_counter()
+    for _ in range(20):
+        motor.recommend_batch(seeds, k=10)
+    batch_ms = (time.perf_counter() - start) * 1000 / 20
+    print(f"20 tohum: döngü {loop_ms:.2f} ms, toplu {batch_ms:.2f} ms ({loop_ms / batch_ms:.1f}x)")
+
+    # İstek sınırları: k 1..50, en fazla 50 tohum (FastAPI bunları 422 olarak döndürür)
+    from pydantic import ValidationError
+    from backend.routes.recommendations import SimilarRequest
+    bounds_ok = SimilarRequest(movie_ids=seeds).k == 10
+    for bad in ({"k": 0}, {"k": 51}, {"movie_ids": list(range(51))}):
+        try:
+            SimilarRequest(**bad)
+            bounds_ok = False
+        except ValidationError:
+            pass
+    print(f"İstek sınırları: {bounds_ok}")
+
+    db_ok = True
+    if os.getenv("DATABASE_URL"):
+        db_ok = asyncio.run(db_smoke())
+
+    if table_ok and fallback_ok and bounds_ok and db_ok:
+        print("All tests passed!")
+
+if __name__ == "__main__":
+    test()
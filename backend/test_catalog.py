@@ -0,0 +1,59 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    catalog = rec_engine.catalog
+
+    # 1) Katalog kayıtları / kartları, ORM'den üretilen eski çıktılarla birebir aynı olmalı
+    async with async_session_maker() as session:
+        movies = (await session.execute(select(Movie).order_by(Movie.movieId))).scalars().all()
+        old_records = [{"_id": str(m.movieId), **{k: v for k, v in m.__dict__.items() if k != "_sa_instance_state"}}
+                       for m in movies]
+        old_cards = rec_engine._format_movies(movies)
+        ids = [m.movieId for m in movies]
+        new_records = await catalog.get_records(session, ids)
+        new_cards = await catalog.get_cards(session, ids)
+    records_same = new_records == old_records
+    cards_same = new_cards == old_cards
+    print(f"{len(ids)} film: kayıtlar aynı {records_same}, kartlar aynı {cards_same}")
+
+    # 2) Sıcak uç noktalar DB'ye gitmemeli (llm_metadata bir kez yüklendikten sonra)
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        detail = (await client.get(f"/api/movies/{ids[0]}")).json()
+        genre_id = next(iter(rec_engine.genre_index.genre_bits))
+        row = (await client.get("/api/movies", params={"genre_ids": genre_id, "seed": 1})).json()
+        guest = (await client.post("/api/recommend", json={"selected_genres": [genre_id], "seed": 1})).json()
+        missing = await client.get("/api/movies/-5")
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+    print(f"Detay/tür satırı/misafir önerisi: {len(row)}+{len(guest)} film, DB sorgusu: {len(queries)} "
+          f"(yok film 404: {missing.status_code})")
+
+    report = catalog.memory_report()
+    print(f"Bellek: {report['total'] / 1024:.0f} KB ({report['total'] * 10000 / len(ids) / 2 ** 20:.2f} MB / 10k film)")
+
+    # Sadece var olmayan film için tek sorgu (DB'ye düşüş) beklenir
+    if records_same and cards_same and detail == old_records[0] and len(queries) == 1 and missing.status_code == 404:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
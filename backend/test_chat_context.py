@@ -0,0 +1,53 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+from sqlalchemy import event, func
+from sqlalchemy.future import select
+
+from backend.src.chat_context import build_chat_context
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_catalog import genre_catalog
+from backend.src.models_pg import Interaction
+from backend.scripts.bench_chat_context import legacy_chat_context
+
+
+async def test():
+    await init_db()
+    await genre_catalog.load()
+    async with async_session_maker() as session:
+        # En uzun geçmişli kullanıcılar + birkaç sıradan kullanıcı
+        users = (await session.execute(
+            select(Interaction.user_id).group_by(Interaction.user_id).order_by(func.count().desc(), Interaction.user_id)
+        )).scalars().all()
+    sample = users[:5] + users[::40]
+
+    queries, checkouts = [], []
+    listener = lambda *args: queries.append(args[2])
+    on_checkout = lambda *args: checkouts.append(args[1])
+    mismatches = 0
+    for user_id in sample:
+        old = await legacy_chat_context(user_id)
+        event.listen(engine.sync_engine, "before_cursor_execute", listener)
+        event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+        new = await build_chat_context(user_id)
+        event.remove(engine.sync_engine, "before_cursor_execute", listener)
+        event.remove(engine.sync_engine.pool, "checkout", on_checkout)
+        if old.model_dump() != new.model_dump():
+            mismatches += 1
+            print(f"  FARK: user_id={user_id}")
+    missing = await build_chat_context(-1)
+    print(f"{len(sample)} kullanıcı, eski akıştan fark: {mismatches}; kullanıcı başına sorgu: {len(queries) / len(sample):.0f}, "
+          f"havuz bağlantısı: {len(checkouts) / len(sample):.0f}; "
+          f"olmayan kullanıcı: {missing}")
+
+    if mismatches == 0 and len(queries) == 3 * len(sample) \
+            and len(checkouts) == len(sample) and missing is None:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import uvicorn
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.fake_llm import FakeLLMClient
+from backend.src.models_pg import Interaction
+from backend.routes.chat import engine as chat_engine
+
+
+async def read_events(response):
+    """SSE akışından (olay, veri, varış zamanı) üçlüleri."""
+    buffer = ""
+    async for text in response.aiter_text():
+        buffer += text
+        while "\n\n" in buffer:
+            raw, buffer = buffer.split("\n\n", 1)
+            lines = dict(line.split(": ", 1) for line in raw.splitlines())
+            yield lines.get("event", "message"), json.loads(lines["data"]), time.perf_counter()
+
+
+async def test():
+    await init_db()
+    async with async_session_maker() as session:
+        user_id = (await session.execute(select(Interaction.user_id).limit(1))).scalar()
+    fake = FakeLLMClient(first_token_ms=300, token_ms=20)
+    chat_engine._client = fake
+    chat_engine.cache = None  # Aynı mesaj tekrar soruluyor; burada LLM akışı ölçülür, önbellek değil
+
+    # ASGITransport yanıtı tamponladığından gerçek bir sunucu üzerinden ölçülür
+    from backend.main import app
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    spec_version = ["2.3"]
+
+    async def served(scope, receive, send):
+        if scope["type"] == "http":
+            scope["asgi"] = {**scope.get("asgi", {}), "spec_version": spec_version[0]}
+        await app(scope, receive, send)
+
+    server = uvicorn.Server(uvicorn.Config(served, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    body = {"message": "Bugün ne izlemeliyim?", "user_id": user_id}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+        start = time.perf_counter()
+        full = (await client.post("/api/chat", json=body)).json()["response"]
+        blocking_s = time.perf_counter() - start
+
+        # 1) Akış: ilk parça LLM'in ilk token'ı kadar sürede gelmeli, birleşimi tam yanıtla aynı
+        start = time.perf_counter()
+        deltas, first_s, events = [], None, []
+        async with client.stream("POST", "/api/chat/stream", json=body) as response:
+            content_type = response.headers["content-type"]
+            async for event, data, at in read_events(response):
+                events.append(event)
+                if event == "message":
+                    first_s = first_s or at - start
+                    deltas.append(data["delta"])
+        streamed = "".join(deltas)
+
+        # 2) İstemci ilk parçadan sonra bağlantıyı keserse LLM akışı kapatılmalı
+        async with client.stream("POST", "/api/chat/stream", json=body) as response:
+            async for event, data, at in read_events(response):
+                break
+        await asyncio.sleep(0.3)
+        cancelled = fake.streams[-1]
+        total_tokens = len(deltas)
+
+        # 3) LLM hiç parça göndermezken (takılmış) istemci giderse slot beklemeden geri verilmeli.
+        # ASGI 2.4 sunucularında Starlette bağlantı kopmasını kendisi dinlemez; iki sürüm de denenir
+        fake.first_token_ms = 10_000
+        released_s, stalled = {}, {}
+        for version in ("2.3", "2.4"):
+            spec_version[0] = version
+            async with client.stream("POST", "/api/chat/stream", json=body) as response:
+                while chat_engine.gateway.active == 0:
+                    await asyncio.sleep(0.01)
+            left = time.perf_counter()
+            while chat_engine.gateway.active and time.perf_counter() - left < 5:
+                await asyncio.sleep(0.01)
+            released_s[version], stalled[version] = time.perf_counter() - left, fake.streams[-1]
+        fake.first_token_ms = 300
+
+        unauthorized = await client.post("/api/chat/stream", json={"message": "merhaba"})
+
+    server.should_exit = True
+    await serving
+    print(f"Tam yanıt {blocking_s * 1000:.0f} ms; akış: ilk parça {first_s * 1000:.0f} ms, {len(deltas)} parça, "
+          f"aynı metin: {streamed == full}, son olay: {events[-1]}, {content_type}")
+    print(f"Bağlantı kesilince LLM akışı kapandı: {cancelled.closed} ({cancelled.sent}/{total_tokens} parça üretildi); "
+          f"girişsiz istek: {unauthorized.status_code}")
+    for version in released_s:
+        print(f"Takılan LLM akışında bağlantı kesilince (ASGI {version}) slot {released_s[version] * 1000:.0f} ms içinde boşaldı, "
+              f"akış kapandı: {stalled[version].closed}")
+
+    if streamed == full and first_s < 0.6 < blocking_s and events[-1] == "done" and content_type.startswith("text/event-stream") \
+            and cancelled.closed and cancelled.sent < total_tokens and unauthorized.status_code == 401 \
+            and all(released_s[v] < 0.5 and stalled[v].closed and stalled[v].sent == 0 for v in released_s):
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,75 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_catalog import GenreCatalog, genre_catalog
+from backend.src.models_pg import Genre, MovieGenre
+from backend.src.recommender import engine as rec_engine
+
+
+def versioning():
+    """İçerik aynıysa version/etag sabit, değişince artar; ttl dolunca bayatlar, yeniden okununca tazelenir."""
+    now = [0.0]
+    catalog = GenreCatalog(ttl=60, clock=lambda: now[0])
+    catalog._build([(2, "Drama"), (1, "Action")])
+    first = (catalog.version, catalog.etag)
+    catalog._build([(1, "Action"), (2, "Drama")])
+    same = (catalog.version, catalog.etag) == first
+    catalog._build([(1, "Action"), (2, "Dram")])
+    changed = catalog.version == 2 and catalog.etag != first[1]
+    fresh = not catalog.is_stale
+    now[0] = 61
+    expired = catalog.is_stale
+    catalog._build([(1, "Action")])
+    return same and changed and fresh and expired and not catalog.is_stale and catalog.names_of([2, 1, 7]) == ["Action"]
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    async with async_session_maker() as session:
+        db_genres = {g.genre_id: g.genre_name for g in (await session.execute(select(Genre))).scalars().all()}
+        pairs = (await session.execute(select(MovieGenre.movie_id, MovieGenre.genre_id))).all()
+    by_movie = {}
+    for movie_id, genre_id in pairs:
+        by_movie.setdefault(movie_id, set()).add(genre_id)
+    sample = sorted(by_movie)[::100]
+
+    from backend.main import app
+    queries = []
+    listener = lambda *args: queries.append(args[2])
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        listing = await client.get("/api/genres")
+        cached = await client.get("/api/genres", headers={"If-None-Match": listing.headers["etag"]})
+        stale = await client.get("/api/genres", headers={"If-None-Match": 'W/"genres-eski"'})
+        wrong = 0
+        for movie_id in sample:
+            resp = await client.get(f"/api/genres/movie/{movie_id}")
+            wrong += {g["genre_id"]: g["genre_name"] for g in resp.json()} != {g: db_genres[g] for g in by_movie[movie_id]}
+            again = await client.get(f"/api/genres/movie/{movie_id}", headers={"If-None-Match": resp.headers["etag"]})
+            wrong += again.status_code != 304
+        names = await rec_engine.get_genre_names(list(db_genres)[:3])
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+    listing_ok = {g["genre_id"]: g["genre_name"] for g in listing.json()} == db_genres
+    print(f"/api/genres: {len(listing.json())} tür, DB ile aynı: {listing_ok}; If-None-Match: {cached.status_code} "
+          f"(gövde {len(cached.content)} bayt), eski etag: {stale.status_code}; {len(sample)} filmin türlerinde fark: {wrong}; "
+          f"DB sorgusu: {len(queries)}; sürüm/etag davranışı: {versioning()}")
+
+    if listing_ok and cached.status_code == 304 and not cached.content and stale.status_code == 200 and wrong == 0 \
+            and not queries and names == [db_genres[g] for g in list(db_genres)[:3]] and versioning() \
+            and genre_catalog.version >= 1:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,70 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy import text
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_filter import genre_condition
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    index = rec_engine.genre_index
+    genres = sorted(index.genre_bits, key=lambda g: -int(((index.masks >> index.genre_bits[g]) & 1).sum()))
+    combos = [[genres[0]], [genres[0], genres[1]], [genres[1], genres[2], genres[3]], [genres[0], 99999]]
+    from backend.main import app
+
+    # 1) EXISTS koşulu bellek içi tür indeksiyle aynı filmleri seçmeli (any / all)
+    mismatches = 0
+    async with async_session_maker() as session, \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        for combo in combos:
+            for match_all in (False, True):
+                expected = index.query(**{"all_of" if match_all else "any_of": combo}).tolist()
+                got = (await session.execute(
+                    select(Movie.movieId).where(genre_condition(combo, match_all=match_all)).order_by(Movie.movieId)
+                )).scalars().all()
+                # 2) HTTP: sıralı (SQL) ve sırasız (bellek içi) yollar aynı kümeden seçmeli
+                params = {"genre_ids": ",".join(map(str, combo)), "genre_match": "all" if match_all else "any", "limit": 100}
+                sorted_page = (await client.get("/api/movies", params={**params, "sort_by": "popularity"})).json()
+                random_page = (await client.get("/api/movies", params={**params, "seed": 7})).json()
+                wanted = set(index.query(**{"all_of" if match_all else "any_of": combo}, min_vote=5.0).tolist())
+                if list(got) != expected or not {m["movieId"] for m in sorted_page + random_page} <= wanted \
+                        or len(sorted_page) != min(100, len(wanted)) or len(random_page) != min(100, len(wanted)):
+                    mismatches += 1
+                    print(f"  FARK: türler={combo} hepsi={match_all}")
+        bad = await client.get("/api/movies", params={"genre_ids": str(genres[0]), "genre_match": "some"})
+
+        # 3) "M filminin türleri" tek sorguda, movie_genres ile aynı
+        wrong_genres = 0
+        for movie_id in index.movie_ids[::150].tolist():
+            got = [g["genre_id"] for g in (await client.get(f"/api/genres/movie/{movie_id}")).json()]
+            wrong_genres += got != sorted(index.genres_of(movie_id))
+
+        # 4) movie_genres değişince trigger movies.genre_ids'i güncellemeli (işlem geri alınır)
+        movie_id = int(index.movie_ids[0])
+        new_genre = next(g for g in genres if g not in index.genres_of(movie_id))
+        await session.execute(text("INSERT INTO movie_genres (movie_id, genre_id) VALUES (:m, :g)"), {"m": movie_id, "g": new_genre})
+        added = (await session.execute(select(Movie.genre_ids).where(Movie.movieId == movie_id))).scalar()
+        await session.execute(text("DELETE FROM movie_genres WHERE movie_id = :m"), {"m": movie_id})
+        removed = (await session.execute(select(Movie.genre_ids).where(Movie.movieId == movie_id))).scalar()
+        await session.rollback()
+        synced = added == sorted(index.genres_of(movie_id) + [new_genre]) and removed == []
+    print(f"{len(combos)} tür kombinasyonu x any/all, tür indeksinden fark: {mismatches}; geçersiz genre_match: {bad.status_code}; "
+          f"film türleri farkı: {wrong_genres}; trigger senkron: {synced}")
+
+    if mismatches == 0 and bad.status_code == 400 and wrong_genres == 0 and synced:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_index import GenreIndex
+from backend.src.models_pg import Movie, MovieGenre, Genre
+import numpy as np
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+from sqlalchemy.schema import CreateTable
+from sqlalchemy import func
+
+
+async def test():
+    await init_db()
+    async with async_session_maker() as session:
+        index = await GenreIndex.load(session)
+        print(f"İndeks: {len(index.movie_ids)} film, {len(index.genre_bits)} tür")
+
+        genre_ids = (await session.execute(select(Genre.genre_id))).scalars().all()
+        mismatches = 0
+        for gid in genre_ids:
+            # any_of + vote eşiği, SQL ile aynı kümeyi vermeli
+            sql_ids = set((await session.execute(
+                select(Movie.movieId)
+                .join(MovieGenre, MovieGenre.movie_id == Movie.movieId)
+                .where(MovieGenre.genre_id == gid)
+                .where(Movie.vote_average > 6.0)
+            )).scalars().all())
+            if set(index.query(any_of=[gid], min_vote=6.0).tolist()) != sql_ids:
+                mismatches += 1
+                print(f"  FARK: genre_id={gid}")
+
+        # all_of: iki türün ikisine de sahip filmler
+        if len(genre_ids) >= 2:
+            a, b = genre_ids[0], genre_ids[1]
+            both = (
+                select(MovieGenre.movie_id)
+                .where(MovieGenre.genre_id.in_([a, b]))
+                .group_by(MovieGenre.movie_id)
+                .having(func.count(func.distinct(MovieGenre.genre_id)) == 2)
+            )
+            sql_ids = set((await session.execute(both)).scalars().all())
+            if set(index.query(all_of=[a, b]).tolist()) != sql_ids:
+                mismatches += 1
+                print(f"  FARK: all_of=[{a}, {b}]")
+
+        watched = index.movie_ids[:50]
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            index.query(any_of=genre_ids[:3], exclude=watched, min_vote=5.5)
+        print(f"Sorgu süresi: {(time.perf_counter() - t0) * 1000:.1f} µs/sorgu")
+
+    # shuffle_key'i NULL olan film indekse girmez (SQL örnekleme yolları da almaz); create_all DEFAULT random() kurar
+    small = GenreIndex.from_arrays([3, 1, 2], [7.0, 7.0, 7.0], [0.5, np.nan, 0.2], pairs=[(1, 5), (2, 5), (3, 6)])
+    nulls_ok = small.movie_ids.tolist() == [2, 3] and small.shuffle_key.tolist() == [0.2, 0.5] \
+        and small.query(any_of=[5]).tolist() == [2]
+    ddl = str(CreateTable(Movie.__table__).compile(dialect=postgresql.dialect()))
+    default_ok = "shuffle_key FLOAT DEFAULT random()" in ddl
+
+    print(f"Fark: {mismatches}; NULL anahtarlı film dışarıda: {nulls_ok}; create_all DEFAULT random(): {default_ok}")
+    if mismatches == 0 and nulls_ok and default_ok:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
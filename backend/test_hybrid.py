@@ -0,0 +1,81 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+import pandas as pd
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie
+from backend.src.hybrid import DEFAULT_WEIGHTS
+from backend.src.recommender import engine as rec_engine
+
+
+def reference_scores(df, genre_matrix, genre_vector, weights):
+    """Aynı puanın pandas ile sütun sütun hesaplanmış hali (karşılaştırma için)."""
+    scale = lambda s: (s - s.min()) / (s.max() - s.min())
+    year = pd.to_numeric(df["release_date"].str[:4], errors="coerce")
+    year = year.fillna(year.median())
+    score = (
+        weights["vote_average"] * scale(df["vote_average"].fillna(0))
+        + weights["popularity"] * scale(np.log1p(df["popularity"].fillna(0).clip(lower=0)))
+        + weights["avg_rating"] * scale(df["avg_rating"].fillna(0))
+        + weights["rating_count"] * scale(np.log1p(df["rating_count"].fillna(0).clip(lower=0)))
+        + weights["year"] * scale(year)
+    ).to_numpy()
+    return score + weights["genre"] * (genre_matrix @ genre_vector) / genre_vector.sum()
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    index, scorer = rec_engine.genre_index, rec_engine.hybrid
+
+    # 1) Matvec puanı, ayrı ayrı hesaplanan referansla aynı olmalı
+    async with async_session_maker() as session:
+        rows = (await session.execute(select(
+            Movie.movieId, Movie.vote_average, Movie.popularity, Movie.avg_rating,
+            Movie.rating_count, Movie.release_date,
+        ).order_by(Movie.movieId))).all()
+    df = pd.DataFrame(rows, columns=["movieId", "vote_average", "popularity", "avg_rating", "rating_count", "release_date"])
+    genres = list(index.genre_bits)[:3]
+    genre_vector = index.genre_vector(genres)
+    expected = reference_scores(df, index.genre_matrix(), genre_vector, DEFAULT_WEIGHTS)
+    diff = float(np.abs(scorer.scores(genre_vector) - expected).max())
+
+    # 2) top_positions sayfaları = tam sıralamanın dilimleri
+    keep = index.select(any_of=genres, min_vote=6.0)
+    full = np.flatnonzero(keep)[np.argsort(-expected[keep], kind="stable")]
+    pages = np.concatenate([scorer.top_positions(keep, s, 20, genre_vector)[0] for s in (0, 20, 40)])
+    pages_ok = np.allclose(expected[pages], expected[full[:60]], atol=1e-5)
+    print(f"Referansla en büyük fark: {diff:.2e}; sayfalar tam sıralamayla aynı: {pages_ok}")
+
+    # 3) API: hibrit sıra aynı havuzdan gelmeli; ağırlık değişince sıra değişmeli; hatalı istek 400
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        body = {"selected_genres": genres, "limit": 1000}
+        shuffled = (await client.post("/api/recommend", json={**body, "seed": 3})).json()
+        hybrid = (await client.post("/api/recommend", json={**body, "ranking": "hybrid"})).json()
+        by_pop = (await client.post("/api/recommend", json={
+            **body, "ranking": "hybrid", "limit": 20,
+            "weights": {name: 0.0 for name in DEFAULT_WEIGHTS} | {"popularity": 1.0},
+        })).json()
+        bad = await client.post("/api/recommend", json={**body, "ranking": "hybrid", "weights": {"x": 1}})
+        uid_page = (await client.post("/api/recommend", json={"user_id": 1, "ranking": "hybrid"})).json()
+    same_pool = {m["movieId"] for m in shuffled} == {m["movieId"] for m in hybrid}
+    pops = [m["popularity"] for m in by_pop]
+    pop_sorted = pops == sorted(pops, reverse=True)
+    print(f"Aynı havuz: {same_pool}, sadece popülerlik ağırlığıyla sıralı: {pop_sorted}, "
+          f"hatalı ağırlık: {bad.status_code}, kullanıcı sayfası: {len(uid_page)} film")
+
+    if diff < 1e-4 and pages_ok and same_pool and pop_sorted and bad.status_code == 400 and len(uid_page) == 20:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
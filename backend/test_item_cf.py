@@ -0,0 +1,67 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Interaction
+from backend.src.item_cf import ItemCF
+from backend.src import recommender
+from backend.src.recommender import engine as rec_engine
+
+
+def dense_top_scores(model, k):
+    """Yoğun hesap: R.T @ R kosinüs, köşegen sıfır, satır başına en büyük k puan."""
+    liked = model.liked.toarray()
+    cooc = liked.T @ liked
+    counts = liked.sum(axis=0)
+    norm = np.sqrt(np.outer(counts, counts))
+    sim = np.divide(cooc, norm, out=np.zeros_like(cooc), where=norm > 0)
+    np.fill_diagonal(sim, 0.0)
+    return -np.sort(-sim, axis=1)[:, :k]
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    model = rec_engine.item_cf
+
+    # 1) Seyrek blok hesabı yoğun hesapla aynı puanları vermeli (küçük blok: çok blok dene)
+    indices, scores = ItemCF.build_neighbors(model.liked, 20, block_size=97)
+    diff = np.abs(dense_top_scores(model, 20) - scores).max()
+    print(f"Seyrek vs yoğun en büyük puan farkı: {diff:.2e}")
+
+    # 2) Öneriler izlenenleri içermemeli
+    async with async_session_maker() as session:
+        rows = (await session.execute(select(Interaction.user_id, Interaction.movie_id))).all()
+    watched = {}
+    for uid, mid in rows:
+        watched.setdefault(uid, set()).add(mid)
+    leaks = sum(len(set(model.recommend(uid).tolist()) & mids) for uid, mids in watched.items())
+    print(f"{len(watched)} kullanıcı, izlenen sızıntısı: {leaks}")
+
+    # 3) Sayfalar: CF listesi + tür havuzu birlikte tekrarsız ilerlemeli
+    # (CF havuzunu küçültüp geçişin sayfa ortasına düşmesini sağla)
+    recommender.CF_POOL = 30
+    uid = max(watched, key=lambda u: len(watched[u]))
+    ranked = model.recommend(uid, limit=recommender.CF_POOL).tolist()
+    seen, dup = [], 0
+    for page in range(4):
+        movies = await rec_engine.recommend_for_user(uid, skip=page * 20, limit=20, seed=7)
+        ids = [m["movieId"] for m in movies]
+        dup += len(set(ids) & set(seen))
+        seen += ids
+    starts_with_cf = seen[:min(len(ranked), 20)] == ranked[:20]
+    print(f"Kullanıcı {uid}: CF aday {len(ranked)}, 4 sayfada {len(seen)} film, tekrar {dup}, CF başta: {starts_with_cf}")
+
+    if diff < 1e-5 and leaks == 0 and dup == 0 and starts_with_cf:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+
+from backend.src.db_pg import engine, init_db
+from backend.src.item_cf import ItemCF
+from backend.src.recommender import engine as rec_engine
+
+
+def full_rebuild(model):
+    """Artımlı modelin güncel kümelerinden sıfırdan kurulan model."""
+    users, items, liked = [], [], []
+    for uid, watched in model.watched_by_user.items():
+        likes = model.likes_by_user.get(uid, set())
+        for pos in watched | likes:
+            users.append(uid)
+            items.append(model.movie_ids[pos])
+            liked.append(pos in likes)
+    return ItemCF.from_arrays(model.movie_ids, users, items, liked, k=model.k)
+
+
+async def test(n_ops: int = 400):
+    await init_db()
+    await rec_engine.refresh_data()
+    model = rec_engine.item_cf
+    rng = np.random.default_rng(3)
+
+    # 1) Rastgele beğeni / beğeniyi geri alma / silme işlemleri, sadece bellekte
+    users = model.user_ids
+    timings, rebuilt = [], []
+    set_row = model._set_row
+    calls = []
+    model._set_row = lambda *args: (calls.append(1), set_row(*args))[1]
+    for _ in range(n_ops):
+        uid = int(rng.choice(users))
+        op = rng.random()
+        start = time.perf_counter()
+        if op < 0.5:
+            model.add_interaction(uid, int(rng.choice(model.movie_ids)), True)
+        elif op < 0.7:
+            model.add_interaction(uid, int(rng.choice(model.movie_ids)), False)
+        else:
+            liked = list(model.likes_by_user.get(uid, ()))
+            if liked:
+                model.remove_interaction(uid, int(model.movie_ids[rng.choice(liked)]))
+        timings.append(time.perf_counter() - start)
+        rebuilt.append(len(calls))
+        calls.clear()
+    del model._set_row
+    # Sınır yüzünden bekleyen satırlar kurulunca tam kurulumla aynı olmalı
+    pending = len(model.stale)
+    model.rebuild_stale()
+    drift = model.compare(full_rebuild(model))
+    ms = np.array(timings) * 1000
+    print(f"{n_ops} artımlı güncelleme: p50={np.percentile(ms, 50):.2f} ms, p99={np.percentile(ms, 99):.2f} ms; "
+          f"işlem başına en fazla {max(rebuilt)} satır baştan kuruldu, bekleyen {pending}; tam kurulumla fark: {drift}")
+    bounded = max(rebuilt) <= model.MAX_REBUILDS + 1  # +1: beğenilen filmin kendi satırı
+
+    # 2) HTTP: beğeni anında CF'ye yansımalı, silince geri alınmalı; periyodik kurulum kayma bulmamalı
+    await rec_engine.refresh_data()
+    from backend.main import app
+    uid = int(users[0])
+    watched = rec_engine.item_cf.watched_by_user.get(uid, set())
+    pos = next(p for p in range(len(rec_engine.item_cf.movie_ids)) if p not in watched)
+    unseen = int(rec_engine.item_cf.movie_ids[pos])
+    threads = []
+    add = rec_engine.item_cf.add_interaction
+    rec_engine.item_cf.add_interaction = lambda *args: (threads.append(threading.get_ident()), add(*args))[1]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        await client.post("/api/interactions", json={"user_id": uid, "movie_id": unseen, "is_liked": True})
+        liked_now = pos in rec_engine.item_cf.likes_by_user.get(uid, ())
+        off_loop = threads and threading.get_ident() not in threads
+        del rec_engine.item_cf.add_interaction
+        drift_after_like = await rec_engine.rebuild_item_cf()
+        await client.delete(f"/api/interactions/user/{uid}/movie/{unseen}")
+        removed = pos not in rec_engine.item_cf.likes_by_user.get(uid, ())
+        drift_after_delete = await rec_engine.rebuild_item_cf()
+
+        # Kayıt DB'ye yazıldıktan sonra motor hata verirse istek yine başarılı sayılmalı
+        def broken(*args):
+            raise RuntimeError("motor hatası")
+        rec_engine.item_cf.add_interaction = rec_engine.item_cf.remove_interaction = broken
+        saved = await client.post("/api/interactions", json={"user_id": uid, "movie_id": unseen, "is_liked": True})
+        deleted = await client.delete(f"/api/interactions/user/{uid}/movie/{unseen}")
+        del rec_engine.item_cf.add_interaction, rec_engine.item_cf.remove_interaction
+    print(f"HTTP beğeni yansıdı: {liked_now} (thread'de: {bool(off_loop)}), silme yansıdı: {removed}, "
+          f"kayma: {drift_after_like['mismatched_rows']} / {drift_after_delete['mismatched_rows']}; "
+          f"motor hatasında yanıt: {saved.status_code} / {deleted.status_code}")
+
+    if (drift["mismatched_rows"] == 0 and bounded and liked_now and off_loop and removed
+            and saved.status_code == deleted.status_code == 200
+            and drift_after_like["mismatched_rows"] == 0 and drift_after_delete["mismatched_rows"] == 0):
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
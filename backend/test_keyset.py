@@ -0,0 +1,74 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.keyset import SORT_KEYS, encode_cursor
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+
+
+async def walk(client, params, limit=50):
+    """Cursor'ları takip ederek tüm sayfaları gezer."""
+    ids, cursor, pages = [], None, 0
+    while True:
+        resp = await client.get("/api/movies", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        ids += [m["movieId"] for m in resp.json()]
+        pages += 1
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor or pages > 200:
+            return ids
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    genre_id = next(iter(rec_engine.genre_index.genre_bits))
+    from backend.main import app
+
+    mismatches = 0
+    async with async_session_maker() as session, \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        for sort_by, (key, direction) in SORT_KEYS.items():
+            for extra, conditions in (
+                ({}, []),
+                ({"genre_ids": str(genre_id)}, [Movie.movieId.in_(
+                    rec_engine.genre_index.query(any_of=[genre_id], min_vote=5.0).tolist())]),
+                ({"search": "the"}, [Movie.movieId.in_(rec_engine.search_ids("the"))]),
+            ):
+                expected = (await session.execute(
+                    select(Movie.movieId).where(*conditions).order_by(direction(key), direction(Movie.movieId))
+                )).scalars().all()
+                walked = await walk(client, {"sort_by": sort_by, **extra})
+                by_skip = [m["movieId"] for m in (await client.get(
+                    "/api/movies", params={"sort_by": sort_by, "skip": 40, "limit": 20, **extra})).json()]
+                if walked != list(expected) or by_skip != list(expected[40:60]):
+                    mismatches += 1
+                    print(f"  FARK: sort_by={sort_by} {extra}")
+
+        first = await client.get("/api/movies", params={"sort_by": "popularity"})
+        wrong_sort = await client.get("/api/movies", params={"sort_by": "title", "cursor": first.headers["x-next-cursor"]})
+        broken = await client.get("/api/movies", params={"sort_by": "title", "cursor": "bozuk"})
+        unknown = await client.get("/api/movies", params={"sort_by": "budget"})
+        # Kurcalanmış değer tipi (sayısal sıralamada metin, metin sıralamasında sayı) 500 değil 400
+        tampered = [
+            (await client.get("/api/movies", params={"sort_by": sort_by, "cursor": encode_cursor(sort_by, value, 1)})).status_code
+            for sort_by, value in (("popularity", "abc"), ("vote_average", True), ("release_date", 5), ("title", [1]))
+        ]
+    print(f"{len(SORT_KEYS)} sıralama x 3 filtre, cursor/skip ile tam sıralamadan fark: {mismatches}; "
+          f"başka sıralamanın cursor'ı {wrong_sort.status_code}, bozuk {broken.status_code}, bilinmeyen {unknown.status_code}, "
+          f"yanlış tipte değer {tampered}")
+
+    if mismatches == 0 and wrong_sort.status_code == broken.status_code == unknown.status_code == 400 \
+            and tampered == [400] * 4:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
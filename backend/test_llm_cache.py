@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from backend.src.chat_context import ChatContext
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.fake_llm import FakeLLMClient
+from backend.src.llm_cache import LLMCache, llm_cache_key, normalize_message
+from backend.src.models_pg import Interaction
+from backend.routes.chat import CineMatchEngine, engine as chat_engine
+
+
+async def test_cache_unit():
+    now = [1000.0]
+    clock = lambda: now[0]
+    context = ChatContext(user_id=1, fav_genre_names=["Dram"], liked_metadata=["A"], candidates=["X", "Y"])
+    key = llm_cache_key("Bana bir film öner!", context, "m", 0.7)
+    same = [
+        key == llm_cache_key("  bana bir   FİLM öner ", context, "m", 0.7),
+        key == llm_cache_key("Bana bir film öner", context.model_copy(update={"user_id": 2}), "m", 0.7),
+    ]
+    different = [
+        key != llm_cache_key("Bana bir dizi öner!", context, "m", 0.7),
+        key != llm_cache_key("Bana bir film öner!", context.model_copy(update={"candidates": ["Y", "X"]}), "m", 0.7),
+        key != llm_cache_key("Bana bir film öner!", context.model_copy(update={"liked_metadata": ["B"]}), "m", 0.7),
+        key != llm_cache_key("Bana bir film öner!", context, "m", 0.2),
+        key != llm_cache_key("Bana bir film öner!", context, "n", 0.7),
+    ]
+    print(f"normalize: {normalize_message('İYİ  bir film, öner!!')!r}; aynı anahtar: {same}; farklı anahtar: {different}")
+
+    cache = LLMCache(capacity=2, ttl=60, clock=clock)
+    await cache.put("a", "A", latency=1.5)
+    await cache.put("b", "B", latency=0.5)
+    await cache.get("a")                 # a en son kullanılan olur
+    await cache.put("c", "C")            # b atılır
+    lru_ok = await cache.get("b") is None and await cache.get("a") == "A" and await cache.get("c") == "C"
+    now[0] += 61
+    ttl_ok = await cache.get("a") is None and cache.expirations == 1
+    stats = cache.stats()
+    print(f"LRU: {lru_ok}, TTL: {ttl_ok}, istatistik: {stats}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm.sqlite")
+        await LLMCache(capacity=2, ttl=60, disk_path=path, clock=clock).put("k", "yanıt", latency=2.0)
+        reopened = LLMCache(capacity=2, ttl=60, disk_path=path, clock=clock)
+        # Disk katmanı olay döngüsünün thread'inde çalışmamalı (SQLite çağrıları asyncio.to_thread ile)
+        disk_threads = []
+        disk_get = reopened.disk.get
+        reopened.disk.get = lambda *args: disk_threads.append(threading.get_ident()) or disk_get(*args)
+        disk_ok = await reopened.get("k") == "yanıt" and reopened.disk_hits == 1 and await reopened.get("k") == "yanıt" \
+            and reopened.disk_hits == 1 and reopened.saved_seconds == 4.0
+        off_loop = len(disk_threads) == 1 and threading.get_ident() not in disk_threads
+        now[0] += 61
+        disk_expired = await LLMCache(capacity=2, ttl=60, disk_path=path, clock=clock).get("k") is None
+        print(f"Disk katmanı: yeni örnekte bulundu: {disk_ok}, süresi dolunca silindi: {disk_expired}, "
+              f"olay döngüsü dışında: {off_loop}")
+
+    return all(same) and all(different) and lru_ok and ttl_ok and stats["evictions"] == 1 \
+        and stats["hits"] == 3 and stats["misses"] == 2 and stats["saved_seconds"] == 3.0 and disk_ok and disk_expired \
+        and off_loop
+
+
+async def test():
+    unit_ok = await test_cache_unit()
+
+    await init_db()
+    async with async_session_maker() as session:
+        user_id, other_id = (await session.execute(
+            select(Interaction.user_id).group_by(Interaction.user_id).order_by(func.count().desc()).limit(2)
+        )).scalars().all()
+
+    fake = FakeLLMClient(first_token_ms=200, token_ms=2)
+    chat = CineMatchEngine(cache=LLMCache(capacity=10, ttl=60))
+    chat._client = fake
+
+    start = time.perf_counter()
+    first = await chat.get_personalized_recommendation(user_id, "Bana bir film öner!")
+    miss_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    second = await chat.get_personalized_recommendation(user_id, "bana bir film öner")
+    hit_ms = (time.perf_counter() - start) * 1000
+    calls_after_hit = fake.calls
+
+    # Farklı bağlam (başka kullanıcı) -> LLM'e gidilir
+    await chat.get_personalized_recommendation(other_id, "Bana bir film öner!")
+    calls_other = fake.calls
+
+    # Akışlı uç: önbellekteki yanıt tek parça; yeni mesaj akıştan önbelleğe yazılır
+    streamed_hit = [delta async for delta in chat.stream_recommendation(user_id, "Bana bir film öner.")]
+    streamed = "".join([delta async for delta in chat.stream_recommendation(user_id, "Listemden ne izleyeyim?")])
+    after_stream = await chat.get_personalized_recommendation(user_id, "listemden ne izleyeyim")
+    stats = chat.cache.stats()
+    print(f"İlk istek {miss_ms:.0f} ms, normalize edilmiş tekrar {hit_ms:.0f} ms (aynı yanıt: {first == second}); "
+          f"LLM çağrıları: {calls_after_hit} -> başka kullanıcı {calls_other} -> toplam {fake.calls}")
+    print(f"Akış: önbellekten {len(streamed_hit)} parça, akıştan yazılan yanıt tekrar kullanıldı: {after_stream == streamed}")
+    print(f"İstatistik: {stats}")
+
+    chat_engine._client = fake
+    chat_engine.cache = chat.cache
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        endpoint = (await client.get("/api/chat/cache/stats")).json()
+    print(f"/api/chat/cache/stats: {endpoint}")
+
+    if unit_ok and first == second and calls_after_hit == 1 and calls_other == 2 and hit_ms < miss_ms / 4 \
+            and streamed_hit == [first] and after_stream == streamed and fake.calls == 3 \
+            and stats["hits"] == 3 and stats["misses"] == 3 and stats["saved_seconds"] > 0.4 \
+            and endpoint["enabled"] and endpoint["hits"] == 3:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
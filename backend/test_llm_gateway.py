@@ -0,0 +1,117 @@
+import asyncio
+import socket
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import uvicorn
+from openai import AsyncOpenAI
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.fake_llm import FakeLLMClient, fake_openai_app
+from backend.src.llm_gateway import GatewayBusy, GatewayTimeout, LLMGateway
+from backend.src.models_pg import Interaction
+from backend.routes.chat import engine as chat_engine
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request_for(text):
+    return {"model": "gpt-4o-mini", "temperature": 0.7,
+            "messages": [{"role": "system", "content": f"ADAY LİSTESİ:\n{text}"}, {"role": "user", "content": text}]}
+
+
+async def outcome(call):
+    """Çağrının sonucu ya da hatasının sınıf adı, ve süresi (sn)."""
+    start = time.perf_counter()
+    try:
+        result = await call
+    except (GatewayBusy, GatewayTimeout) as e:
+        result = type(e).__name__
+    return result, time.perf_counter() - start
+
+
+async def test():
+    # OpenAI yerine yerel sahte sunucu: gerçek AsyncOpenAI istemcisi HTTP üzerinden bağlanır
+    fake = FakeLLMClient(first_token_ms=200, token_ms=2)
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(fake_openai_app(fake), host="127.0.0.1", port=port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key="test", max_retries=0)
+    await client.chat.completions.create(**request_for("Isınma"))  # İlk çağrının istemci kurulumu ölçüme girmesin
+
+    # 1) Eşzamanlılık sınırı ve kuyruk: 2 slot + 2 kuyruk; 6 farklı istekten 2'si beklemeden reddedilir
+    gateway = LLMGateway(max_concurrency=2, max_queue=2, timeout=5)
+    results = await asyncio.gather(*[outcome(gateway.complete(client, **request_for(f"Film {i}"))) for i in range(6)])
+    answered = [seconds for result, seconds in results if result not in ("GatewayBusy", "GatewayTimeout")]
+    rejected = [seconds for result, seconds in results if result == "GatewayBusy"]
+    print(f"Sınır: {len(answered)} yanıt, {len(rejected)} red (en yavaş red {max(rejected) * 1000:.1f} ms); "
+          f"sunucuda aynı anda en fazla {fake.peak} çağrı, geçitte {gateway.peak_active}")
+    limit_ok = len(answered) == 4 and len(rejected) == 2 and max(rejected) < 0.05 and fake.peak == 2 \
+        and gateway.active == gateway.waiting == 0 and gateway.rejected == 2
+
+    # 2) Tek uçuş: aynı anda gelen 5 aynı istek tek LLM çağrısı
+    calls = fake.calls
+    same = await asyncio.gather(*[gateway.complete(client, **request_for("Aynı film")) for _ in range(5)])
+    print(f"Tek uçuş: 5 istek -> {fake.calls - calls} LLM çağrısı, birleştirilen {gateway.coalesced}, aynı yanıt: {len(set(same)) == 1}")
+    coalesce_ok = fake.calls - calls == 1 and gateway.coalesced == 4 and len(set(same)) == 1
+
+    # 3) Süre sınırı: ilk token 200 ms, sınır 100 ms -> GatewayTimeout, slot geri verilir
+    strict = LLMGateway(max_concurrency=1, max_queue=4, timeout=0.1)
+    timed = await asyncio.gather(*[outcome(strict.complete(client, **request_for(f"Yavaş {i}"))) for i in range(2)])
+    stream_timed = await outcome(anext(strict.stream(client, **request_for("Yavaş akış"))))
+    print(f"Süre sınırı: {[(r, round(s, 2)) for r, s in timed]}, akış: {stream_timed[0]}; "
+          f"zaman aşımı {strict.timeouts}, boş slot: {strict.active == 0}")
+    timeout_ok = all(r == "GatewayTimeout" and s < 0.2 for r, s in timed + [stream_timed]) \
+        and strict.timeouts == 3 and strict.active == strict.waiting == 0
+
+    # 4) Akış geçitten geçer; birleşimi akışsız yanıtla aynı
+    full = await gateway.complete(client, **request_for("Akış"))
+    streamed = "".join([chunk.choices[0].delta.content async for chunk in gateway.stream(client, **request_for("Akış"))
+                        if chunk.choices and chunk.choices[0].delta.content])
+    stats = gateway.stats()
+    print(f"Akış: aynı metin {streamed == full}; histogram: kuyruk p95 {stats['queue_wait']['p95']} sn, "
+          f"ilk parça p50 {stats['first_token']['p50']} sn, toplam {stats['latency']['count']} çağrı p50 {stats['latency']['p50']} sn")
+    stream_ok = streamed == full and stats["first_token"]["count"] == 1 and stats["latency"]["count"] == 7 \
+        and stats["latency"]["buckets"]["+Inf"] == 7 and stats["latency"]["p50"] == 0.5
+
+    # 5) Route: geçit doluysa /api/chat ve /api/chat/stream hemen 429 (Retry-After ile)
+    await init_db()
+    async with async_session_maker() as session:
+        user_id = (await session.execute(select(Interaction.user_id).limit(1))).scalar()
+    chat_engine._client = client
+    chat_engine.cache = None
+    chat_engine.gateway = LLMGateway(max_concurrency=1, max_queue=0, timeout=5)
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30) as http:
+        first = asyncio.create_task(http.post("/api/chat", json={"message": "Bir film öner", "user_id": user_id}))
+        while chat_engine.gateway.active == 0:
+            await asyncio.sleep(0.01)
+        busy = await http.post("/api/chat", json={"message": "Başka bir film öner", "user_id": user_id})
+        busy_stream = await http.post("/api/chat/stream", json={"message": "Başka bir film öner", "user_id": user_id})
+        first = await first
+        endpoint = (await http.get("/api/chat/gateway/stats")).json()
+    print(f"Route: ilk istek {first.status_code}, dolu geçit {busy.status_code} / akış {busy_stream.status_code} "
+          f"(Retry-After {busy.headers.get('retry-after')}); /gateway/stats rejected={endpoint['rejected']}")
+    route_ok = first.status_code == 200 and busy.status_code == 429 and busy_stream.status_code == 429 \
+        and busy.headers.get("retry-after") == "1" and endpoint["rejected"] == 2 and endpoint["calls"] == 1
+
+    server.should_exit = True
+    await serving
+    if limit_ok and coalesce_ok and timeout_ok and stream_ok and route_ok:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
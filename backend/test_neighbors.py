@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.src.recommenderv3 import MovieRecommender
+
+DATA_PATH = root_path / "backend" / "data" / "movies_with_metadata.csv"
+
+
+def test(k: int = 20):
+    motor = MovieRecommender(str(DATA_PATH))
+    motor.load_data()
+    motor.create_similarity_matrix(k=k, block_size=256)
+
+    # Eski yoğun hesap: %85 metin + %15 sayısal, N×N
+    from sklearn.feature_extraction.text import CountVectorizer
+    import re
+    clean = motor.df['llm_metadata'].fillna('').apply(lambda t: re.sub(r'\b\d{4}\b', '', str(t)))
+    dense = cosine_similarity(CountVectorizer().fit_transform(clean)) * 0.85 + cosine_similarity(motor.normalized_df) * 0.15
+    np.fill_diagonal(dense, -np.inf)
+
+    # Komşu puanları yoğun matrisin en yüksek k puanıyla aynı olmalı (eşit puanlarda sıra farklı olabilir)
+    expected = -np.sort(-dense, axis=1)[:, :k]
+    score_diff = np.abs(expected - motor.neighbor_scores).max()
+    gathered = np.take_along_axis(dense, motor.neighbor_indices.astype(np.int64), axis=1)
+    index_diff = np.abs(gathered - motor.neighbor_scores).max()
+
+    print(f"En büyük puan farkı: {score_diff:.2e}, indeks tutarlılık farkı: {index_diff:.2e}")
+    print(f"Komşu tablosu: {motor.neighbor_indices.nbytes + motor.neighbor_scores.nbytes} byte, "
+          f"yoğun matris: {dense.nbytes} byte")
+    if score_diff < 1e-4 and index_diff < 1e-4:
+        print("All tests passed!")
+
+if __name__ == "__main__":
+    test()
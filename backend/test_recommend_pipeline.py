@@ -0,0 +1,90 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.recommender import engine as rec_engine
+from backend.src.models_pg import Movie, User, Interaction, MovieGenre
+from sqlalchemy.future import select
+from sqlalchemy import and_, func
+
+
+async def legacy_recommend_for_user(session, user_id, skip=0, limit=20, order_by=None):
+    """Eski çok sorgulu recommend_for_user akışı (karşılaştırma için birebir kopya)."""
+    order_by = order_by if order_by is not None else func.random()
+    user = (await session.execute(select(User).where(User.user_id == user_id))).scalars().first()
+    if not user:
+        return None
+
+    fav_genre_ids = user.selected_genres or []
+    liked_movie_ids = [i.movie_id for i in (await session.execute(
+        select(Interaction).where(and_(Interaction.user_id == user_id, Interaction.is_liked == True))
+    )).scalars().all()]
+    all_watched_ids = [i.movie_id for i in (await session.execute(
+        select(Interaction).where(Interaction.user_id == user_id)
+    )).scalars().all()]
+
+    candidate_ids = []
+    if fav_genre_ids:
+        res = await session.execute(
+            select(MovieGenre.movie_id).where(MovieGenre.genre_id.in_(fav_genre_ids)).distinct()
+        )
+        candidate_ids = [r[0] for r in res.fetchall()]
+    if liked_movie_ids:
+        res = await session.execute(
+            select(MovieGenre.genre_id).where(MovieGenre.movie_id.in_(liked_movie_ids)).distinct()
+        )
+        liked_genre_ids = [r[0] for r in res.fetchall()]
+        if liked_genre_ids:
+            res = await session.execute(
+                select(MovieGenre.movie_id).where(MovieGenre.genre_id.in_(liked_genre_ids)).distinct()
+            )
+            candidate_ids = list(set(candidate_ids + [r[0] for r in res.fetchall()]))
+
+    candidate_ids = [mid for mid in candidate_ids if mid not in all_watched_ids]
+
+    if not candidate_ids:
+        stmt = (
+            select(Movie)
+            .where(Movie.movieId.notin_(all_watched_ids) if all_watched_ids else True)
+            .where(Movie.vote_average > 5.0)
+        )
+    else:
+        stmt = select(Movie).where(Movie.movieId.in_(candidate_ids)).where(Movie.vote_average > 5.5)
+    stmt = stmt.order_by(order_by).offset(skip).limit(limit)
+    return (await session.execute(stmt)).scalars().all()
+
+
+async def test():
+    await init_db()
+    async with async_session_maker() as session:
+        user_ids = (await session.execute(select(User.user_id).limit(50))).scalars().all()
+        # Var olmayan kullanıcı da aynı davranmalı
+        user_ids = list(user_ids) + [-1]
+
+        mismatches = 0
+        for uid in user_ids:
+            old = await legacy_recommend_for_user(session, uid, limit=None, order_by=Movie.movieId)
+            rows = (await session.execute(
+                rec_engine._user_page_stmt(uid, limit=None, order_by=[Movie.movieId])
+            )).all()
+
+            if old is None:
+                same = not rows
+            else:
+                new_ids = [m.movieId for _, m in rows if m is not None]
+                same = [m.movieId for m in old] == new_ids
+            if not same:
+                mismatches += 1
+                print(f"  FARK: user_id={uid}")
+
+    print(f"{len(user_ids)} kullanıcı karşılaştırıldı, fark: {mismatches}")
+    if mismatches == 0:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
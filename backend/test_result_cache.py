@@ -0,0 +1,117 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+
+from backend.src.db_pg import engine, init_db
+from backend.src.recommender import engine as rec_engine
+from backend.src.result_cache import RESULT_DEPTH, ResultCache, decode_cursor, encode_cursor, result_key
+
+
+def unit_checks():
+    now = [0.0]
+    cache = ResultCache(capacity=2, ttl=10, clock=lambda: now[0])
+    a, b, c = result_key(1, seed=1), result_key(None, [3, 1], seed=1), result_key(2, seed=1)
+    cache.put(a, [1])
+    cache.put(b, [2])
+    cache.get(a)
+    cache.put(c, [3])                      # b en eski -> tahliye
+    lru_ok = cache.get(b) is None and cache.evictions == 1
+    now[0] = 11
+    ttl_ok = cache.get(a) is None and cache.expirations == 1
+    cache.put(a, [1])
+    cache.invalidate_user(1)
+    invalidate_ok = cache.get(a) is None and cache.invalidations == 1
+    # Hesaplama sürerken kullanıcının girdileri silinirse eski liste yazılmamalı
+    started = cache.generation(1)
+    cache.invalidate_user(1)
+    cache.put(a, [9], generation=started)
+    fresh = cache.generation(1)
+    cache.put(a, [1], generation=fresh)
+    invalidate_ok &= cache.get(a) == [1]
+    started = cache.generation(None)
+    cache.clear()
+    cache.put(b, [2], generation=started)
+    invalidate_ok &= cache.get(b) is None
+
+    key = result_key(None, [28, 12], seed=5, ranking="hybrid", weights={"popularity": 1})
+    cursor_ok = decode_cursor(encode_cursor(key, 40)) == (key, 40)
+    try:
+        decode_cursor("bozuk")
+        cursor_ok = False
+    except ValueError:
+        pass
+    print(f"LRU: {lru_ok}, TTL: {ttl_ok}, kullanıcı silme: {invalidate_ok}, cursor: {cursor_ok}")
+    return lru_ok and ttl_ok and invalidate_ok and cursor_ok
+
+
+async def test():
+    ok = unit_checks()
+    await init_db()
+    await rec_engine.refresh_data()
+    uid = int(rec_engine.item_cf.user_ids[0])
+    genres = list(rec_engine.genre_index.genre_bits)[:2]
+
+    # 1) Önbellekli sayfalar, önbelleksiz hesaplanan sayfalarla aynı olmalı (derinlik ötesi dahil)
+    same = True
+    for skip in (0, 20, 40, RESULT_DEPTH - 10, RESULT_DEPTH + 20):
+        cached, _ = await rec_engine.recommend_page(uid, skip=skip, limit=20, seed=9)
+        direct = await rec_engine.recommend_for_user(uid, skip=skip, limit=20, seed=9)
+        cached_g, _ = await rec_engine.recommend_page(None, [], skip=skip, limit=20, seed=9)
+        direct_g = await rec_engine.recommend_for_guest([], skip=skip, limit=20, seed=9)
+        same &= [m["movieId"] for m in cached] == [m["movieId"] for m in direct]
+        same &= [m["movieId"] for m in cached_g] == [m["movieId"] for m in direct_g]
+    print(f"Önbellekli = önbelleksiz sayfalar: {same}; {rec_engine.results.stats()}")
+
+    # Liste hesaplanırken (await'ler arasında) etkileşim gelirse liste önbelleğe yazılmamalı
+    user_ids = rec_engine.user_ids
+
+    async def racing_user_ids(*args, **kwargs):
+        ids = await user_ids(*args, **kwargs)
+        rec_engine.results.invalidate_user(uid)  # record_interaction tam bu arada çalışmış gibi
+        return ids
+
+    rec_engine.user_ids = racing_user_ids
+    await rec_engine.recommend_page(uid, skip=0, limit=20, seed=77)
+    rec_engine.user_ids = user_ids
+    raced_ok = rec_engine.results.get(result_key(uid, seed=77)) is None
+    await rec_engine.recommend_page(uid, skip=0, limit=20, seed=77)
+    raced_ok &= rec_engine.results.get(result_key(uid, seed=77)) is not None
+    print(f"Hesaplama sırasında silinen kullanıcının listesi yazılmadı, sonraki istekte yazıldı: {raced_ok}")
+
+    # 2) HTTP: cursor ile gezinme = skip ile gezinme; etkileşim önbelleği siler
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        body = {"selected_genres": genres, "seed": 4, "limit": 20}
+        by_skip = [m["movieId"] for s in (0, 20, 40) for m in (await client.post("/api/recommend", json={**body, "skip": s})).json()]
+        by_cursor, cursor = [], None
+        for _ in range(3):
+            resp = await client.post("/api/recommend", json={"cursor": cursor} if cursor else body)
+            by_cursor += [m["movieId"] for m in resp.json()]
+            cursor = resp.headers.get("x-next-cursor")
+        bad = await client.post("/api/recommend", json={"cursor": "xx"})
+        missing = await client.post("/api/recommend", json={"user_id": -7, "seed": 1})
+
+        await client.post("/api/recommend", json={"user_id": uid, "seed": 4})
+        before = (await client.get("/api/recommend/cache/stats")).json()
+        watched = rec_engine.item_cf.watched_by_user.get(uid, set())
+        unseen = int(next(m for p, m in enumerate(rec_engine.item_cf.movie_ids) if p not in watched))
+        await client.post("/api/interactions", json={"user_id": uid, "movie_id": unseen, "is_liked": True})
+        after_like = await client.post("/api/recommend", json={"user_id": uid, "seed": 4})
+        await client.delete(f"/api/interactions/user/{uid}/movie/{unseen}")
+        stats = (await client.get("/api/recommend/cache/stats")).json()
+    cursor_ok = by_skip == by_cursor and len(by_cursor) == 60
+    invalidated = stats["invalidations"] >= before["invalidations"] + 2 and unseen not in [m["movieId"] for m in after_like.json()]
+    print(f"Cursor = skip: {cursor_ok}, bozuk cursor: {bad.status_code}, olmayan kullanıcı: {missing.status_code}, "
+          f"etkileşimde silindi: {invalidated}; {stats}")
+
+    if ok and same and raced_ok and cursor_ok and bad.status_code == 400 and missing.status_code == 404 and invalidated:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,105 @@
+import asyncio
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.genre_filter import genre_condition
+from backend.src.models_pg import Movie
+from backend.src.sampling import fetch_sampled_page, sample_order, sample_positions, sampled_page
+
+SEEDS = [0, 1, 42, 2 ** 31 - 1]
+
+
+async def walk_sql(session, conditions, seed, limit=50):
+    """fetch_sampled_page cursor'larını takip ederek tüm sırayı çıkarır."""
+    ids, cursor = [], None
+    while True:
+        movies, cursor = await fetch_sampled_page(session, conditions, seed, cursor=cursor, limit=limit)
+        ids += [m.movieId for m in movies]
+        if not cursor:
+            return ids
+
+
+async def walk_api(client, seed, limit=100, **params):
+    ids, cursor = [], None
+    while True:
+        resp = await client.get("/api/movies", params={"seed": seed, "limit": limit, **params, **({"cursor": cursor} if cursor else {})})
+        ids += [m["movieId"] for m in resp.json()]
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+
+
+async def test():
+    await init_db()
+    from backend.main import app
+    mismatches = 0
+    async with async_session_maker() as session, \
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        for conditions in ([], [Movie.vote_average > 5.0]):
+            rows = (await session.execute(
+                select(Movie.movieId, Movie.shuffle_key).where(*conditions)
+                .where(Movie.shuffle_key.isnot(None)).order_by(Movie.movieId)
+            )).all()
+            ids = np.array([mid for mid, _ in rows])
+            keys = np.array([key for _, key in rows])
+            for seed in SEEDS:
+                # Bellek içi sıra (sample_positions) = SQL sırası: cursor'la tüm sayfalar ve OFFSET'li derin sayfa
+                expected = ids[sample_positions(keys, seed, 0, len(ids))].tolist()
+                walked = await walk_sql(session, conditions, seed)
+                by_skip = (await session.execute(sampled_page(conditions, seed, skip=300, limit=20))).scalars().all()
+                in_memory = ids[sample_positions(keys, seed, 300, 20)].tolist()
+                # Tek sıralamalı SQL anahtarı (sample_order, _user_page_stmt'in kullandığı) da aynı sırayı vermeli
+                ordered = (await session.execute(
+                    select(Movie.movieId).where(*conditions).where(Movie.shuffle_key.isnot(None))
+                    .order_by(sample_order(Movie.shuffle_key, seed), Movie.movieId)
+                )).scalars().all()
+                if walked != expected or [m.movieId for m in by_skip] != expected[300:320] \
+                        or in_memory != expected[300:320] or ordered != expected:
+                    mismatches += 1
+                    print(f"  FARK: seed={seed}, {len(conditions)} koşul")
+
+        api_walk = await walk_api(client, SEEDS[2])
+        genre_lists = [g for g in (await session.execute(select(Movie.genre_ids))).scalars() if g]
+        # Tür filtresi (sıralamasız) bellek içi yoldan gelir; cursor'ı da aynı sırayı sonuna kadar gezmeli
+        genre_id = int(np.bincount(np.concatenate(genre_lists)).argmax())  # En kalabalık tür: birden çok sayfa
+        genre_walk = await walk_api(client, SEEDS[2], limit=50, genre_ids=str(genre_id))
+        genre_expected = (await session.execute(
+            select(Movie.movieId).where(genre_condition([genre_id]), Movie.vote_average > 5.0)
+        )).scalars().all()
+        genre_first = await client.get("/api/movies", params={"seed": 1, "genre_ids": str(genre_id)})
+        genre_other_seed = await client.get("/api/movies", params={
+            "seed": 2, "genre_ids": str(genre_id), "cursor": genre_first.headers["x-next-cursor"]})
+        first = await client.get("/api/movies", params={"seed": 1, "limit": 20})
+        other_seed = await client.get("/api/movies", params={"seed": 2, "cursor": first.headers["x-next-cursor"]})
+
+    # Yakın başlangıçlı seed'ler neredeyse aynı akışı görmemeli: 200 seed'in her çiftinde
+    # ilk 10 sayfanın aynı sıradaki sayfalarında ortak film oranı (eski tek başlangıç noktalı sırada
+    # başlangıçları yakın çiftlerde bu oran 1'e yaklaşıyordu)
+    feeds = [ids[sample_positions(keys, seed, 0, 200)].reshape(10, 20) for seed in range(200)]
+    pages = [[set(page.tolist()) for page in feed] for feed in feeds]
+    shared = max(
+        sum(len(x & y) for x, y in zip(pages[i], pages[j])) / 200
+        for i in range(len(pages)) for j in range(i + 1, len(pages))
+    )
+
+    print(f"{len(SEEDS)} seed x 2 filtre, SQL (cursor / OFFSET / sample_order) ile bellek içi sıra farkı: {mismatches}; "
+          f"/api/movies cursor ile {len(api_walk)} film ({len(set(api_walk))} farklı); başka seed'in cursor'ı {other_seed.status_code}")
+    print(f"Tür filtresi cursor ile {len(genre_walk)} film ({len(set(genre_walk))} farklı, beklenen {len(genre_expected)}); "
+          f"başka seed'in cursor'ı {genre_other_seed.status_code}")
+    print(f"200 seed, ilk 10 sayfada aynı sayfadaki ortak film oranı (en kötü çift): {shared:.2f}")
+
+    if mismatches == 0 and len(api_walk) == len(set(api_walk)) > 0 and other_seed.status_code == 400 \
+            and shared < 0.75 and sorted(genre_walk) == sorted(genre_expected) and genre_other_seed.status_code == 400:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
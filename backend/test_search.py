@@ -0,0 +1,89 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie
+from backend.src.recommender import engine as rec_engine
+from backend.src.title_index import normalize_title
+
+
+def typo(text, rng):
+    """Bir harfi komşu harfle değiştir ya da iki harfin yerini değiştir."""
+    i = rng.randrange(1, len(text) - 1)
+    if rng.random() < 0.5:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + chr((ord(text[i]) - 96) % 26 + 97) + text[i + 1:]
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    rng = random.Random(0)
+    titles = [t for t in rec_engine.catalog.strings["title"] if t and len(normalize_title(t)) >= 8]
+
+    # 1) ILIKE '%q%' ile bulunan her film indeksin sonuçlarında da olmalı (1-2 harflik sorgular dahil, sınırsız)
+    missed, unique = 0, True
+    async with async_session_maker() as session:
+        queries = []
+        for title in rng.sample(titles, 60):
+            word = rng.choice([w for w in title.split() if w.isalnum()] or [title])
+            start = rng.randrange(0, max(1, len(word) - 3))
+            queries.append(word[start:start + rng.randint(3, 6)])
+        for q in queries + ["a", "e", "th", "the"]:
+            ilike = set((await session.execute(select(Movie.movieId).where(Movie.title.ilike(f"%{q}%")))).scalars())
+            found_ids = rec_engine.search_ids(q)
+            missed += len(ilike - set(found_ids))
+            unique &= len(found_ids) == len(set(found_ids))
+        the_ilike = set((await session.execute(select(Movie.movieId).where(Movie.title.ilike("%the%")))).scalars())
+    print(f"ILIKE sonuçlarından indeksin kaçırdığı: {missed}; tekrarsız id: {unique}")
+
+    # 2) Yazım hatalı sorgular ve otomatik tamamlama (HTTP)
+    from backend.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        found = 0
+        sample = rng.sample(titles, 50)
+        for title in sample:
+            results = (await client.get("/api/movies/search/query", params={"q": typo(normalize_title(title), rng)})).json()
+            found += title in [r["title"] for r in results[:5]]
+
+        prefix_ok = True
+        for title in sample[:20]:
+            prefix = normalize_title(title)[:5].strip()
+            results = (await client.get("/api/movies/search/autocomplete", params={"q": prefix})).json()
+            prefix_ok &= bool(results) and all(r["match"] in ("exact", "prefix", "token", "substring") for r in results)
+            prefix_ok &= all(prefix in normalize_title(r["title"]) or r["match"] == "token" for r in results)
+        exact = (await client.get("/api/movies/search/query", params={"q": sample[0]})).json()
+        # Liste filtresi fuzzy değil: eşleşmeyen arama ilgisiz filmler değil boş liste döner
+        listing = (await client.get("/api/movies", params={"search": "xyzq"})).json()
+        matching = (await client.get("/api/movies", params={"search": normalize_title(sample[1])})).json()
+        # Liste filtresinde sayfalama eşleşmelerin tamamını gezer (ilk 200'de kesilmez)
+        walked, cursor = [], None
+        while True:
+            params = {"search": "the", "seed": 7, "limit": 100, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get("/api/movies", params=params)
+            walked += [m["movieId"] for m in resp.json()]
+            cursor = resp.headers.get("x-next-cursor")
+            if not cursor:
+                break
+    print(f"Yazım hatalı {len(sample)} sorgudan {found} tanesinde film ilk 5'te; otomatik tamamlama önekleri: {prefix_ok}; "
+          f"tam ad ilk sırada: {exact[0]['title'] == sample[0]}; eşleşmeyen aramada liste: {len(listing)} film, "
+          f"tam adla: {sample[1] in [m['title'] for m in matching]}")
+    print(f"?search=the sayfaları: {len(walked)} film ({len(set(walked))} farklı), ILIKE: {len(the_ilike)}, "
+          f"eksik: {len(the_ilike - set(walked))}")
+
+    if missed == 0 and unique and len(walked) == len(set(walked)) and not the_ilike - set(walked) \
+            and found >= 40 and prefix_ok and exact[0]["title"] == sample[0] \
+            and listing == [] and sample[1] in [m["title"] for m in matching]:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
@@ -0,0 +1,130 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import httpx
+import numpy as np
+from sqlalchemy.future import select
+
+from backend.src.db_pg import engine, init_db, async_session_maker
+from backend.src.models_pg import Movie, User
+from backend.src.recommender import engine as rec_engine
+from backend.src.taste import TasteCache, TasteProfile
+
+
+def lru_check():
+    cache = TasteCache(capacity=2)
+    for uid in (1, 2):
+        cache.put(uid, TasteProfile(np.zeros(3), np.zeros(3), 0))
+    cache.get(1)                 # 1 en son kullanılan
+    cache.put(3, TasteProfile(np.zeros(3), np.zeros(3), 0))
+    return cache.get(2) is None and cache.get(1) is not None and len(cache) == 2
+
+
+async def test():
+    await init_db()
+    await rec_engine.refresh_data()
+    lru_ok = lru_check()
+    print(f"LRU tahliyesi: {lru_ok}")
+
+    # 1) Bellek içi havuz, SQL havuzuyla aynı film kümesi olmalı
+    async with async_session_maker() as session:
+        user_ids = (await session.execute(select(User.user_id).limit(50))).scalars().all()
+        mismatches = 0
+        for uid in user_ids:
+            ranked = rec_engine.rank_for_user(uid).tolist()
+            rows = (await session.execute(rec_engine._user_page_stmt(
+                uid, limit=None, order_by=[Movie.movieId], exclude_ids=ranked
+            ))).all()
+            sql_ids = {m.movieId for _, m in rows if m is not None}
+            profile = await rec_engine.taste_profile(session, uid)
+            mem_ids = rec_engine.taste_page(uid, profile, limit=10 ** 6, seed=1, exclude_ids=ranked)
+            if set(mem_ids) != sql_ids or len(mem_ids) != len(sql_ids):
+                mismatches += 1
+                print(f"  FARK: user_id={uid}")
+        missing = await rec_engine.taste_profile(session, -1)
+    print(f"{len(user_ids)} kullanıcıda SQL havuzuyla fark: {mismatches}, olmayan kullanıcı: {missing}")
+
+    # 2) Sayfalar: tekrar yok, seed aynıysa aynı sıra, puan azalan
+    uid = int(user_ids[0])
+    pages = [await rec_engine.recommend_for_user(uid, skip=p * 20, limit=20, seed=5) for p in range(3)]
+    again = await rec_engine.recommend_for_user(uid, skip=20, limit=20, seed=5)
+    ids = [m["movieId"] for page in pages for m in page]
+    paging_ok = len(ids) == len(set(ids)) and [m["movieId"] for m in again] == [m["movieId"] for m in pages[1]]
+
+    # 3) HTTP beğeni / silme / tercih değişimi önbellekteki profili güncellemeli; sıfırdan kurulanla aynı olmalı
+    from backend.main import app
+    async with async_session_maker() as session:
+        await rec_engine.taste_profile(session, uid)
+    watched = rec_engine.item_cf.watched_by_user.get(uid, set())
+    unseen = int(rec_engine.item_cf.movie_ids[next(p for p in range(len(rec_engine.item_cf.movie_ids)) if p not in watched)])
+    async with async_session_maker() as session:
+        original = (await session.execute(select(User.selected_genres).where(User.user_id == uid))).scalar()
+
+    async def rebuilt_matches():
+        cached = rec_engine.taste.get(uid).vector()
+        rec_engine.taste.clear()
+        async with async_session_maker() as session:
+            fresh = (await rec_engine.taste_profile(session, uid)).vector()
+        return bool(np.allclose(cached, fresh, atol=1e-6))
+
+    checks = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+        await client.post("/api/interactions", json={"user_id": uid, "movie_id": unseen, "is_liked": True})
+        checks.append(await rebuilt_matches())
+        await client.post("/api/interactions", json={"user_id": uid, "movie_id": unseen, "is_liked": False})
+        checks.append(await rebuilt_matches())
+        await client.delete(f"/api/interactions/user/{uid}/movie/{unseen}")
+        checks.append(await rebuilt_matches())
+        await client.post(f"/api/users/{uid}/preferences", json={"selected_genres": [18, 35]})
+        checks.append(await rebuilt_matches())
+        await client.post(f"/api/users/{uid}/preferences", json={"selected_genres": original or []})
+    print(f"Sayfalama: {paging_ok}; beğeni / beğenmeme / silme / tercih sonrası profil tutarlı: {checks}")
+
+    # 4) CF güncellemesi thread'deyken profil (beğeni eklenmiş likes_by_user'dan) kurulursa beğeni iki kez sayılmamalı
+    loop = asyncio.get_running_loop()
+    add_interaction = rec_engine.item_cf.add_interaction
+
+    async def build_profile():
+        async with async_session_maker() as session:
+            await rec_engine.taste_profile(session, uid)
+
+    def racing_add(*args):
+        sign = add_interaction(*args)
+        asyncio.run_coroutine_threadsafe(build_profile(), loop).result()  # Bu arada gelen bir öneri isteği
+        return sign
+
+    rec_engine.taste.clear()
+    rec_engine.item_cf.add_interaction = racing_add
+    await rec_engine.record_interaction(uid, unseen, True)
+    del rec_engine.item_cf.add_interaction
+    raced = rec_engine.taste.peek(uid) is None or await rebuilt_matches()
+    await build_profile()
+    await rec_engine.forget_interaction(uid, unseen)
+    raced &= await rebuilt_matches()
+    print(f"Güncelleme sırasında kurulan profil tutarlı: {raced}")
+
+    # 5) Süre: önbellekten profil + puanlama, SQL havuzuna karşı
+    async with async_session_maker() as session:
+        start = time.perf_counter()
+        for uid in user_ids:
+            profile = await rec_engine.taste_profile(session, uid)
+            rec_engine.taste_page(uid, profile, limit=20, seed=1)
+        mem_ms = (time.perf_counter() - start) * 1000 / len(user_ids)
+        start = time.perf_counter()
+        for uid in user_ids:
+            (await session.execute(rec_engine._user_page_stmt(uid, limit=20, seed=1))).all()
+        sql_ms = (time.perf_counter() - start) * 1000 / len(user_ids)
+    print(f"Havuz sayfası: bellek {mem_ms:.2f} ms, SQL {sql_ms:.2f} ms; önbellek isabet {rec_engine.taste.hits}, "
+          f"ıska {rec_engine.taste.misses}")
+
+    if lru_ok and mismatches == 0 and missing is None and paging_ok and all(checks) and raced:
+        print("All tests passed!")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(test())
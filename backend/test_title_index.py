@@ -0,0 +1,61 @@
+import sys
+import time
+from pathlib import Path
+
+root_path = Path(__file__).parent.parent
+sys.path.insert(0, str(root_path))
+
+import numpy as np
+import pandas as pd
+
+from backend.src.title_index import TitleIndex, normalize_title
+
+DATA_PATH = root_path / "backend" / "data" / "movies_with_metadata.csv"
+
+
+def test(samples: int = 2000):
+    df = pd.read_csv(DATA_PATH)
+    start = time.perf_counter()
+    index = TitleIndex.from_frame(df)
+    print(f"İndeks kuruldu: {len(index.keys)} ad, {len(index.vocab)} kelime, {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    titles = df['original_title'].fillna('').astype(str)
+    normalized = titles.map(normalize_title)
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(df), size=min(samples, len(df)), replace=False)
+
+    # 1) Tam ad her zaman aynı normalize ada sahip bir filme çözülmeli
+    wrong = [r for r in rows if normalized[r] and normalize_title(titles[index.resolve(titles[r])]) != normalized[r]
+             and normalize_title(df['title'][index.resolve(titles[r])]) != normalized[r]]
+    print(f"Tam ad çözümleme hatası: {len(wrong)} / {len(rows)}")
+
+    # 2) Eski str.contains ile bulunabilen kelime öneki sorgular indeksle de bulunmalı
+    queries = [" ".join(normalized[r].split()[:2]) for r in rows if normalized[r]]
+    missing = [q for q in queries if index.resolve(q, fuzzy=False) is None]
+    print(f"Kelime sorgusunda bulunamayan: {len(missing)} / {len(queries)}")
+
+    # 3) Yazım hatası: fuzzy aday listesinde doğru film olmalı
+    popular = df.sort_values('popularity', ascending=False).head(50)
+    typo_hits = 0
+    for title in popular['original_title'].astype(str):
+        typo = title[:2] + title[3] + title[2] + title[4:] if len(title) > 5 else title
+        found = index.candidates(typo, limit=5)
+        typo_hits += any(normalize_title(titles[row]) == normalize_title(title) for row, _, _ in found)
+    print(f"Yazım hatalı aramada doğru film ilk 5'te: {typo_hits} / {len(popular)}")
+
+    # 4) Hız: eski tam tarama vs indeks
+    start = time.perf_counter()
+    for q in queries[:200]:
+        titles.str.lower().str.contains(q, na=False)
+    scan_ms = (time.perf_counter() - start) * 1000 / 200
+    start = time.perf_counter()
+    for q in queries:
+        index.resolve(q)
+    index_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"str.contains: {scan_ms:.3f} ms/sorgu, TitleIndex: {index_ms:.3f} ms/sorgu")
+
+    if not wrong and not missing and typo_hits >= len(popular) * 0.9 and index_ms < 1.0:
+        print("All tests passed!")
+
+if __name__ == "__main__":
+    test()
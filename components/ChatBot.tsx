@@ -1,7 +1,7 @@
 'use client';
 
 import { useState, useRef, useEffect } from 'react';
-import { sendChatMessage } from '@/lib/api';
+import { streamChatMessage } from '@/lib/api';
 
 const styles = {
     container: {
@@ -180,8 +180,19 @@ export default function ChatBot() {
         setShowPrompts(false); // Hide prompts after use
 
         try {
-            const response = await sendChatMessage(msg, userId);
-            setMessages(prev => [...prev, { text: response, sender: 'ai' }]);
+            // Yanıt parça parça gelir: ilk parçada yeni bir mesaj açılır, sonrakiler ona eklenir
+            let started = false;
+            await streamChatMessage(msg, userId, (delta) => {
+                if (!started) {
+                    started = true;
+                    setMessages(prev => [...prev, { text: delta, sender: 'ai' }]);
+                } else {
+                    setMessages(prev => {
+                        const last = prev[prev.length - 1];
+                        return [...prev.slice(0, -1), { ...last, text: last.text + delta }];
+                    });
+                }
+            });
         } catch (err: any) {
             const errorMessage = err.message || "Bilinmeyen bir hata oluştu.";
             setMessages(prev => [...prev, { text: `⚠️ Hata: ${errorMessage}`, sender: 'ai' }]);
@@ -250,7 +261,7 @@ export default function ChatBot() {
                                 {formatMessage(m.text)}
                             </div>
                         ))}
-                        {loading && (
+                        {loading && messages[messages.length - 1]?.sender === 'user' && (
                             <div style={{ ...styles.message, ...styles.aiMessage, width: '70%' }}>
                                 <div style={{ ...styles.skeleton, width: '100%', animationDelay: '0s' }} />
                                 <div style={{ ...styles.skeleton, width: '85%', animationDelay: '0.2s' }} />
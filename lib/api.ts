@@ -11,6 +11,9 @@ const getBaseUrl = () => {
 
 const API_BASE_URL = getBaseUrl();
 
+// Oturum seed'i: rastgele listelerde sayfalar aynı karışık sıranın devamı olsun diye
+const SESSION_SEED = Math.floor(Math.random() * 2 ** 31);
+
 // Generic fetch wrapper
 async function fetchAPI<T>(endpoint: string): Promise<T> {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, {
@@ -97,6 +100,8 @@ export async function getMovies(
     }
     if (sortBy) {
         endpoint += `&sort_by=${sortBy}`;
+    } else {
+        endpoint += `&seed=${SESSION_SEED}`;
     }
     return fetchAPI<Movie[]>(endpoint);
 }
@@ -168,7 +173,7 @@ export async function getRecommendations(userId?: number, selectedGenres: number
     const response = await fetch(`${API_BASE_URL}/api/recommend`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ user_id: userId, selected_genres: selectedGenres, skip, limit }),
+        body: JSON.stringify({ user_id: userId, selected_genres: selectedGenres, skip, limit, seed: SESSION_SEED }),
     });
     if (!response.ok) {
         const err = await response.json().catch(() => ({}));
@@ -178,6 +183,26 @@ export async function getRecommendations(userId?: number, selectedGenres: number
     return response.json();
 }
 
+export interface SimilarRow {
+    seed: Movie;
+    movies: (Movie & { score: number })[];
+}
+
+// "X'i beğendiğin için" satırları: tüm tohum filmler tek istekte
+export async function getSimilarRows(userId?: number, movieIds: number[] = [], k: number = 10): Promise<{ rows: SimilarRow[]; merged: Movie[] }> {
+    const response = await fetch(`${API_BASE_URL}/api/recommend/similar`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ user_id: userId, movie_ids: movieIds, k }),
+    });
+    if (!response.ok) {
+        const err = await response.json().catch(() => ({}));
+        console.error('Similar movies API error:', err);
+        return { rows: [], merged: [] };
+    }
+    return response.json();
+}
+
 export async function getUsers(): Promise<User[]> {
     return fetchAPI<User[]>('/api/users');
 }
@@ -206,6 +231,55 @@ export async function sendChatMessage(message: string, userId?: number): Promise
     return data.response;
 }
 
+// Akışlı sohbet (Server-Sent Events): yanıt parçaları geldikçe onDelta çağrılır, tam metin döner
+export async function streamChatMessage(
+    message: string,
+    userId: number | undefined,
+    onDelta: (delta: string) => void,
+    signal?: AbortSignal,
+): Promise<string> {
+    const response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ message, user_id: userId }),
+        signal,
+    });
+
+    if (!response.ok || !response.body) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || `Chat API hatası: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary: number;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            for (const line of raw.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            }
+            const payload = data ? JSON.parse(data) : {};
+            if (event === 'error') throw new Error(payload.detail || 'Chat akışı hatası');
+            if (event === 'done') return text;
+            if (payload.delta) {
+                text += payload.delta;
+                onDelta(payload.delta);
+            }
+        }
+    }
+    return text;
+}
+
 export async function getMovieGenres(movieId: number): Promise<Genre[]> {
     return fetchAPI<Genre[]>(`/api/genres/movie/${movieId}`);
 }